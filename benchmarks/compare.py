@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Compares two result files of run.py, e.g. of two releases.
+
+    python benchmarks/compare.py baseline.json results.json
+"""
+
+import argparse
+import json
+
+# metrics compared per engine, with a statistic for distributions; higher is better only for throughput
+METRICS = (
+    ('solves_per_second', None),
+    ('submit_ms', 'p50'),
+    ('submit_ms', 'p95'),
+    ('solve_ms', 'p50'),
+    ('poll_overhead_ms', None),
+    ('requests_per_solve', None),
+    ('cpu_ms_per_solve', None),
+    ('memory_kib_per_task', None),
+)
+
+
+def value(result, metric, statistic):
+    value = result.get(metric)
+    if statistic is not None and value is not None:
+        value = value.get(statistic)
+    return value
+
+
+def change(old, new):
+    if old is None or new is None:
+        return ''
+    if not old:
+        return 'n/a'
+    return f'{(new - old) / old:+.1%}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('results')
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.results) as f:
+        results = json.load(f)
+
+    print(f'{baseline["version"]} ({baseline["date"]}) -> {results["version"]} ({results["date"]})')
+
+    rows = [('build_us', name, baseline['build_us'].get(name), results['build_us'].get(name))
+            for name in results['build_us']]
+
+    for engine, result in results['engines'].items():
+        old = baseline['engines'].get(engine, {})
+        for metric, statistic in METRICS:
+            name = metric if statistic is None else f'{metric}.{statistic}'
+            rows.append((engine, name, value(old, metric, statistic), value(result, metric, statistic)))
+
+    for group, name, old, new in rows:
+        print(f'{group:<10} {name:<22} {old if old is not None else "-":>12} {new if new is not None else "-":>12} '
+              f'{change(old, new):>9}')
+
+
+if __name__ == '__main__':
+    main()
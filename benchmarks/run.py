@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Client-side overhead and throughput of the solvers, measured against a local MockServer.
+
+The mock server runs in a process of its own, so the CPU time measured is the one of the client only. Results are
+printed and saved as JSON, to be compared across releases with compare.py.
+
+    python benchmarks/run.py --captchas 500 --concurrency 50 --output results.json
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+import timeit
+import tracemalloc
+from concurrent.futures import wait
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import twocaptcha
+from twocaptcha import TwoCaptcha, AsyncTwoCaptcha
+from twocaptcha.methods import METHODS
+from twocaptcha.mock_server import MockServer
+
+ENGINES = ('sync', 'threaded', 'async')
+
+image = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'examples', 'images', 'normal.jpg')
+
+
+def serve(connection, options):
+    # runs in the server process: answers 'stats' and 'reset' commands until 'stop'
+    with MockServer(**options) as mock:
+        connection.send(mock.url)
+
+        while True:
+            command = connection.recv()
+            if command == 'stats':
+                connection.send(mock.stats())
+            elif command == 'reset':
+                mock.reset()
+                connection.send(None)
+            else:
+                break
+
+
+class Server():
+    """
+    MockServer running in another process.
+    """
+
+    def __init__(self, **options):
+        context = multiprocessing.get_context('spawn')
+        self._connection, child = context.Pipe()
+        self._process = context.Process(target=serve, args=(child, options), daemon=True)
+        self._process.start()
+        self.url = self._connection.recv()
+
+    def command(self, command):
+        self._connection.send(command)
+        return self._connection.recv()
+
+    def stop(self):
+        self._connection.send('stop')
+        self._process.join(5)
+
+
+def distribution(samples):
+    if not samples:
+        return None
+
+    samples = sorted(samples)
+    return {
+        'mean': round(statistics.fmean(samples) * 1000, 3),
+        'p50': round(samples[len(samples) // 2] * 1000, 3),
+        'p95': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 3),
+        'max': round(samples[-1] * 1000, 3),
+    }
+
+
+class Timings():
+    """
+    Submit (in.php) and end-to-end times of the captchas of a run.
+    """
+
+    def __init__(self):
+        self.submit = []
+        self.solve = []
+        self._lock = threading.Lock()
+
+    def add(self, kind, seconds):
+        with self._lock:
+            getattr(self, kind).append(seconds)
+
+    def timed_send(self, send):
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            result = send(*args, **kwargs)
+            self.add('submit', time.perf_counter() - started)
+            return result
+
+        return timed
+
+    def timed_async_send(self, send):
+        async def timed(*args, **kwargs):
+            started = time.perf_counter()
+            result = await send(*args, **kwargs)
+            self.add('submit', time.perf_counter() - started)
+            return result
+
+        return timed
+
+
+def solver_options(server, args):
+    return {'server': server.url, 'pollingInterval': args.polling_interval}
+
+
+def run_sync(server, args, timings):
+    with TwoCaptcha('API_KEY', **solver_options(server, args)) as solver:
+        solver.send = timings.timed_send(solver.send)
+
+        for _ in range(args.captchas):
+            started = time.perf_counter()
+            solver.normal(image)
+            timings.add('solve', time.perf_counter() - started)
+
+
+def run_threaded(server, args, timings):
+    with TwoCaptcha('API_KEY', poolSize=args.concurrency, **solver_options(server, args)) as solver:
+        solver.send = timings.timed_send(solver.send)
+        slots = threading.BoundedSemaphore(args.concurrency)
+        futures = []
+
+        for _ in range(args.captchas):
+            slots.acquire()
+            started = time.perf_counter()
+            future = solver.submit('normal', file=image)
+            future.add_done_callback(lambda f, started=started: (
+                timings.add('solve', time.perf_counter() - started), slots.release()))
+            futures.append(future)
+
+        wait(futures)
+        for future in futures:
+            future.result()
+
+
+def run_async(server, args, timings):
+    async def run():
+        async with AsyncTwoCaptcha('API_KEY', poolSize=args.concurrency, **solver_options(server, args)) as solver:
+            solver.send = timings.timed_async_send(solver.send)
+            slots = asyncio.Semaphore(args.concurrency)
+
+            async def solve():
+                async with slots:
+                    started = time.perf_counter()
+                    await solver.normal(image)
+                    timings.add('solve', time.perf_counter() - started)
+
+            await asyncio.gather(*(solve() for _ in range(args.captchas)))
+
+    asyncio.run(run())
+
+
+RUNNERS = {'sync': run_sync, 'threaded': run_threaded, 'async': run_async}
+
+
+def throughput(engine, server, args):
+    '''Solves args.captchas captchas, returns the latencies, throughput and costs per solve.'''
+
+    server.command('reset')
+    timings = Timings()
+
+    cpu, started = time.process_time(), time.perf_counter()
+    RUNNERS[engine](server, args, timings)
+    cpu, seconds = time.process_time() - cpu, time.perf_counter() - started
+
+    stats = server.command('stats')
+    solved = stats['solved'] or 1
+    requests = sum(stats['requests'].values())
+    poll_overhead = statistics.fmean(timings.solve) - statistics.fmean(timings.submit) - args.solve_time
+
+    return {
+        'captchas': args.captchas,
+        'seconds': round(seconds, 3),
+        'solves_per_second': round(stats['solved'] / seconds, 2),
+        'submit_ms': distribution(timings.submit),
+        'solve_ms': distribution(timings.solve),
+        'poll_overhead_ms': round(poll_overhead * 1000, 3),
+        'requests_per_solve': round(requests / solved, 3),
+        'cpu_ms_per_solve': round(cpu / solved * 1000, 3),
+    }
+
+
+def in_flight_memory(engine, server, args):
+    '''Returns the memory in KiB held per captcha waiting for its answer, None for the sync engine (one captcha at
+    a time).'''
+
+    if engine == 'sync':
+        return None
+
+    count = args.in_flight
+    tracemalloc.start()
+
+    try:
+        if engine == 'threaded':
+            with TwoCaptcha('API_KEY', **solver_options(server, args)) as solver:
+                solver.submit('normal', file=image).cancel()
+                before = tracemalloc.get_traced_memory()[0]
+
+                futures = [solver.submit('normal', file=image) for _ in range(count)]
+                while len(solver.poller.pending()) < count:
+                    time.sleep(0.01)
+
+                used = tracemalloc.get_traced_memory()[0] - before
+                for future in futures:
+                    future.cancel()
+        else:
+            async def run():
+                async with AsyncTwoCaptcha('API_KEY', **solver_options(server, args)) as solver:
+                    before = tracemalloc.get_traced_memory()[0]
+
+                    tasks = [asyncio.ensure_future(solver.normal(image)) for _ in range(count)]
+                    while len(solver.poller.pending()) < count:
+                        await asyncio.sleep(0.01)
+
+                    used = tracemalloc.get_traced_memory()[0] - before
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    return used
+
+            used = asyncio.run(run())
+    finally:
+        tracemalloc.stop()
+
+    return round(used / count / 1024, 3)
+
+
+def build_times(number=2000):
+    '''Returns the time in microseconds spent building the parameters of a captcha (binding the arguments of the
+    method, default_params, rename_params and check_hint_img), without HTTP.'''
+
+    solver = TwoCaptcha('API_KEY')
+    calls = {
+        'normal': ((image,), {'numeric': 4, 'minLen': 4, 'hintText': 'red symbols only'}),
+        'recaptcha': (('6Le-wvkSVVABCPBMRTvw0Q4Muexq1bi0DJwx_mJ-', 'https://site.com'), {'invisible': 1}),
+        'turnstile': (('0x4AAAAAAAC3DHQFLr1GavRN', 'https://site.com'), {'action': 'login'}),
+    }
+
+    def build(spec, args, kwargs):
+        file, params, options = spec.bind(args, kwargs)
+        params.update(options)
+        if file is not None:
+            params['file'] = file
+        params = solver.rename_params(solver.default_params(params))
+        solver.check_hint_img(params)
+
+    return {name: round(timeit.timeit(lambda: build(METHODS[name], args, kwargs), number=number) / number * 1e6, 3)
+            for name, (args, kwargs) in calls.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--engines', default=','.join(ENGINES), help='comma-separated engines: sync,threaded,async')
+    parser.add_argument('--captchas', type=int, default=200, help='captchas solved per engine')
+    parser.add_argument('--concurrency', type=int, default=50, help='captchas in progress (threaded and async)')
+    parser.add_argument('--in-flight', type=int, default=200, help='captchas pending to measure memory per task')
+    parser.add_argument('--solve-time', type=float, default=0, help='seconds the mock server takes per captcha')
+    parser.add_argument('--latency', type=float, default=0, help='seconds the mock server delays each response')
+    parser.add_argument('--polling-interval', type=int, default=1, help='pollingInterval of the solvers')
+    parser.add_argument('--output', help='JSON file the results are saved to')
+    args = parser.parse_args()
+
+    engines = [engine.strip() for engine in args.engines.split(',') if engine.strip()]
+    unknown = set(engines) - set(ENGINES)
+    if unknown:
+        parser.error(f'unknown engines: {", ".join(sorted(unknown))}')
+
+    results = {
+        'version': twocaptcha.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'date': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'config': {name: value for name, value in vars(args).items() if name not in ('output', 'engines')},
+        'build_us': build_times(),
+        'engines': {},
+    }
+
+    server = Server(solve_time=args.solve_time, latency=args.latency)
+    pending = Server(solve_time=3600)
+
+    try:
+        for engine in engines:
+            result = throughput(engine, server, args)
+            result['memory_kib_per_task'] = in_flight_memory(engine, pending, args)
+            results['engines'][engine] = result
+            print(f'{engine}: {json.dumps(result)}', file=sys.stderr)
+    finally:
+        server.stop()
+        pending.stop()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -19,6 +19,7 @@ setup(name='2captcha-python',
       long_description_content_type="text/markdown",
       url='https://github.com/2captcha/2captcha-python/',
       install_requires=['requests', 'httpx', 'aiofiles'],
+      extras_require={'http2': ['httpx[http2]']},
       author='2Captcha',
       author_email='info@2captcha.com',
       packages=find_packages(),
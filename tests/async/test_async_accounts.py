@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+import asyncio
+import io
+import unittest
+
+from twocaptcha import AsyncTwoCaptcha, AsyncAccountPool
+from twocaptcha.exceptions.api import ApiException
+from twocaptcha.mock_server import MockServer
+from twocaptcha.retry import RetryPolicy
+
+
+class AsyncAccountPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.mocks = {}
+        for key, balance in (('KEY-AAAA', 1), ('KEY-BBBB', 50)):
+            mock = self.mocks[key] = MockServer(solve_time=0.2, api_key=key, balance=balance, seed=1)
+            mock.start()
+            self.addCleanup(mock.stop)
+
+    def run_pool(self, coroutine, **options):
+        async def run():
+            solvers = []
+            for key, mock in self.mocks.items():
+                solver = AsyncTwoCaptcha(key, pollingInterval=1, server=mock.url)
+                solver.retry_policy = RetryPolicy(backoff=0.01)
+                solvers.append(solver)
+
+            async with AsyncAccountPool(solvers, **options) as pool:
+                return await coroutine(pool)
+
+        return asyncio.run(run())
+
+    def captchas(self):
+        return {key: mock.stats()['captchas'] for key, mock in self.mocks.items()}
+
+    def test_spreads_concurrent_captchas(self):
+        async def solve(pool):
+            results = await asyncio.gather(*(pool.normal(b'image %d' % i) for i in range(4)))
+            return results, pool.stats()
+
+        results, stats = self.run_pool(solve, balanceInterval=None)
+
+        self.assertEqual({result['code'] for result in results}, {'abcd'})
+        self.assertEqual(self.captchas(), {'KEY-AAAA': 2, 'KEY-BBBB': 2})
+        self.assertEqual([account['results'] for account in stats], [2, 2])
+
+    def test_balance_and_failover(self):
+        self.mocks['KEY-BBBB'].inject('ERROR_ZERO_BALANCE')
+
+        async def solve(pool):
+            await pool.refresh_balances()
+            # sent with the account with the highest balance first, which turns out to be empty
+            result = await pool.normal(b'image')
+            results = [result async for result in pool.solve_many([('normal', {'file': b'image 2'})])]
+            return result, results, pool.stats(), await pool.balance()
+
+        result, results, stats, balance = self.run_pool(solve)
+
+        self.assertEqual(result['code'], 'abcd')
+        self.assertEqual(results[0].result['code'], 'abcd')
+        self.assertEqual(self.captchas(), {'KEY-AAAA': 2, 'KEY-BBBB': 0})
+        self.assertEqual(stats[1]['balance'], 0)
+        self.assertTrue(stats[1]['disabled'])
+        self.assertEqual(balance, 51)
+
+    def test_failover_rewinds_files(self):
+        self.mocks['KEY-AAAA'].inject('ERROR_KEY_DOES_NOT_EXIST')
+        file = io.BytesIO(b'image')
+
+        result = self.run_pool(lambda pool: pool.normal(file), balanceInterval=None)
+
+        self.assertEqual(result['code'], 'abcd')
+        self.assertEqual(self.mocks['KEY-BBBB'].captchas()[0]['file'], b'image')
+
+    def test_no_failover_of_accepted_captchas(self):
+        self.mocks['KEY-AAAA'].inject('ERROR_WRONG_USER_KEY', endpoint='res')
+
+        with self.assertRaises(ApiException):
+            self.run_pool(lambda pool: pool.normal(b'image'), balanceInterval=None)
+
+        self.assertEqual(self.captchas(), {'KEY-AAAA': 1, 'KEY-BBBB': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+import asyncio
+import unittest
+
+try:
+    from .abstract_async import AsyncAbstractTest
+    from .test_async_solve_many import AsyncCountingApiClient
+except ImportError:
+    from abstract_async import AsyncAbstractTest
+    from test_async_solve_many import AsyncCountingApiClient
+
+from twocaptcha.answers import AnswerCache
+
+
+class AsyncPendingApiClient(AsyncCountingApiClient):
+    def __init__(self):
+        super().__init__()
+        self.ready = False
+
+    async def res(self, **kwargs):
+        return await super().res(**kwargs) if self.ready else 'CAPCHA_NOT_READY'
+
+
+class AsyncAnswerCacheTest(AsyncAbstractTest):
+    def setUp(self):
+        super().setUp()
+        self.solver.api_client = AsyncCountingApiClient()
+        self.solver.answer_cache = AnswerCache()
+
+    def test_identical_images_solved_once(self):
+        async def run():
+            first = await self.solver.normal(b'\x89PNG image')
+            second = await self.solver.normal(b'\x89PNG image')
+            other = await self.solver.normal(b'\x89PNG image', numeric=1)
+            return first, second, other
+
+        first, second, other = asyncio.run(run())
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual(len(self.solver.api_client.sent), 2)
+
+    def test_concurrent_captchas_coalesced(self):
+        async def run():
+            return await asyncio.gather(*(self.solver.normal(b'\x89PNG image') for _ in range(10)))
+
+        results = asyncio.run(run())
+
+        self.assertEqual({result['code'] for result in results}, {'code1'})
+        self.assertEqual(len(self.solver.api_client.sent), 1)
+        self.assertEqual(self.solver.answer_cache.stats(), {'hits': 0, 'misses': 1, 'coalesced': 9})
+
+    def test_cancelled_caller_detaches(self):
+        api_client = self.solver.api_client = AsyncPendingApiClient()
+
+        async def run():
+            first = asyncio.ensure_future(self.solver.normal(b'\x89PNG image'))
+            while not api_client.sent:
+                await asyncio.sleep(0.01)
+            second = asyncio.ensure_future(self.solver.normal(b'\x89PNG image'))
+            await asyncio.sleep(0.01)
+
+            # the captcha sent for the first caller goes on being polled for the second one
+            first.cancel()
+            api_client.ready = True
+            return await asyncio.wait_for(second, 5)
+
+        self.assertEqual(asyncio.run(run())['code'], 'code1')
+        self.assertEqual(len(api_client.sent), 1)
+
+    def test_solve_cancelled_with_last_caller(self):
+        api_client = self.solver.api_client = AsyncPendingApiClient()
+
+        async def run():
+            callers = [asyncio.ensure_future(self.solver.normal(b'\x89PNG image')) for _ in range(2)]
+            while not self.solver.poller.pending():
+                await asyncio.sleep(0.01)
+
+            for caller in callers:
+                caller.cancel()
+            await asyncio.gather(*callers, return_exceptions=True)
+            await asyncio.sleep(0.01)
+
+        asyncio.run(run())
+        self.assertEqual(self.solver.answer_cache._in_flight, {})
+        self.assertEqual(self.solver.poller.pending(), [])
+
+    def test_report_bad_discards(self):
+        async def run():
+            result = await self.solver.normal(b'\x89PNG image')
+            await self.solver.report(result['captchaId'], False)
+            await self.solver.normal(b'\x89PNG image')
+
+        asyncio.run(run())
+        self.assertEqual(len(self.solver.api_client.sent), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+
+import asyncio
+import email
+import io
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import httpx
+
+try:
+    from .abstract_async import AsyncAbstractTest
+except ImportError:
+    from abstract_async import AsyncAbstractTest
+
+from twocaptcha.async_api import AsyncApiClient, AsyncMultipartStream
+from twocaptcha.exceptions.api import NetworkException
+from twocaptcha.images import ImageCache
+from twocaptcha.timeouts import RequestTimeout
+
+
+class AsyncApiClientTest(unittest.TestCase):
+    def test_client_reused(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, content=b'OK|123')
+
+        async def run():
+            api = AsyncApiClient()
+            api._clients[asyncio.get_running_loop()] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            client = api.client
+
+            await api.in_(method='post', key='API_KEY')
+            await api.res(action='get', id='123')
+
+            self.assertIs(api.client, client)
+            await api.aclose()
+            self.assertTrue(client.is_closed)
+
+        asyncio.run(run())
+        self.assertEqual([r.url.path for r in requests], ['/in.php', '/res.php'])
+
+    def test_new_client_per_loop(self):
+        api = AsyncApiClient()
+
+        async def get_client():
+            return api.client
+
+        first = asyncio.run(get_client())
+        second = asyncio.run(get_client())
+
+        self.assertIsNot(first, second)
+        # closed with the loop it was used from
+        self.assertTrue(first.is_closed)
+        self.assertTrue(second.is_closed)
+
+    def test_limits_and_http2(self):
+        api = AsyncApiClient(max_connections=5, max_keepalive_connections=0, http2=True)
+
+        async def run():
+            return api.client
+
+        with mock.patch('httpx.AsyncClient') as client_class:
+            asyncio.run(run())
+
+        kwargs = client_class.call_args.kwargs
+        self.assertTrue(kwargs['http2'])
+        self.assertEqual(kwargs['limits'], httpx.Limits(max_connections=5, max_keepalive_connections=0))
+
+    def test_context_manager(self):
+        async def run():
+            async with AsyncApiClient() as api:
+                client = api.client
+            return client
+
+        self.assertTrue(asyncio.run(run()).is_closed)
+
+
+class AsyncApiClientTimeoutTest(unittest.TestCase):
+    def run_client(self, api, handler, request):
+        async def run():
+            api._clients[asyncio.get_running_loop()] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            try:
+                return await request(api)
+            finally:
+                await api.aclose()
+
+        return asyncio.run(run())
+
+    def test_phase_timeouts(self):
+        timeouts = []
+
+        def handler(request):
+            timeouts.append(request.extensions['timeout'])
+            return httpx.Response(200, content=b'OK|123')
+
+        async def request(api):
+            await api.in_(method='post', key='API_KEY')
+            await api.res(action='get', id='123', timeout=2)
+
+        api = AsyncApiClient(upload_timeout=RequestTimeout(connect=5, read=100, total=50))
+        self.run_client(api, handler, request)
+
+        self.assertEqual(timeouts[0], {'connect': 5, 'read': 50, 'write': 50, 'pool': 5})
+        self.assertEqual(timeouts[1], {'connect': 2, 'read': 2, 'write': 2, 'pool': 2})
+
+    def test_total_timeout(self):
+        async def handler(request):
+            await asyncio.sleep(1)
+            return httpx.Response(200, content=b'OK|abcd')
+
+        async def request(api):
+            with self.assertRaises(NetworkException):
+                await api.res(action='get', id='123')
+
+        self.run_client(AsyncApiClient(poll_timeout=RequestTimeout(read=5, total=0.1)), handler, request)
+
+
+class AsyncApiClientDownloadTest(AsyncApiClientTimeoutTest):
+    def test_download(self):
+        headers = []
+
+        def handler(request):
+            headers.append(request.headers)
+            if request.headers.get('if-none-match') == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, content=b'\x89PNG image', headers={'ETag': '"v1"'})
+
+        async def request(api):
+            return (await api.download('https://example.com/captcha.png', max_size=100),
+                    await api.download('https://example.com/captcha.png', etag='"v1"'))
+
+        downloaded, not_modified = self.run_client(AsyncApiClient(), handler, request)
+
+        self.assertEqual(downloaded, (b'\x89PNG image', '"v1"'))
+        self.assertEqual(not_modified, (None, '"v1"'))
+        self.assertNotIn('if-none-match', headers[0])
+
+    def test_max_size(self):
+        async def chunks():
+            for _ in range(3):
+                yield b'x' * 60
+
+        def handler(request):
+            if request.url.path == '/long.png':
+                return httpx.Response(200, content=b'x' * 101)
+            return httpx.Response(200, content=chunks())
+
+        async def request(api):
+            for url in ('https://example.com/long.png', 'https://example.com/chunked.png'):
+                with self.assertRaises(NetworkException):
+                    await api.download(url, max_size=100)
+
+        self.run_client(AsyncApiClient(), handler, request)
+
+    def test_bad_response(self):
+        async def request(api):
+            with self.assertRaises(NetworkException) as e:
+                await api.download('https://example.com/captcha.png')
+            return e.exception.status_code
+
+        self.assertEqual(self.run_client(AsyncApiClient(), lambda request: httpx.Response(404), request), 404)
+
+
+class AsyncSolverDownloadTest(AsyncAbstractTest):
+    def test_url_sent_as_binary_part(self):
+        self.solver.api_client.download = mock.AsyncMock(return_value=(b'\x89PNG image', '"v1"'))
+        self.solver.image_cache = ImageCache(2)
+
+        async def run():
+            await self.solver.normal('https://example.com/captcha.png')
+            self.solver.api_client.download.return_value = (None, '"v1"')
+            return await self.solver.download('https://example.com/captcha.png')
+
+        self.assertEqual(asyncio.run(run()), b'\x89PNG image')
+        self.assertEqual(self.solver.api_client.incomings['file'], b'\x89PNG image')
+        self.assertEqual(self.solver.api_client.download.call_args.kwargs['etag'], '"v1"')
+
+    def test_download_error(self):
+        self.solver.api_client.download = mock.AsyncMock(side_effect=NetworkException('bad response: 404'))
+
+        async def run():
+            with self.assertRaises(self.solver.exceptions):
+                await self.solver.normal('https://example.com/captcha.png')
+
+        asyncio.run(run())
+
+
+def parse_multipart(request, body):
+    message = email.message_from_bytes(b'Content-Type: ' + request.headers['content-type'].encode() + b'\r\n\r\n' + body)
+    return {part.get_param('name', header='content-disposition'): part.get_payload(decode=True)
+            for part in message.get_payload()}
+
+
+class AsyncMultipartTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.jpg')
+        os.write(fd, os.urandom(200 * 1024 + 7))
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+
+        with open(self.path, 'rb') as f:
+            self.content = f.read()
+
+    def post(self, files={}, **kwargs):
+        received = {}
+
+        async def handler(request):
+            chunks = [chunk async for chunk in request.stream]
+            received.update(request=request, chunks=chunks, fields=parse_multipart(request, b''.join(chunks)))
+            return httpx.Response(200, content=b'OK|123')
+
+        async def run():
+            api = AsyncApiClient()
+            api._clients[asyncio.get_running_loop()] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            response = await api.in_(files=files, method='post', key='API_KEY', **kwargs)
+            await api.aclose()
+            return response
+
+        self.assertEqual(asyncio.run(run()), 'OK|123')
+        return received
+
+    def test_path_streamed_in_chunks(self):
+        body = AsyncMultipartStream({'method': 'post'}, {'file': self.path}, chunk_size=16 * 1024)
+
+        async def read():
+            return [chunk async for chunk in body]
+
+        chunks = asyncio.run(read())
+
+        self.assertLessEqual(max(map(len, chunks)), 16 * 1024)
+        self.assertGreater(len(chunks), 200 // 16)
+        self.assertEqual(body.content_length(), sum(map(len, chunks)))
+
+    def test_path(self):
+        received = self.post(file=self.path)
+
+        self.assertEqual(received['fields'], {'method': b'post', 'key': b'API_KEY', 'file': self.content})
+        self.assertEqual(int(received['request'].headers['content-length']), len(b''.join(received['chunks'])))
+
+    def test_file_objects_and_async_iterables(self):
+        async def parts():
+            for i in range(0, len(self.content), 1000):
+                yield self.content[i:i + 1000]
+
+        with open(self.path, 'rb') as f:
+            received = self.post(files={'file_1': f, 'file_2': io.BytesIO(b'second'), 'file_3': parts()})
+
+        fields = received['fields']
+        self.assertEqual((fields['file_1'], fields['file_2'], fields['file_3']), (self.content, b'second', self.content))
+        # the size of async iterables is unknown
+        self.assertNotIn('content-length', received['request'].headers)
+
+    def test_buffers(self):
+        received = self.post(files={'file_1': b'one', 'file_2': bytearray(b'two'), 'file_3': memoryview(b'three')})
+
+        fields = received['fields']
+        self.assertEqual((fields['file_1'], fields['file_2'], fields['file_3']), (b'one', b'two', b'three'))
+        self.assertIn('content-length', received['request'].headers)
+
+    def test_content_length(self):
+        body = AsyncMultipartStream({'method': 'post'}, {'file': io.BytesIO(b'abc'), 'path': self.path})
+
+        async def read():
+            return b''.join([chunk async for chunk in body])
+
+        self.assertEqual(body.content_length(), len(asyncio.run(read())))
+
+    def test_file_read_off_loop(self):
+        threads = set()
+
+        class File(io.FileIO):
+            def read(self, size=-1):
+                threads.add(threading.get_ident())
+                return super().read(size)
+
+        async def read():
+            with File(self.path) as f:
+                body = AsyncMultipartStream({'method': 'post'}, {'file': f})
+                return b''.join([chunk async for chunk in body])
+
+        self.assertIn(self.content, asyncio.run(read()))
+        self.assertNotIn(threading.get_ident(), threads)
+
+
+class AsyncSolverLifecycleTest(AsyncAbstractTest):
+    def test_solver_closes_client(self):
+        async def run():
+            with mock.patch.object(self.solver.api_client, 'aclose', create=True, new_callable=mock.AsyncMock) as aclose:
+                async with self.solver as solver:
+                    self.assertIs(solver, self.solver)
+            aclose.assert_awaited_once()
+
+        asyncio.run(run())
+
+    def test_pool_options(self):
+        from twocaptcha import AsyncTwoCaptcha
+
+        solver = AsyncTwoCaptcha('API_KEY', poolSize=50, keepAlive=False, http2=True, pollTimeout=15)
+        self.assertEqual(solver.api_client.max_connections, 50)
+        self.assertEqual(solver.api_client.poll_timeout.total, 15)
+        self.assertEqual(solver.api_client.max_keepalive_connections, 0)
+        self.assertTrue(solver.api_client.http2)
+
+
+if __name__ == '__main__':
+    unittest.main()
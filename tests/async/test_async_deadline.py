@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+import asyncio
+import time
+import unittest
+
+try:
+    from .abstract_async import AsyncAbstractTest, AsyncApiClient
+except ImportError:
+    from abstract_async import AsyncAbstractTest, AsyncApiClient
+
+from twocaptcha import TimeoutException
+
+
+class AsyncSlowApiClient(AsyncApiClient):
+    def __init__(self, ready=True):
+        self.ready = ready
+        self.timeouts = []
+
+    async def in_(self, files={}, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        return await super().in_(files, **kwargs)
+
+    async def res(self, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        return await super().res(**kwargs) if self.ready else 'CAPCHA_NOT_READY'
+
+
+class AsyncDeadlineTest(AsyncAbstractTest):
+    def test_deadline(self):
+        self.solver.api_client = AsyncSlowApiClient(ready=False)
+
+        async def run():
+            with self.assertRaises(TimeoutException):
+                await self.solver.text('Question?', deadline=time.monotonic() + 0.3)
+
+        start = time.monotonic()
+        asyncio.run(run())
+        self.assertLess(time.monotonic() - start, 0.6)
+
+    def test_deadline_caps_send_timeout(self):
+        api_client = self.solver.api_client = AsyncSlowApiClient()
+
+        result = asyncio.run(self.solver.text('Question?', deadline=time.monotonic() + 5))
+
+        self.assertEqual(result['code'], 'abcd')
+        self.assertTrue(0 < api_client.timeouts[0] <= 5)
+
+    def test_deadline_exceeded_before_sending(self):
+        api_client = self.solver.api_client = AsyncSlowApiClient()
+
+        with self.assertRaises(TimeoutException):
+            asyncio.run(self.solver.text('Question?', deadline=time.monotonic() - 1))
+        self.assertEqual(api_client.timeouts, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
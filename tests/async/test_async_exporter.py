@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+
+import asyncio
+import unittest
+
+from twocaptcha import AsyncTwoCaptcha, PrometheusExporter
+from twocaptcha.mock_server import MockServer
+
+
+class AsyncPrometheusExporterTest(unittest.TestCase):
+    def setUp(self):
+        self.mock = MockServer(balance=7, seed=1)
+        self.mock.start()
+        self.addCleanup(self.mock.stop)
+
+    def test_render(self):
+        async def run():
+            async with AsyncTwoCaptcha('API_KEY', pollingInterval=1, server=self.mock.url) as solver:
+                exporter = PrometheusExporter(solver, port=0)
+                await asyncio.gather(solver.normal(b'image 1'), solver.normal(b'image 2'))
+
+                before = exporter.render()
+                await exporter.arefresh_balance()
+                return before, exporter.render()
+
+        before, after = asyncio.run(run())
+
+        self.assertIn('twocaptcha_submits_total{method="post"} 2', before)
+        self.assertIn('twocaptcha_results_total{method="post"} 2', before)
+        self.assertNotIn('twocaptcha_balance', before)
+        self.assertIn('twocaptcha_balance 7.0', after)
+
+
+if __name__ == '__main__':
+    unittest.main()
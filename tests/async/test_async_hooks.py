@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import asyncio
+import unittest
+
+from twocaptcha import AsyncTwoCaptcha, Hooks, MetricsCollector
+from twocaptcha.exceptions.api import ApiException
+from twocaptcha.mock_server import MockServer
+from twocaptcha.retry import RetryPolicy
+
+
+class Recorder(Hooks):
+    def __init__(self):
+        self.events = []
+
+    def on_submit(self, event):
+        self.events.append(('submit', event))
+
+    def on_poll(self, event):
+        self.events.append(('poll', event))
+
+    def on_result(self, event):
+        self.events.append(('result', event))
+
+    def on_error(self, event):
+        self.events.append(('error', event))
+
+    def on_retry(self, event):
+        self.events.append(('retry', event))
+
+    def of(self, name):
+        return [event for kind, event in self.events if kind == name]
+
+
+class AsyncHooksTest(unittest.TestCase):
+    def setUp(self):
+        self.mock = MockServer(solve_time=(0.1, 0.3), seed=1)
+        self.mock.start()
+        self.addCleanup(self.mock.stop)
+
+        self.recorder = Recorder()
+        self.metrics = MetricsCollector()
+
+    def run_solver(self, coroutine):
+        async def run():
+            async with AsyncTwoCaptcha('API_KEY', pollingInterval=1, server=self.mock.url,
+                                       hooks=[self.recorder, self.metrics]) as solver:
+                solver.retry_policy = RetryPolicy(backoff=0.01)
+                return await coroutine(solver)
+
+        return asyncio.run(run())
+
+    def test_concurrent_captchas(self):
+        self.mock.inject('ERROR_NO_SLOT_AVAILABLE')
+
+        results = self.run_solver(lambda solver: asyncio.gather(*(solver.normal(b'image %d' % i) for i in range(5))))
+
+        submits = self.recorder.of('submit')
+        self.assertEqual(sorted(event.captcha_id for event in submits),
+                         sorted(result['captchaId'] for result in results))
+        self.assertEqual(sorted(event.captcha_id for event in self.recorder.of('result')),
+                         sorted(result['captchaId'] for result in results))
+
+        retry, = self.recorder.of('retry')
+        self.assertEqual(retry.request, 'in.php')
+        self.assertEqual(retry.method, 'post')
+
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot['submits'], {'post': 5})
+        self.assertEqual(snapshot['results'], {'post': 5})
+        self.assertEqual(snapshot['polls_per_solve']['post']['count'], 5)
+        self.assertEqual(snapshot['retries'], {('in.php', 'post'): 1})
+
+    def test_error(self):
+        self.mock.inject('ERROR_CAPTCHA_UNSOLVABLE', endpoint='res')
+
+        with self.assertRaises(ApiException):
+            self.run_solver(lambda solver: solver.normal(b'image'))
+
+        error, = self.recorder.of('error')
+        self.assertEqual(error.method, 'post')
+        self.assertIsInstance(error.error, ApiException)
+        self.assertEqual(self.metrics.snapshot()['errors'], {('post', 'ERROR_CAPTCHA_UNSOLVABLE'): 1})
+        self.assertEqual(self.recorder.of('result'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
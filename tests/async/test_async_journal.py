@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+
+from twocaptcha import AsyncTwoCaptcha
+from twocaptcha.exceptions.solver import ValidationException
+from twocaptcha.journal import Journal
+from twocaptcha.mock_server import MockServer
+
+
+class AsyncJournalTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'journal.db')
+
+        self.mock = MockServer(solve_time=0.5, seed=1)
+        self.mock.start()
+        self.addCleanup(self.mock.stop)
+
+    def test_solve(self):
+        async def run():
+            async with AsyncTwoCaptcha('API_KEY', pollingInterval=1, server=self.mock.url,
+                                       journal=self.path) as solver:
+                task = asyncio.ensure_future(solver.normal(b'image'))
+                while not solver.poller.pending():
+                    await asyncio.sleep(0.01)
+
+                pending = solver.journal.pending()
+                return pending, await task, solver.journal.pending()
+
+        pending, result, after = asyncio.run(run())
+
+        self.assertEqual([entry.id for entry in pending], [result['captchaId']])
+        self.assertEqual(pending[0].method, 'post')
+        self.assertEqual(after, [])
+
+    def test_cancelled_captchas_are_kept(self):
+        async def run():
+            async with AsyncTwoCaptcha('API_KEY', pollingInterval=1, server=self.mock.url,
+                                       journal=self.path) as solver:
+                task = asyncio.ensure_future(solver.normal(b'image'))
+                while not solver.poller.pending():
+                    await asyncio.sleep(0.01)
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+                return solver.journal.pending()
+
+        self.assertEqual(len(asyncio.run(run())), 1)
+
+    def test_resume(self):
+        async def send():
+            async with AsyncTwoCaptcha('API_KEY', server=self.mock.url) as solver:
+                return [await solver.send(method='post', file=b'image %d' % i) for i in range(3)]
+
+        ids = asyncio.run(send())
+        journal = Journal(self.path)
+        for id_ in ids:
+            journal.add(id_, 'post', 'hash', 60)
+
+        async def resume():
+            async with AsyncTwoCaptcha('API_KEY', pollingInterval=1, server=self.mock.url,
+                                       journal=journal) as solver:
+                tasks = await solver.resume()
+                results = await asyncio.gather(*tasks.values())
+                return dict(zip(tasks, results))
+
+        results = asyncio.run(resume())
+
+        self.assertEqual({id_: result['code'] for id_, result in results.items()}, dict.fromkeys(ids, 'abcd'))
+        self.assertEqual(journal.pending(), [])
+
+    def test_resume_requires_journal(self):
+        async def run():
+            async with AsyncTwoCaptcha('API_KEY', server=self.mock.url) as solver:
+                await solver.resume()
+
+        with self.assertRaises(ValidationException):
+            asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+import asyncio
+import time
+import unittest
+
+try:
+    from .abstract_async import AsyncAbstractTest
+except ImportError:
+    from abstract_async import AsyncAbstractTest
+
+from twocaptcha import AsyncTwoCaptcha
+from twocaptcha.limiter import AsyncRateLimiter
+
+
+class AsyncConcurrencyApiClient():
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def in_(self, files={}, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return 'OK|123'
+
+    async def res(self, **kwargs):
+        return 'OK|abcd'
+
+
+class AsyncRateLimiterTest(unittest.TestCase):
+    def test_rate(self):
+        limiter = AsyncRateLimiter(rate=20, burst=5)
+
+        async def run():
+            async def request():
+                async with limiter:
+                    pass
+            await asyncio.gather(*(request() for _ in range(15)))
+
+        start = time.monotonic()
+        asyncio.run(run())
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.45)
+        self.assertEqual(limiter.stats()['delayed'], 10)
+
+    def test_cancel_refunds(self):
+        limiter = AsyncRateLimiter(rate=1, max_in_flight=1)
+
+        async def run():
+            async with limiter:
+                pass
+            waiter = asyncio.create_task(limiter.acquire())
+            await asyncio.sleep(0.05)
+            waiter.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+            # the slot of the cancelled request is free again
+            await asyncio.wait_for(limiter._slots.acquire(), 0.1)
+
+        asyncio.run(run())
+        self.assertEqual(limiter.stats()['acquired'], 1)
+        self.assertLess(limiter._tokens, 1)
+
+
+class AsyncSolverLimitTest(AsyncAbstractTest):
+    def test_submit_concurrency(self):
+        solver = AsyncTwoCaptcha('API_KEY', submitConcurrency=3)
+        solver.api_client = api_client = AsyncConcurrencyApiClient()
+
+        async def run():
+            await asyncio.gather(*(solver.send(method='post') for _ in range(10)))
+
+        asyncio.run(run())
+        asyncio.run(run())
+
+        self.assertEqual(api_client.max_in_flight, 3)
+        self.assertEqual(solver.submit_limiter.stats()['acquired'], 20)
+        self.assertEqual(solver.submit_limiter.stats()['in_flight'], 0)
+
+    def test_poll_rate(self):
+        solver = AsyncTwoCaptcha('API_KEY', pollRate=50)
+        solver.api_client = AsyncConcurrencyApiClient()
+
+        async def run():
+            return await asyncio.gather(*(solver.get_result('123') for _ in range(60)))
+
+        self.assertEqual(asyncio.run(run()), ['abcd'] * 60)
+        self.assertEqual(solver.poll_limiter.stats()['delayed'], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+import asyncio
+import unittest
+
+from twocaptcha import AsyncTwoCaptcha
+from twocaptcha.mock_server import MockServer
+from twocaptcha.retry import RetryPolicy
+
+
+class AsyncMockServerTest(unittest.TestCase):
+    def setUp(self):
+        self.mock = MockServer(solve_time=(0.2, 0.5), seed=1)
+        self.mock.start()
+        self.addCleanup(self.mock.stop)
+
+    def test_concurrent_captchas(self):
+        async def run():
+            async with AsyncTwoCaptcha('API_KEY', pollingInterval=1, server=self.mock.url) as solver:
+                solver.retry_policy = RetryPolicy(backoff=0.01)
+                self.mock.inject(502)
+                return await asyncio.gather(*(solver.normal(b'image %d' % i) for i in range(10)))
+
+        results = asyncio.run(run())
+
+        self.assertEqual({result['code'] for result in results}, {'abcd'})
+        self.assertEqual(sorted(params['file'] for params in self.mock.captchas()),
+                         sorted(b'image %d' % i for i in range(10)))
+
+        stats = self.mock.stats()
+        self.assertEqual(stats['solved'], 10)
+        self.assertEqual(stats['errors'], {502: 1})
+        # answers are polled in batches
+        self.assertLess(stats['requests']['res.php'], 10)
+
+    def test_async_iterable_upload(self):
+        async def image():
+            yield b'image '
+            yield b'streamed'
+
+        async def run():
+            async with AsyncTwoCaptcha('API_KEY', pollingInterval=1, server=self.mock.url) as solver:
+                return await solver.normal(image())
+
+        # sent with Transfer-Encoding: chunked, its length is unknown
+        self.assertEqual(asyncio.run(run())['code'], 'abcd')
+        self.assertEqual(self.mock.captchas()[0]['file'], b'image streamed')
+
+
+if __name__ == '__main__':
+    unittest.main()
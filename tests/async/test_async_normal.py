@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import io
 import unittest
 from pathlib import Path
 
@@ -18,6 +19,13 @@ class AsyncNormalTest(AsyncAbstractTest):
         sends = {'method': 'post', 'file': file}
         self.send_return(sends, self.solver.normal, file=file)
 
+    def test_bytes(self):
+        content = Path(file).read_bytes()
+
+        for image in (content, bytearray(content), memoryview(content), io.BytesIO(content)):
+            sends = {'method': 'post', 'file': image}
+            self.send_return(sends, self.solver.normal, file=image)
+
     def test_base64(self):
         b64 = 'AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA'
         sends = {
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+import asyncio
+import unittest
+
+import httpx
+
+try:
+    from .abstract_async import AsyncAbstractTest, AsyncApiClient
+except ImportError:
+    from abstract_async import AsyncAbstractTest, AsyncApiClient
+
+from twocaptcha import AsyncTwoCaptcha, AsyncPingbackReceiver
+from twocaptcha.exceptions.api import ApiException
+
+
+class AsyncNotReadyApiClient(AsyncApiClient):
+    async def res(self, **kwargs):
+        return 'CAPCHA_NOT_READY'
+
+
+class AsyncPingbackTest(AsyncAbstractTest):
+    def setUp(self):
+        self.receiver = AsyncPingbackReceiver('https://example.com/pingback', host='127.0.0.1', port=0, fallback=5)
+        self.solver = AsyncTwoCaptcha('API_KEY', pollingInterval=1, pingback=self.receiver)
+        self.solver.api_client = AsyncNotReadyApiClient()
+
+    def test_solved_by_pingback(self):
+        async def run():
+            async with self.receiver:
+                task = asyncio.create_task(self.solver.normal('A' * 60))
+                while not self.solver.poller.pending():
+                    await asyncio.sleep(0.01)
+
+                async with httpx.AsyncClient() as client:
+                    resp = await client.post(f'http://127.0.0.1:{self.receiver.port}/', data={'id': '123', 'code': 'abcd'})
+                    self.assertEqual(resp.status_code, 200)
+
+                    resp = await client.post(f'http://127.0.0.1:{self.receiver.port}/', data={'id': '123'})
+                    self.assertEqual(resp.status_code, 400)
+
+                return await task
+
+        self.assertEqual(asyncio.run(run()), {'captchaId': '123', 'code': 'abcd'})
+
+    def test_error_pingback(self):
+        async def run():
+            async with self.receiver:
+                task = asyncio.create_task(self.solver.normal('A' * 60))
+                while not self.solver.poller.pending():
+                    await asyncio.sleep(0.01)
+
+                async with httpx.AsyncClient() as client:
+                    await client.post(f'http://127.0.0.1:{self.receiver.port}/',
+                                      data={'id': '123', 'code': 'ERROR_CAPTCHA_UNSOLVABLE'})
+
+                return await task
+
+        with self.assertRaises(ApiException) as context:
+            asyncio.run(run())
+        self.assertIn('ERROR_CAPTCHA_UNSOLVABLE', str(context.exception))
+
+    def test_forged_pingbacks_ignored(self):
+        receiver = AsyncPingbackReceiver('https://example.com/pingback/s3cret', host='127.0.0.1', port=0, fallback=5,
+                                         token='s3cret')
+        self.solver = AsyncTwoCaptcha('API_KEY', pollingInterval=1, pingback=receiver)
+        self.solver.api_client = AsyncNotReadyApiClient()
+
+        async def run():
+            async with receiver:
+                task = asyncio.create_task(self.solver.normal('A' * 60))
+                while not self.solver.poller.pending():
+                    await asyncio.sleep(0.01)
+
+                url = f'http://127.0.0.1:{receiver.port}/pingback/'
+                async with httpx.AsyncClient() as client:
+                    resp = await client.post(url + 'guess', data={'id': '123', 'code': 'forged'})
+                    self.assertEqual(resp.status_code, 403)
+
+                    # unknown captchas are ignored
+                    resp = await client.post(url + 's3cret', data={'id': '456', 'code': 'forged'})
+                    self.assertEqual(resp.status_code, 200)
+                    self.assertIsNone(receiver.claim('456'))
+
+                    resp = await client.post(url + 's3cret', data={'id': '123', 'code': 'abcd'})
+                    self.assertEqual(resp.status_code, 200)
+
+                return await task
+
+        self.assertEqual(asyncio.run(run()), {'captchaId': '123', 'code': 'abcd'})
+
+    def test_fallback_to_polling(self):
+        self.receiver.fallback = 0.1
+        self.solver.api_client = AsyncApiClient()
+
+        self.assertEqual(asyncio.run(self.solver.normal('A' * 60))['code'], 'abcd')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+import asyncio
+import unittest
+
+try:
+    from .abstract_async import AsyncAbstractTest
+except ImportError:
+    from abstract_async import AsyncAbstractTest
+
+from twocaptcha.exceptions.api import ApiException, NetworkException
+
+
+class AsyncBulkApiClient():
+    def __init__(self, answers):
+        self.answers = answers
+        self.ready = True
+        self.min_batch = 1
+        self.failures = 0
+        self.requests = []
+
+    def answer(self, id_, batch=1):
+        return self.answers[id_] if self.ready and batch >= self.min_batch else 'CAPCHA_NOT_READY'
+
+    async def res(self, **kwargs):
+        self.requests.append(kwargs)
+
+        if self.failures:
+            self.failures -= 1
+            raise NetworkException('bad response: 502', status_code=502)
+
+        if 'ids' in kwargs:
+            ids = kwargs['ids'].split(',')
+            resp = '|'.join(self.answer(id_, len(ids)) for id_ in ids)
+        else:
+            resp = self.answer(kwargs['id'])
+            resp = resp if resp == 'CAPCHA_NOT_READY' or resp.startswith('ERROR') else 'OK|' + resp
+
+        if 'ERROR' in resp:
+            raise ApiException(resp)
+
+        return resp
+
+
+class AsyncPollerTest(AsyncAbstractTest):
+    def test_fetch_batched(self):
+        self.solver.api_client = AsyncBulkApiClient({'1': 'abcd', '2': 'CAPCHA_NOT_READY', '3': 'efgh'})
+
+        answers, errors = asyncio.run(self.solver.poller.fetch(['1', '2', '3']))
+
+        self.assertEqual(answers, {'1': 'abcd', '3': 'efgh'})
+        self.assertEqual(errors, {})
+        self.assertEqual(self.solver.api_client.requests[0]['ids'], '1,2,3')
+
+    def test_fetch_fallback_on_error(self):
+        self.solver.api_client = AsyncBulkApiClient({'1': 'ERROR_CAPTCHA_UNSOLVABLE', '2': 'a|b'})
+
+        answers, errors = asyncio.run(self.solver.poller.fetch(['1', '2']))
+
+        self.assertEqual(answers, {'2': 'a|b'})
+        self.assertIsInstance(errors['1'], ApiException)
+
+    def test_batch_rescheduled_after_network_error(self):
+        self.solver.retry_policy.backoff = 0.01
+        ids = [str(i) for i in range(20)]
+        api_client = self.solver.api_client = AsyncBulkApiClient({id_: 'code' + id_ for id_ in ids})
+        api_client.failures = 1
+
+        async def run():
+            return await asyncio.gather(*(self.solver.wait_result(id_, 5, 0.1) for id_ in ids))
+
+        self.assertEqual(asyncio.run(run()), ['code' + id_ for id_ in ids])
+        # the failed batch is looked up again as a batch, not captcha by captcha
+        self.assertEqual(len(api_client.requests), 2)
+
+    def test_waiters_share_lookup(self):
+        ids = ['1', '2', '3']
+        api_client = self.solver.api_client = AsyncBulkApiClient({id_: 'code' + id_ for id_ in ids})
+        api_client.min_batch = len(ids)
+
+        async def run():
+            return await asyncio.gather(*(self.solver.wait_result(id_, 5, 0.2) for id_ in ids))
+
+        results = asyncio.run(run())
+
+        self.assertEqual(results, ['code1', 'code2', 'code3'])
+        self.assertEqual(sorted(api_client.requests[-1]['ids'].split(',')), ids)
+        self.assertEqual(self.solver.poller.pending(), [])
+
+    def test_many_waiters_one_task(self):
+        ids = [str(i) for i in range(250)]
+        api_client = self.solver.api_client = AsyncBulkApiClient({id_: 'code' + id_ for id_ in ids})
+
+        async def run():
+            waiters = [asyncio.create_task(self.solver.wait_result(id_, 5, 1)) for id_ in ids]
+            await asyncio.sleep(0)
+            self.assertIsNotNone(self.solver.poller._task)
+            return await asyncio.gather(*waiters)
+
+        results = asyncio.run(run())
+
+        self.assertEqual(results, ['code' + id_ for id_ in ids])
+        self.assertEqual([len(r['ids'].split(',')) for r in api_client.requests], [100, 100, 50])
+        self.assertIsNone(self.solver.poller._task)
+
+    def test_polled_by_interval(self):
+        api_client = self.solver.api_client = AsyncBulkApiClient({'fast': 'a', 'slow': 'b'})
+        api_client.ready = False
+        self.solver.poller.jitter = 0
+
+        async def run():
+            waiters = [self.solver.wait_result('fast', 0.5, 0.1), self.solver.wait_result('slow', 0.5, 1)]
+            return await asyncio.gather(*waiters, return_exceptions=True)
+
+        asyncio.run(run())
+
+        polled = [r.get('id') or r['ids'] for r in api_client.requests]
+        self.assertGreater(sum('fast' in p for p in polled), 3)
+        self.assertEqual(sum('slow' in p for p in polled), 1)
+
+    def test_lookups_limited_by_deadline(self):
+        ids = ['1', '2']
+        api_client = self.solver.api_client = AsyncBulkApiClient({id_: 'code' + id_ for id_ in ids})
+
+        async def run():
+            return await asyncio.gather(self.solver.wait_result('1', 2, 0.1), self.solver.wait_result('2', 5, 0.1))
+
+        asyncio.run(run())
+
+        # the lookup of both captchas may last until the longest wait ends
+        self.assertGreater(api_client.requests[0]['timeout'], 2)
+        self.assertLessEqual(api_client.requests[0]['timeout'], 5)
+
+    def test_timeout(self):
+        api_client = self.solver.api_client = AsyncBulkApiClient({'1': 'abcd'})
+        api_client.ready = False
+
+        async def run():
+            with self.assertRaises(self.solver.exceptions):
+                await self.solver.wait_result('1', 0.1, 0.05)
+
+        asyncio.run(run())
+        self.assertEqual(self.solver.poller.pending(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
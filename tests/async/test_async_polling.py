@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import asyncio
+import unittest
+
+try:
+    from .abstract_async import AsyncAbstractTest
+except ImportError:
+    from abstract_async import AsyncAbstractTest
+
+from twocaptcha import AsyncTwoCaptcha
+from twocaptcha.polling import AdaptivePolling
+
+
+class AsyncSolverPollingTest(AsyncAbstractTest):
+    def test_solve_times_recorded(self):
+        async def run():
+            await self.solver.normal('A' * 60)
+            await self.solver.text('What is 2+2?')
+
+        asyncio.run(run())
+
+        self.assertEqual(set(self.solver.polling_policy.stats()), {'base64', 'post'})
+
+    def test_first_poll_delayed(self):
+        self.solver.polling_policy = AdaptivePolling(min_samples=1)
+        self.solver.polling_policy.record('post', 0.3)
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            await self.solver.text('What is 2+2?')
+            return loop.time() - started
+
+        self.assertGreaterEqual(asyncio.run(run()), 0.3)
+
+    def test_options(self):
+        self.assertIsInstance(AsyncTwoCaptcha('API_KEY', adaptivePolling=True).polling_policy, AdaptivePolling)
+
+
+if __name__ == '__main__':
+    unittest.main()
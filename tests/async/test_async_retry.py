@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+import asyncio
+import io
+import unittest
+
+try:
+    from .abstract_async import AsyncAbstractTest
+except ImportError:
+    from abstract_async import AsyncAbstractTest
+
+from twocaptcha.exceptions import api
+
+
+class AsyncFlakyApiClient():
+    def __init__(self, *failures):
+        self.failures = list(failures)
+        self.requests = 0
+
+    def fail(self):
+        self.requests += 1
+        if self.failures:
+            failure = self.failures.pop(0)
+            if isinstance(failure, Exception):
+                raise failure
+            return failure
+
+    async def in_(self, files={}, **kwargs):
+        file = kwargs.get('file')
+        self.content = file.read() if hasattr(file, 'read') else None
+        return self.fail() or 'OK|123'
+
+    async def res(self, **kwargs):
+        return self.fail() or 'OK|abcd'
+
+
+class AsyncSolverRetryTest(AsyncAbstractTest):
+    def setUp(self):
+        super().setUp()
+        self.solver.retry_policy.backoff = 0
+
+    def test_send_retried(self):
+        self.solver.api_client = AsyncFlakyApiClient(api.ApiException('ERROR_NO_SLOT_AVAILABLE'),
+                                                     api.NetworkException('bad response: 500', status_code=500))
+
+        self.assertEqual(asyncio.run(self.solver.send(method='post')), '123')
+        self.assertEqual(self.solver.api_client.requests, 3)
+
+    def test_fatal_not_retried(self):
+        self.solver.api_client = AsyncFlakyApiClient(api.ApiException('ERROR_WRONG_USER_KEY'))
+
+        with self.assertRaises(api.ApiException):
+            asyncio.run(self.solver.send(method='post'))
+        self.assertEqual(self.solver.api_client.requests, 1)
+
+    def test_send_not_resent_after_read_timeout(self):
+        self.solver.api_client = AsyncFlakyApiClient(api.NetworkException('request timed out after 60 seconds'))
+
+        with self.assertRaises(api.NetworkException):
+            asyncio.run(self.solver.send(method='post'))
+        self.assertEqual(self.solver.api_client.requests, 1)
+
+    def test_res_retried(self):
+        self.solver.api_client = AsyncFlakyApiClient(api.ApiException('ERROR_TOO_MUCH_REQUESTS'))
+
+        self.assertEqual(asyncio.run(self.solver.get_result('123')), 'abcd')
+        self.assertEqual(self.solver.api_client.requests, 2)
+
+    def test_file_object_rewound(self):
+        api_client = self.solver.api_client = AsyncFlakyApiClient(api.ApiException('ERROR_NO_SLOT_AVAILABLE'))
+
+        result = asyncio.run(self.solver.normal(io.BytesIO(b'image')))
+
+        self.assertEqual(result['code'], 'abcd')
+        self.assertEqual(api_client.content, b'image')
+        self.assertEqual(api_client.requests, 3)
+
+    def test_async_iterable_not_retried(self):
+        async def image():
+            yield b'image'
+
+        api_client = self.solver.api_client = AsyncFlakyApiClient(api.ApiException('ERROR_NO_SLOT_AVAILABLE'))
+
+        with self.assertRaises(api.ApiException):
+            asyncio.run(self.solver.normal(image()))
+        self.assertEqual(api_client.requests, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
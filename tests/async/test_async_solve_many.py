@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+import asyncio
+import itertools
+import unittest
+
+try:
+    from .abstract_async import AsyncAbstractTest
+except ImportError:
+    from abstract_async import AsyncAbstractTest
+
+
+class AsyncCountingApiClient():
+    def __init__(self):
+        self.ids = itertools.count(1)
+        self.sent = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def in_(self, files={}, **kwargs):
+        id_ = str(next(self.ids))
+        self.sent[id_] = kwargs
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return 'OK|' + id_
+
+    async def res(self, **kwargs):
+        if 'ids' in kwargs:
+            return '|'.join('code' + id_ for id_ in kwargs['ids'].split(','))
+        return 'OK|code' + kwargs['id']
+
+
+class AsyncSolveManyTest(AsyncAbstractTest):
+    def setUp(self):
+        super().setUp()
+        self.solver.api_client = AsyncCountingApiClient()
+
+    def collect(self, tasks, **kwargs):
+        async def run():
+            return [r async for r in self.solver.solve_many(tasks, **kwargs)]
+
+        return asyncio.run(run())
+
+    def test_results(self):
+        tasks = [('text', {'text': f'question {i}'}) for i in range(50)]
+
+        results = self.collect(tasks, concurrency=10)
+
+        self.assertEqual(sorted(r.index for r in results), list(range(50)))
+        self.assertTrue(all(r.ok for r in results))
+        self.assertLessEqual(self.solver.api_client.max_in_flight, 10)
+
+        sent = self.solver.api_client.sent
+        for r in results:
+            self.assertEqual(sent[r.result['captchaId']]['textcaptcha'], f'question {r.index}')
+            self.assertEqual(r.result['code'], 'code' + r.result['captchaId'])
+
+    def test_async_iterable_and_errors(self):
+        async def tasks():
+            yield {'method': 'normal', 'file': 'lost_file'}
+            yield 'text', {'text': 'What is 2+2?'}
+
+        results = sorted(self.collect(tasks()), key=lambda r: r.index)
+
+        self.assertIsInstance(results[0].error, self.solver.exceptions)
+        self.assertEqual(results[1].result['code'], 'code1')
+
+
+if __name__ == '__main__':
+    unittest.main()
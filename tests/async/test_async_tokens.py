@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+import asyncio
+import unittest
+
+try:
+    from .abstract_async import AsyncAbstractTest
+    from .test_async_solve_many import AsyncCountingApiClient
+except ImportError:
+    from abstract_async import AsyncAbstractTest
+    from test_async_solve_many import AsyncCountingApiClient
+
+from twocaptcha import AsyncTokenPool, TimeoutException
+
+
+class AsyncNotReadyApiClient(AsyncCountingApiClient):
+    async def res(self, **kwargs):
+        return 'CAPCHA_NOT_READY'
+
+
+class AsyncTokenPoolTest(AsyncAbstractTest):
+    def setUp(self):
+        super().setUp()
+        self.solver.api_client = AsyncCountingApiClient()
+
+    def test_tokens_solved_ahead(self):
+        async def run():
+            async with AsyncTokenPool(self.solver, size=2) as pool:
+                first = await pool.acquire('hcaptcha', 'sitekey', 'https://site.com', timeout=5)
+                while pool.stats()['ready'].get(('hcaptcha', 'sitekey', 'https://site.com'), 0) < 2:
+                    await asyncio.sleep(0.01)
+                second = await pool.acquire('hcaptcha', 'sitekey', 'https://site.com', timeout=5)
+                return first, second, pool.stats()
+
+        first, second, stats = asyncio.run(run())
+
+        self.assertNotEqual(first['code'], second['code'])
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(self.solver.api_client.sent['1']['method'], 'hcaptcha')
+
+    def test_expired_tokens_replaced(self):
+        async def run():
+            async with AsyncTokenPool(self.solver, size=1, ttl=0.1) as pool:
+                await pool.acquire('hcaptcha', 'sitekey', 'https://site.com', timeout=5)
+                await asyncio.sleep(0.5)
+
+        asyncio.run(run())
+        self.assertGreaterEqual(len(self.solver.api_client.sent), 4)
+
+    def test_timeout(self):
+        self.solver.api_client = AsyncNotReadyApiClient()
+
+        async def run():
+            async with AsyncTokenPool(self.solver) as pool:
+                with self.assertRaises(TimeoutException):
+                    await pool.acquire('hcaptcha', 'sitekey', 'https://site.com', timeout=0.1)
+
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+import io
+import unittest
+
+from twocaptcha import TwoCaptcha, AccountPool
+from twocaptcha.exceptions.api import ApiException
+from twocaptcha.exceptions.solver import ValidationException
+from twocaptcha.mock_server import MockServer
+from twocaptcha.retry import RetryPolicy
+
+
+class AccountPoolTest(unittest.TestCase):
+    def setUp(self):
+        # one server per account: a captcha polled with another key than the one it was sent with fails
+        self.mocks = {}
+        for key, balance in (('KEY-AAAA', 1), ('KEY-BBBB', 50)):
+            mock = self.mocks[key] = MockServer(api_key=key, balance=balance, seed=1)
+            mock.start()
+            self.addCleanup(mock.stop)
+
+    def pool(self, **options):
+        solvers = []
+        for key, mock in self.mocks.items():
+            solver = TwoCaptcha(key, pollingInterval=1, server=mock.url)
+            solver.retry_policy = RetryPolicy(backoff=0.01)
+            solvers.append(solver)
+
+        pool = AccountPool(solvers, **options)
+        self.addCleanup(pool.close)
+        return pool
+
+    def captchas(self):
+        return {key: mock.stats()['captchas'] for key, mock in self.mocks.items()}
+
+    def test_spreads_captchas_in_flight(self):
+        pool = self.pool(balanceInterval=None)
+
+        futures = [pool.submit('normal', file=b'image %d' % i) for i in range(4)]
+
+        self.assertEqual({future.result(10)['code'] for future in futures}, {'abcd'})
+        self.assertEqual(self.captchas(), {'KEY-AAAA': 2, 'KEY-BBBB': 2})
+
+        stats = pool.stats()
+        self.assertEqual([account['key'] for account in stats], ['...AAAA', '...BBBB'])
+        self.assertEqual([account['results'] for account in stats], [2, 2])
+        self.assertEqual([account['in_flight'] for account in stats], [0, 0])
+
+    def test_prefers_higher_balance(self):
+        pool = self.pool()
+        pool.refresh_balances()
+
+        for i in range(3):
+            pool.normal(b'image %d' % i)
+
+        self.assertEqual(self.captchas(), {'KEY-AAAA': 0, 'KEY-BBBB': 3})
+        self.assertEqual([account['balance'] for account in pool.stats()], [1, 50])
+        self.assertEqual(pool.balance(), 51)
+
+    def test_min_balance(self):
+        pool = self.pool(minBalance=5)
+        pool.refresh_balances()
+
+        futures = [pool.submit('normal', file=b'image %d' % i) for i in range(3)]
+        for future in futures:
+            future.result(10)
+
+        self.assertEqual(self.captchas(), {'KEY-AAAA': 0, 'KEY-BBBB': 3})
+
+    def test_failover_on_account_error(self):
+        pool = self.pool(balanceInterval=None)
+        self.mocks['KEY-AAAA'].inject('ERROR_ZERO_BALANCE')
+
+        result = pool.normal(b'image')
+        self.assertEqual(result['code'], 'abcd')
+        self.assertEqual(self.captchas(), {'KEY-AAAA': 0, 'KEY-BBBB': 1})
+
+        first, second = pool.stats()
+        self.assertEqual(first['errors'], 1)
+        self.assertEqual(first['balance'], 0)
+        self.assertTrue(first['disabled'])
+
+        # the account is skipped afterwards
+        pool.submit('normal', file=b'image 2').result(10)
+        self.assertEqual(self.captchas(), {'KEY-AAAA': 0, 'KEY-BBBB': 2})
+
+    def test_failover_of_submitted_captchas(self):
+        pool = self.pool(balanceInterval=None)
+        self.mocks['KEY-AAAA'].inject('ERROR_KEY_DOES_NOT_EXIST')
+
+        self.assertEqual(pool.submit('normal', file=b'image').result(10)['code'], 'abcd')
+        self.assertEqual(self.captchas(), {'KEY-AAAA': 0, 'KEY-BBBB': 1})
+
+    def test_failover_rewinds_files(self):
+        pool = self.pool(balanceInterval=None)
+        self.mocks['KEY-AAAA'].inject('ERROR_ZERO_BALANCE')
+        file = io.BytesIO(b'header image')
+        file.seek(7)
+
+        self.assertEqual(pool.normal(file)['code'], 'abcd')
+        self.assertEqual(self.mocks['KEY-BBBB'].captchas()[0]['file'], b'image')
+
+        self.mocks['KEY-BBBB'].inject('ERROR_ZERO_BALANCE')
+        file.seek(7)
+
+        self.assertEqual(pool.submit('normal', file=file).result(10)['code'], 'abcd')
+        self.assertEqual(self.mocks['KEY-AAAA'].captchas()[0]['file'], b'image')
+
+    def test_no_failover_of_accepted_captchas(self):
+        pool = self.pool(balanceInterval=None)
+        # the key is refused while the answer is polled, the captcha was paid for already
+        self.mocks['KEY-AAAA'].inject('ERROR_WRONG_USER_KEY', endpoint='res')
+
+        with self.assertRaises(ApiException):
+            pool.normal(b'image')
+
+        self.assertEqual(self.captchas(), {'KEY-AAAA': 1, 'KEY-BBBB': 0})
+        self.assertTrue(pool.stats()[0]['disabled'])
+
+    def test_captcha_errors_are_raised(self):
+        pool = self.pool(balanceInterval=None)
+        self.mocks['KEY-AAAA'].inject('ERROR_CAPTCHA_UNSOLVABLE', endpoint='res')
+
+        with self.assertRaises(ApiException):
+            pool.normal(b'image')
+
+        self.assertEqual(pool.stats()[0]['error_rate'], 1)
+        self.assertFalse(pool.stats()[0]['disabled'])
+
+        # the account that failed counts as busier
+        pool.normal(b'image 2')
+        self.assertEqual(self.captchas(), {'KEY-AAAA': 1, 'KEY-BBBB': 1})
+
+    def test_send_and_report_with_the_same_account(self):
+        pool = self.pool(balanceInterval=None)
+
+        ids = [pool.send(method='post', file=b'image %d' % i) for i in range(2)]
+
+        self.assertEqual([pool.get_result(id_) for id_ in ids], ['abcd', 'abcd'])
+        self.assertEqual(pool.report(ids[1], True), 'OK_REPORT_RECORDED')
+
+        with self.assertRaises(ValidationException):
+            pool.report('unknown', True)
+
+    def test_solve_many(self):
+        pool = self.pool(balanceInterval=None)
+
+        results = list(pool.solve_many([('normal', {'file': b'image %d' % i}) for i in range(6)], concurrency=6))
+
+        self.assertEqual([result.error for result in results], [None] * 6)
+        self.assertEqual(self.captchas(), {'KEY-AAAA': 3, 'KEY-BBBB': 3})
+
+    def test_keys(self):
+        pool = AccountPool(['KEY-1', 'KEY-2'], server=self.mocks['KEY-AAAA'].url, pollingInterval=5)
+        self.addCleanup(pool.close)
+
+        self.assertEqual([solver.API_KEY for solver in pool.solvers], ['KEY-1', 'KEY-2'])
+        self.assertEqual({solver.polling_interval for solver in pool.solvers}, {5})
+
+        with self.assertRaises(ValidationException):
+            AccountPool([])
+        with self.assertRaises(ValidationException):
+            AccountPool([TwoCaptcha('KEY-1', journal=':memory:')])
+
+
+if __name__ == '__main__':
+    unittest.main()
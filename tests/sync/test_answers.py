@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+import base64
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import wait
+
+try:
+    from .abstract import AbstractTest
+    from .test_solve_many import CountingApiClient
+except ImportError:
+    from abstract import AbstractTest
+    from test_solve_many import CountingApiClient
+
+from twocaptcha.exceptions.api import ApiException
+from twocaptcha.answers import AnswerCache, MemoryStorage, SqliteStorage, answer_key
+
+
+class FailingApiClient(CountingApiClient):
+    def in_(self, files={}, **kwargs):
+        super().in_(files, **kwargs)
+        raise ApiException('ERROR_ZERO_BALANCE')
+
+
+class PendingApiClient(CountingApiClient):
+    def __init__(self):
+        super().__init__()
+        self.ready = threading.Event()
+        self.lookups = 0
+
+    def res(self, **kwargs):
+        self.lookups += 1
+        return super().res(**kwargs) if self.ready.is_set() else 'CAPCHA_NOT_READY'
+
+
+class AnswerCacheTest(AbstractTest):
+    def setUp(self):
+        super().setUp()
+        self.solver.api_client = CountingApiClient()
+        self.solver.answer_cache = AnswerCache()
+
+    def test_identical_images_solved_once(self):
+        first = self.solver.normal(b'\x89PNG image')
+        second = self.solver.normal(bytearray(b'\x89PNG image'))
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.solver.api_client.sent), 1)
+        self.assertEqual(self.solver.answer_cache.stats(), {'hits': 1, 'misses': 1, 'coalesced': 0})
+
+    def test_options_in_key(self):
+        self.solver.normal(b'\x89PNG image')
+        self.solver.normal(b'\x89PNG image', numeric=1)
+        self.solver.normal(b'\x89PNG image', numeric=1, timeout=30)
+
+        self.assertEqual(len(self.solver.api_client.sent), 2)
+
+    def test_file_and_base64_share_answer(self):
+        path = os.path.join(os.path.dirname(__file__), '..', '..', 'examples', 'images', 'normal.jpg')
+        with open(path, 'rb') as f:
+            content = f.read()
+
+        self.solver.normal(path)
+        self.solver.normal(base64.b64encode(content).decode())
+        self.solver.normal(content)
+
+        self.assertEqual(len(self.solver.api_client.sent), 1)
+
+    def test_submitted_captchas_coalesced(self):
+        futures = [self.solver.submit('normal', file=b'\x89PNG image') for _ in range(10)]
+        wait(futures, timeout=5)
+
+        self.assertEqual({f.result()['code'] for f in futures}, {'code1'})
+        self.assertEqual(len(self.solver.api_client.sent), 1)
+
+    def test_cancelled_caller_detaches(self):
+        api_client = self.solver.api_client = PendingApiClient()
+        first = self.solver.submit('normal', file=b'\x89PNG image')
+        while not api_client.sent:
+            time.sleep(0.01)
+        second = self.solver.submit('normal', file=b'\x89PNG image')
+        while self.solver.answer_cache.stats()['coalesced'] < 1:
+            time.sleep(0.01)
+
+        # the captcha sent for the first caller goes on being polled for the second one
+        first.cancel()
+        api_client.ready.set()
+
+        self.assertEqual(second.result(5)['code'], 'code1')
+        self.assertEqual(len(api_client.sent), 1)
+
+    def test_solve_cancelled_with_last_caller(self):
+        api_client = self.solver.api_client = PendingApiClient()
+        futures = [self.solver.submit('normal', file=b'\x89PNG image') for _ in range(2)]
+        while self.solver.answer_cache.stats()['coalesced'] < 1 or not self.solver.poller.pending():
+            time.sleep(0.01)
+
+        for future in futures:
+            future.cancel()
+
+        self.assertEqual(self.solver.answer_cache._in_flight, {})
+        self.assertEqual(self.solver.poller.pending(), [])
+
+    def test_errors_not_cached(self):
+        self.solver.api_client = FailingApiClient()
+        self.assertRaises(ApiException, self.solver.normal, b'\x89PNG image')
+        self.assertRaises(ApiException, self.solver.normal, b'\x89PNG image')
+
+        self.assertEqual(self.solver.answer_cache.stats()['misses'], 2)
+        self.assertEqual(self.solver.answer_cache._in_flight, {})
+
+    def test_report_bad_discards(self):
+        result = self.solver.normal(b'\x89PNG image')
+        self.solver.report(result['captchaId'], False)
+        self.solver.normal(b'\x89PNG image')
+
+        self.assertEqual(len(self.solver.api_client.sent), 2)
+
+    def test_ttl(self):
+        self.solver.answer_cache = AnswerCache(ttl=0)
+        self.solver.normal(b'\x89PNG image')
+        self.solver.normal(b'\x89PNG image')
+
+        self.assertEqual(len(self.solver.api_client.sent), 2)
+
+    def test_disabled_with_callback(self):
+        self.solver.callback = 'https://your.site/pingback'
+        self.solver.normal(b'\x89PNG image')
+        self.solver.normal(b'\x89PNG image')
+
+        self.assertEqual(len(self.solver.api_client.sent), 2)
+
+
+class AnswerCacheCoalescingTest(unittest.TestCase):
+    def test_concurrent_calls_share_one_solve(self):
+        cache = AnswerCache()
+        started, release = threading.Event(), threading.Event()
+        calls, results = [], []
+
+        def solve():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {'captchaId': '1', 'code': 'abcd'}
+
+        owner = threading.Thread(target=lambda: results.append(cache.call('key', solve)))
+        owner.start()
+        started.wait(5)
+
+        waiters = [threading.Thread(target=lambda: results.append(cache.call('key', solve))) for _ in range(5)]
+        for thread in waiters:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in [owner] + waiters:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'captchaId': '1', 'code': 'abcd'}] * 6)
+        self.assertEqual(cache.stats(), {'hits': 0, 'misses': 1, 'coalesced': 5})
+
+    def test_failure_shared_with_waiters(self):
+        cache = AnswerCache()
+        future, solves = cache._join('key')
+        waiter, _ = cache._join('key')
+        cache._settle('key', future, error=ValueError('unsolvable'))
+
+        self.assertIsInstance(waiter.exception(), ValueError)
+        self.assertIsNone(cache.storage.get('key'))
+
+
+class StorageTest(unittest.TestCase):
+    def test_answer_key(self):
+        self.assertEqual(answer_key(b'image', {'numeric': 1, 'lang': 'en'}),
+                         answer_key(memoryview(b'image'), {'lang': 'en', 'numeric': 1}))
+        self.assertNotEqual(answer_key(b'image', {}), answer_key(b'image', {'hintImg': b'hint'}))
+        self.assertIsNone(answer_key(b'image', {'hintImg': object()}))
+
+    def test_memory_lru(self):
+        storage = MemoryStorage(max_entries=2)
+        for key in ('a', 'b'):
+            storage.set(key, {'captchaId': key}, time.time() + 60)
+        storage.get('a')
+        storage.set('c', {'captchaId': 'c'}, time.time() + 60)
+
+        self.assertIsNone(storage.get('b'))
+        self.assertEqual(storage.get('a'), {'captchaId': 'a'})
+
+    def test_sqlite(self):
+        path = os.path.join(tempfile.mkdtemp(), 'answers.db')
+        storage = SqliteStorage(path, max_entries=2)
+        storage.set('a', {'captchaId': '1', 'code': 'abcd'}, time.time() + 60)
+        storage.set('b', {'captchaId': '2', 'code': 'efgh'}, time.time() + 60)
+        storage.set('expired', {'captchaId': '3', 'code': 'ijkl'}, time.time() - 1)
+        storage.close()
+
+        storage = SqliteStorage(path, max_entries=2)
+        self.addCleanup(storage.close)
+        self.assertIsNone(storage.get('a'))
+        self.assertEqual(storage.get('b'), {'captchaId': '2', 'code': 'efgh'})
+        self.assertIsNone(storage.get('expired'))
+
+        storage.discard('2')
+        self.assertIsNone(storage.get('b'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+
+import array
+import io
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+from urllib3.util import Timeout
+
+try:
+    from .abstract import AbstractTest
+except ImportError:
+    from abstract import AbstractTest
+
+from twocaptcha.api import ApiClient
+from twocaptcha.exceptions.api import NetworkException
+from twocaptcha.images import ImageCache
+from twocaptcha.timeouts import RequestTimeout
+
+
+def response(content=b'OK|123', status_code=200):
+    resp = mock.Mock()
+    resp.status_code = status_code
+    resp.content = content
+    return resp
+
+
+def timeout(call):
+    # urllib3's Timeout has no equality
+    return str(call.kwargs['timeout'])
+
+
+class ApiClientSessionTest(unittest.TestCase):
+    def setUp(self):
+        self.client = ApiClient(pool_maxsize=4)
+        self.addCleanup(self.client.close)
+
+    def test_session_reused(self):
+        with mock.patch.object(requests.Session, 'post', autospec=True, return_value=response()) as post, \
+                mock.patch.object(requests.Session, 'get', autospec=True, return_value=response(b'OK|abcd')) as get:
+            self.client.in_(method='post', key='API_KEY')
+            self.client.res(action='get', id='123')
+            self.client.res(action='get', id='123')
+
+        sessions = {call.args[0] for call in post.call_args_list + get.call_args_list}
+        self.assertEqual(len(sessions), 1)
+
+    def test_pool_shared_between_threads(self):
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(self.client.session))
+        thread.start()
+        thread.join()
+
+        self.assertIsNot(sessions[0], self.client.session)
+        self.assertIs(sessions[0].get_adapter('https://2captcha.com'),
+                      self.client.session.get_adapter('https://2captcha.com'))
+        self.assertEqual(self.client.session.get_adapter('https://2captcha.com')._pool_maxsize, 4)
+
+    def test_close(self):
+        session = self.client.session
+        adapter = session.get_adapter('https://2captcha.com')
+
+        with mock.patch.object(adapter, 'close') as close:
+            self.client.close()
+
+        close.assert_called_once()
+        self.assertIsNot(self.client.session, session)
+
+    def test_context_manager(self):
+        with mock.patch.object(ApiClient, 'close') as close:
+            with ApiClient() as client:
+                self.assertIsInstance(client, ApiClient)
+
+        close.assert_called_once()
+
+    def test_keep_alive_disabled(self):
+        client = ApiClient(keep_alive=False)
+        self.assertEqual(client.session.headers['Connection'], 'close')
+
+
+class ApiClientTimeoutTest(unittest.TestCase):
+    def test_default_timeouts(self):
+        client = ApiClient()
+
+        with mock.patch.object(requests.Session, 'post', autospec=True, return_value=response()) as post, \
+                mock.patch.object(requests.Session, 'get', autospec=True, return_value=response(b'OK|abcd')) as get:
+            client.in_(method='post', key='API_KEY')
+            client.res(action='get', id='123')
+
+        self.assertEqual(timeout(post.call_args), str(Timeout(connect=10, read=60, total=180)))
+        self.assertEqual(timeout(get.call_args), str(Timeout(connect=10, read=30, total=60)))
+
+    def test_timeouts_capped(self):
+        client = ApiClient(upload_timeout=RequestTimeout(connect=5, read=100, total=20), poll_timeout=None)
+
+        with mock.patch.object(requests.Session, 'post', autospec=True, return_value=response()) as post, \
+                mock.patch.object(requests.Session, 'get', autospec=True, return_value=response(b'OK|abcd')) as get:
+            client.in_(method='post', key='API_KEY')
+            client.in_(method='post', key='API_KEY', timeout=3)
+            client.res(action='get', id='123')
+            client.res(action='get', id='123', timeout=3)
+
+        self.assertEqual([timeout(call) for call in post.call_args_list],
+                         [str(Timeout(connect=5, read=20, total=20)), str(Timeout(connect=3, read=3, total=3))])
+        self.assertEqual([timeout(call) for call in get.call_args_list],
+                         [str(Timeout(connect=None, read=None, total=None)), str(Timeout(connect=3, read=3, total=3))])
+        self.assertNotIn('timeout', get.call_args.kwargs['params'])
+
+    def test_timeout_raises_network_exception(self):
+        client = ApiClient(poll_timeout=1)
+
+        with mock.patch.object(requests.Session, 'get', autospec=True, side_effect=requests.ReadTimeout('timed out')):
+            self.assertRaises(NetworkException, client.res, action='get', id='123')
+
+    def test_request_timeout_of(self):
+        timeout = RequestTimeout.of(5)
+        self.assertEqual((timeout.connect, timeout.read, timeout.total), (5, 5, 5))
+        timeout = RequestTimeout.of(None)
+        self.assertEqual((timeout.connect, timeout.read, timeout.total), (None, None, None))
+
+
+class ApiClientUploadTest(unittest.TestCase):
+    def upload(self, **files):
+        with mock.patch.object(requests.Session, 'post', autospec=True, return_value=response()) as post:
+            ApiClient().in_(files=files, method='post', key='API_KEY')
+
+        kwargs = post.call_args.kwargs
+        return requests.Request('POST', 'https://2captcha.com/in.php', data=kwargs['data'],
+                                files=kwargs['files']).prepare().body
+
+    def test_buffers_sent_as_binary_parts(self):
+        body = self.upload(file_1=b'\x89PNG one', file_2=bytearray(b'two'), file_3=memoryview(b'three'),
+                           file_4=io.BytesIO(b'four'), file_5=array.array('B', b'five'))
+
+        for content in (b'\x89PNG one', b'two', b'three', b'four', b'five'):
+            self.assertIn(b'\r\n\r\n' + content + b'\r\n', body)
+        self.assertNotIn(b'base64', body)
+
+    def test_buffer_not_copied(self):
+        content = bytearray(b'image')
+
+        with mock.patch.object(requests.Session, 'post', autospec=True, return_value=response()) as post:
+            ApiClient().in_(file=content, method='post')
+
+        name, part = post.call_args.kwargs['files']['file']
+        self.assertIs(part.obj, content)
+
+
+def download_response(chunks=(b'\x89PNG', b' image'), status_code=200, headers={}):
+    resp = mock.MagicMock()
+    resp.__enter__.return_value = resp
+    resp.status_code = status_code
+    resp.headers = headers
+    resp.iter_content.return_value = iter(chunks)
+    return resp
+
+
+class ApiClientDownloadTest(unittest.TestCase):
+    def test_download(self):
+        resp = download_response(headers={'ETag': '"v1"'})
+
+        with mock.patch.object(requests.Session, 'get', autospec=True, return_value=resp) as get:
+            content, etag = ApiClient().download('https://example.com/captcha.png', max_size=100)
+
+        self.assertEqual((content, etag), (b'\x89PNG image', '"v1"'))
+        self.assertTrue(get.call_args.kwargs['stream'])
+        self.assertEqual(timeout(get.call_args), str(Timeout(connect=10, read=60, total=180)))
+        self.assertEqual(get.call_args.kwargs['headers'], {})
+
+    def test_not_modified(self):
+        resp = download_response(status_code=304)
+
+        with mock.patch.object(requests.Session, 'get', autospec=True, return_value=resp) as get:
+            result = ApiClient().download('https://example.com/captcha.png', etag='"v1"')
+
+        self.assertEqual(result, (None, '"v1"'))
+        self.assertEqual(get.call_args.kwargs['headers'], {'If-None-Match': '"v1"'})
+
+    def test_max_size(self):
+        too_long = download_response(headers={'Content-Length': '101'})
+        chunked = download_response(chunks=[b'x' * 60] * 2)
+
+        with mock.patch.object(requests.Session, 'get', autospec=True, side_effect=[too_long, chunked]):
+            client = ApiClient()
+            self.assertRaises(NetworkException, client.download, 'https://example.com/a.png', max_size=100)
+            self.assertRaises(NetworkException, client.download, 'https://example.com/b.png', max_size=100)
+
+        self.assertEqual(next(too_long.iter_content.return_value), b'\x89PNG')
+
+    def test_total_timeout(self):
+        def chunks():
+            for _ in range(3):
+                time.sleep(0.1)
+                yield b'x'
+
+        client = ApiClient(upload_timeout=RequestTimeout(read=5, total=0.15))
+        with mock.patch.object(requests.Session, 'get', autospec=True, return_value=download_response(chunks=chunks())):
+            self.assertRaises(NetworkException, client.download, 'https://example.com/captcha.png')
+
+    def test_bad_response(self):
+        with mock.patch.object(requests.Session, 'get', autospec=True, return_value=download_response(status_code=404)):
+            with self.assertRaises(NetworkException) as e:
+                ApiClient().download('https://example.com/captcha.png')
+
+        self.assertEqual(e.exception.status_code, 404)
+
+
+class SolverDownloadTest(AbstractTest):
+    def setUp(self):
+        super().setUp()
+        self.solver.api_client.download = mock.Mock(return_value=(b'\x89PNG image', '"v1"'))
+
+    def test_url_sent_as_binary_part(self):
+        self.solver.normal('https://example.com/captcha.png')
+
+        self.assertEqual(self.solver.api_client.incomings['file'], b'\x89PNG image')
+        self.assertEqual(self.solver.api_client.incomings['method'], 'post')
+        self.solver.api_client.download.assert_called_once_with('https://example.com/captcha.png',
+                                                                max_size=10 * 1024 * 1024, etag=None)
+
+    def test_cache_revalidated_with_etag(self):
+        self.solver.image_cache = ImageCache(2)
+
+        self.assertEqual(self.solver.download('https://example.com/captcha.png'), b'\x89PNG image')
+        self.solver.api_client.download.return_value = (None, '"v1"')
+        self.assertEqual(self.solver.download('https://example.com/captcha.png'), b'\x89PNG image')
+
+        self.assertEqual(self.solver.api_client.download.call_args.kwargs['etag'], '"v1"')
+
+    def test_cache_eviction(self):
+        cache = ImageCache(2)
+        for url in ('a', 'b', 'c'):
+            cache.put(url, '"v1"', b'image')
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('a'))
+
+    def test_download_error(self):
+        self.solver.api_client.download.side_effect = NetworkException('image exceeds the limit of 100 bytes')
+        self.assertRaises(self.solver.exceptions, self.solver.normal, 'https://example.com/captcha.png')
+
+
+class SolverLifecycleTest(AbstractTest):
+    def test_solver_closes_client(self):
+        with mock.patch.object(self.solver.api_client, 'close', create=True) as close:
+            with self.solver as solver:
+                self.assertIs(solver, self.solver)
+
+        close.assert_called_once()
+
+    def test_pool_options(self):
+        from twocaptcha import TwoCaptcha
+
+        solver = TwoCaptcha('API_KEY', poolSize=32, keepAlive=False, uploadTimeout=300, pollTimeout=15,
+                            maxImageSize=1024, imageCache=8)
+        self.assertEqual(solver.api_client.pool_maxsize, 32)
+        self.assertFalse(solver.api_client.keep_alive)
+        self.assertEqual(solver.api_client.upload_timeout.total, 300)
+        self.assertEqual(solver.api_client.poll_timeout.read, 15)
+        self.assertEqual(solver.max_image_size, 1024)
+        self.assertEqual(solver.image_cache.max_entries, 8)
+        self.assertIsNone(TwoCaptcha('API_KEY').image_cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+import time
+import unittest
+
+try:
+    from .abstract import AbstractTest, ApiClient
+except ImportError:
+    from abstract import AbstractTest, ApiClient
+
+from twocaptcha import TimeoutException
+
+
+class SlowApiClient(ApiClient):
+    def __init__(self, delay=0, ready=True):
+        self.delay = delay
+        self.ready = ready
+        self.timeouts = []
+
+    def in_(self, files={}, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        return super().in_(files, **kwargs)
+
+    def res(self, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        time.sleep(self.delay)
+        return super().res(**kwargs) if self.ready else 'CAPCHA_NOT_READY'
+
+
+class DeadlineTest(AbstractTest):
+    def test_timeout_not_exceeded_by_slow_lookup(self):
+        self.solver.api_client = SlowApiClient(delay=1, ready=False)
+        start = time.monotonic()
+
+        self.assertRaises(TimeoutException, self.solver.wait_result, '123', 0.2, 10)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_deadline(self):
+        self.solver.api_client = SlowApiClient(ready=False)
+        start = time.monotonic()
+
+        self.assertRaises(TimeoutException, self.solver.text, 'Question?', deadline=start + 0.3)
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.3)
+        self.assertLess(time.monotonic() - start, 0.6)
+
+    def test_deadline_caps_request_timeouts(self):
+        api_client = self.solver.api_client = SlowApiClient()
+
+        result = self.solver.text('Question?', deadline=time.monotonic() + 5)
+
+        self.assertEqual(result['code'], 'abcd')
+        self.assertEqual(len(api_client.timeouts), 2)
+        self.assertTrue(all(0 < timeout <= 5 for timeout in api_client.timeouts))
+
+    def test_deadline_exceeded_before_sending(self):
+        api_client = self.solver.api_client = SlowApiClient()
+
+        self.assertRaises(TimeoutException, self.solver.text, 'Question?', deadline=time.monotonic() - 1)
+        self.assertEqual(api_client.timeouts, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
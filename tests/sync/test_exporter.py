@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+import threading
+import unittest
+from unittest import mock
+
+import requests
+
+from twocaptcha import TwoCaptcha, MetricsCollector, PrometheusExporter
+from twocaptcha.exceptions.api import ApiException
+from twocaptcha.exporter import CONTENT_TYPE
+from twocaptcha.mock_server import MockServer
+from twocaptcha.retry import RetryPolicy
+
+
+def samples(payload):
+    # sample lines of a text exposition payload, by name and labels
+    result = {}
+    for line in payload.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            result[name] = float(value)
+    return result
+
+
+class PrometheusExporterTest(unittest.TestCase):
+    def setUp(self):
+        self.mock = MockServer(balance=12.5, seed=1)
+        self.mock.start()
+        self.addCleanup(self.mock.stop)
+
+        self.solver = TwoCaptcha('API_KEY', pollingInterval=1, server=self.mock.url)
+        self.solver.retry_policy = RetryPolicy(backoff=0.01)
+        self.addCleanup(self.solver.close)
+
+        self.exporter = PrometheusExporter(self.solver, port=0)
+
+    def test_render(self):
+        self.solver.normal(b'image 1')
+        self.solver.normal(b'image 2')
+        self.mock.inject('ERROR_CAPTCHA_UNSOLVABLE', endpoint='res')
+        with self.assertRaises(ApiException):
+            self.solver.normal(b'image 3')
+
+        self.exporter.refresh_balance()
+        payload = self.exporter.render()
+        values = samples(payload)
+
+        self.assertIn('# TYPE twocaptcha_submits_total counter', payload)
+        self.assertIn('# TYPE twocaptcha_solve_seconds histogram', payload)
+        self.assertEqual(values['twocaptcha_submits_total{method="post"}'], 3)
+        self.assertEqual(values['twocaptcha_results_total{method="post"}'], 2)
+        self.assertEqual(values['twocaptcha_errors_total{method="post",code="ERROR_CAPTCHA_UNSOLVABLE"}'], 1)
+        self.assertEqual(values['twocaptcha_solve_seconds_count{method="post"}'], 2)
+        self.assertEqual(values['twocaptcha_solve_seconds_bucket{method="post",le="+Inf"}'], 2)
+        self.assertEqual(values['twocaptcha_polls_total{method="post"}'], 3)
+        self.assertEqual(values['twocaptcha_poll_captchas_total{method="post"}'], 2)
+        self.assertEqual(values['twocaptcha_not_ready_total{method="post"}'], 0)
+        self.assertEqual(values['twocaptcha_in_flight'], 0)
+        self.assertEqual(values['twocaptcha_rate_limit_wait_seconds_total{limiter="submit"}'], 0)
+        self.assertEqual(values['twocaptcha_balance'], 12.5)
+
+    def test_balance_interval(self):
+        self.exporter.render()
+        self.exporter._balance_thread.join(5)
+        self.assertIn('twocaptcha_balance 12.5', self.exporter.render())
+        self.assertEqual(self.mock.stats()['requests']['res.php'], 1)
+
+        exporter = PrometheusExporter(self.solver, metrics=MetricsCollector(), balance_interval=None)
+        self.assertNotIn('twocaptcha_balance', exporter.render())
+        self.assertEqual(self.mock.stats()['requests']['res.php'], 1)
+
+    def test_render_doesnt_wait_for_balance(self):
+        requested = threading.Event()
+        answered = threading.Event()
+
+        def balance():
+            requested.set()
+            answered.wait(5)
+            return 3.0
+
+        with mock.patch.object(self.solver, 'balance', side_effect=balance):
+            self.assertNotIn('twocaptcha_balance', self.exporter.render())
+            self.assertTrue(requested.wait(5))
+            # scrapes during the request neither wait for it nor request the balance again
+            self.assertNotIn('twocaptcha_balance', self.exporter.render())
+
+            answered.set()
+            self.exporter._balance_thread.join(5)
+
+            self.assertIn('twocaptcha_balance 3.0', self.exporter.render())
+            self.assertEqual(self.solver.balance.call_count, 1)
+
+    def test_endpoint(self):
+        with self.exporter:
+            self.solver.normal(b'image')
+            response = requests.get(self.exporter.url, timeout=5)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.headers['Content-Type'], CONTENT_TYPE)
+            self.assertEqual(samples(response.text)['twocaptcha_submits_total{method="post"}'], 1)
+
+            self.assertEqual(requests.get(self.exporter.url.replace('/metrics', '/other'), timeout=5).status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from twocaptcha import TwoCaptcha, Hooks, MetricsCollector
+from twocaptcha.exceptions.api import ApiException
+from twocaptcha.hooks import Histogram
+from twocaptcha.mock_server import MockServer
+from twocaptcha.retry import RetryPolicy
+
+
+class Recorder(Hooks):
+    def __init__(self):
+        self.events = []
+
+    def on_submit(self, event):
+        self.events.append(('submit', event))
+
+    def on_poll(self, event):
+        self.events.append(('poll', event))
+
+    def on_result(self, event):
+        self.events.append(('result', event))
+
+    def on_error(self, event):
+        self.events.append(('error', event))
+
+    def on_retry(self, event):
+        self.events.append(('retry', event))
+
+    def of(self, name):
+        return [event for kind, event in self.events if kind == name]
+
+
+class Failing(Hooks):
+    def on_submit(self, event):
+        raise RuntimeError('broken hook')
+
+    on_poll = on_result = on_submit
+
+
+class HooksTest(unittest.TestCase):
+    def setUp(self):
+        self.mock = MockServer(seed=1)
+        self.mock.start()
+        self.addCleanup(self.mock.stop)
+
+        self.recorder = Recorder()
+        self.metrics = MetricsCollector()
+        self.solver = TwoCaptcha('API_KEY', pollingInterval=1, server=self.mock.url,
+                                 hooks=[Failing(), self.recorder, self.metrics])
+        self.solver.retry_policy = RetryPolicy(backoff=0.01)
+        self.addCleanup(self.solver.close)
+
+    def test_events(self):
+        result = self.solver.normal(b'\x89PNG image')
+
+        submit, = self.recorder.of('submit')
+        self.assertEqual(submit.method, 'post')
+        self.assertEqual(submit.captcha_id, result['captchaId'])
+        self.assertEqual(submit.attempt, 1)
+        self.assertGreaterEqual(submit.bytes_sent, len(b'\x89PNG image'))
+        self.assertGreaterEqual(submit.seconds, 0)
+
+        polls = self.recorder.of('poll')
+        self.assertTrue(polls)
+        self.assertEqual(polls[-1].ids, [result['captchaId']])
+        self.assertEqual(polls[-1].method, 'post')
+        self.assertEqual(polls[-1].ready, 1)
+
+        solved, = self.recorder.of('result')
+        self.assertEqual(solved.captcha_id, result['captchaId'])
+        self.assertEqual(solved.polls, len(polls))
+        self.assertGreaterEqual(solved.seconds, 0)
+
+        self.assertEqual(self.recorder.of('error'), [])
+
+    def test_retry(self):
+        self.mock.inject('ERROR_NO_SLOT_AVAILABLE')
+        self.solver.recaptcha(sitekey='6Le-wvkSVVABCPBMRTvw0Q4Muexq1bi0DJwx_mJ-', url='https://site.com')
+
+        retry, = self.recorder.of('retry')
+        self.assertEqual(retry.request, 'in.php')
+        self.assertEqual(retry.method, 'userrecaptcha')
+        self.assertEqual(retry.attempt, 1)
+        self.assertEqual(retry.error.__class__.__name__, 'ApiException')
+        self.assertIsNotNone(retry.delay)
+
+        self.assertEqual(self.recorder.of('submit')[0].attempt, 2)
+        self.assertEqual(self.metrics.snapshot()['retries'], {('in.php', 'userrecaptcha'): 1})
+
+    def test_error(self):
+        self.mock.inject('ERROR_CAPTCHA_UNSOLVABLE', endpoint='res')
+
+        with self.assertRaises(ApiException):
+            self.solver.normal(b'\x89PNG image')
+
+        error, = self.recorder.of('error')
+        self.assertEqual(error.method, 'post')
+        self.assertIsNotNone(error.captcha_id)
+        self.assertEqual(error.polls, 1)
+        self.assertIsInstance(error.error, ApiException)
+        self.assertIsInstance(self.recorder.of('poll')[0].error, ApiException)
+
+    def test_send_error(self):
+        self.mock.inject('ERROR_ZERO_BALANCE')
+
+        with self.assertRaises(ApiException):
+            self.solver.normal(b'\x89PNG image')
+
+        error, = self.recorder.of('error')
+        self.assertEqual(error.method, 'post')
+        self.assertIsNone(error.captcha_id)
+        self.assertEqual(self.recorder.of('submit'), [])
+
+    def test_metrics(self):
+        for i in range(3):
+            self.solver.normal(b'image %d' % i)
+
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot['submits'], {'post': 3})
+        self.assertEqual(snapshot['results'], {'post': 3})
+        self.assertEqual(snapshot['submit_seconds']['post']['count'], 3)
+        self.assertEqual(snapshot['solve_seconds']['post']['count'], 3)
+        self.assertEqual(snapshot['polls_per_solve']['post']['count'], 3)
+        self.assertEqual(snapshot['polls_per_solve']['post']['sum'], snapshot['polls']['post'])
+        self.assertEqual(snapshot['errors'], {})
+
+    def test_no_hooks(self):
+        solver = TwoCaptcha('API_KEY', server=self.mock.url)
+        self.addCleanup(solver.close)
+
+        self.assertFalse(solver.hooks)
+        self.assertEqual(solver.normal(b'image')['code'], 'abcd')
+
+
+class HistogramTest(unittest.TestCase):
+    def test_buckets(self):
+        histogram = Histogram((1, 2, 5))
+        for value in (0.5, 1, 1.5, 4, 10):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.count, 5)
+        self.assertEqual(histogram.sum, 17)
+        self.assertEqual(histogram.cumulative(), [(1, 2), (2, 3), (5, 4)])
+
+    def test_percentile(self):
+        histogram = Histogram((1, 2, 4))
+        self.assertIsNone(histogram.percentile(50))
+
+        for value in (0.5, 1.5, 1.5, 3):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.percentile(50), 1.5)
+        self.assertEqual(histogram.percentile(100), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+root = Path(__file__).resolve().parents[2]
+
+
+def run(statement):
+    # fresh interpreter: modules loaded by the statement and the time spent importing twocaptcha, in microseconds
+    # (-X importtime)
+    code = f'{statement}\nimport sys\nprint(" ".join(sorted(sys.modules)))'
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=root, capture_output=True,
+                             text=True, check=True)
+
+    total = 0
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        # top-level imports of the package only, nested ones are indented and part of their cumulative time
+        if name[1:].startswith('twocaptcha'):
+            total += int(cumulative)
+
+    return set(process.stdout.split()), total
+
+
+class ImportTest(unittest.TestCase):
+    def test_package_imports_no_engine(self):
+        modules, _ = run('import twocaptcha')
+
+        for name in ('requests', 'httpx', 'aiofiles', 'twocaptcha.solver', 'twocaptcha.async_solver'):
+            self.assertNotIn(name, modules)
+
+    def test_sync_engine_only(self):
+        modules, _ = run('from twocaptcha import TwoCaptcha')
+
+        self.assertIn('requests', modules)
+        self.assertNotIn('httpx', modules)
+        self.assertNotIn('aiofiles', modules)
+
+    def test_async_engine_only(self):
+        modules, _ = run('from twocaptcha import AsyncTwoCaptcha')
+
+        self.assertIn('httpx', modules)
+        self.assertNotIn('requests', modules)
+
+    def test_attributes(self):
+        import twocaptcha
+
+        self.assertIs(twocaptcha.TwoCaptcha, sys.modules['twocaptcha.solver'].TwoCaptcha)
+        self.assertIn('AsyncTwoCaptcha', dir(twocaptcha))
+        self.assertRaises(AttributeError, getattr, twocaptcha, 'Missing')
+
+    def test_import_time(self):
+        _, package = run('import twocaptcha')
+        _, eager = run('import twocaptcha.solver, twocaptcha.async_solver')
+
+        self.assertLess(package, eager)
+
+
+if __name__ == '__main__':
+    unittest.main()
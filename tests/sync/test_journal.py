@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from twocaptcha import TwoCaptcha
+from twocaptcha.exceptions.api import ApiException
+from twocaptcha.exceptions.solver import ValidationException
+from twocaptcha.journal import Journal, params_hash
+from twocaptcha.mock_server import MockServer
+from twocaptcha.retry import RetryPolicy
+
+
+class JournalTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'journal.db')
+
+        self.mock = MockServer(solve_time=0.5, seed=1)
+        self.mock.start()
+        self.addCleanup(self.mock.stop)
+
+    def solver(self, **options):
+        solver = TwoCaptcha('API_KEY', pollingInterval=1, server=self.mock.url, **options)
+        solver.retry_policy = RetryPolicy(backoff=0.01)
+        self.addCleanup(solver.close)
+        return solver
+
+    def test_records_captchas_until_answered(self):
+        solver = self.solver(journal=self.path, defaultTimeout=60)
+
+        future = solver.submit('normal', file=b'image')
+        while not solver.poller.pending():
+            time.sleep(0.01)
+
+        entry, = solver.journal.pending()
+        self.assertEqual(entry.id, solver.poller.pending()[0])
+        self.assertEqual(entry.method, 'post')
+        self.assertEqual(entry.params_hash, params_hash({'method': 'post', 'file': b'image'}))
+        self.assertAlmostEqual(entry.deadline - entry.sent, 60, delta=1)
+
+        self.assertEqual(future.result(10)['captchaId'], entry.id)
+        self.assertEqual(solver.journal.pending(), [])
+
+    def test_failed_captchas_are_removed(self):
+        solver = self.solver(journal=self.path)
+        self.mock.inject('ERROR_CAPTCHA_UNSOLVABLE', endpoint='res')
+
+        with self.assertRaises(ApiException):
+            solver.normal(b'image')
+
+        self.assertEqual(solver.journal.pending(), [])
+
+    def test_resume(self):
+        # captchas sent by a process that stopped before their answers were received
+        journal = Journal(self.path)
+        sender = self.solver()
+        ids = [sender.send(method='post', file=b'image %d' % i) for i in range(3)]
+        for id_ in ids:
+            journal.add(id_, 'post', 'hash', 60)
+        journal.add('expired', 'post', 'hash', -1)
+        journal.close()
+
+        solver = self.solver(journal=self.path)
+        futures = solver.resume()
+
+        self.assertEqual(sorted(futures), sorted(ids))
+        self.assertEqual({id_: future.result(10)['code'] for id_, future in futures.items()},
+                         dict.fromkeys(ids, 'abcd'))
+        self.assertEqual(solver.journal.pending(), [])
+
+    def test_resume_requires_journal(self):
+        with self.assertRaises(ValidationException):
+            self.solver().resume()
+
+    def test_params_hash(self):
+        self.assertEqual(params_hash({'method': 'post', 'file': b'image', 'key': 'A'}),
+                         params_hash({'method': 'post', 'file': bytearray(b'image'), 'key': 'B'}))
+        self.assertNotEqual(params_hash({'method': 'post', 'file': b'image'}),
+                            params_hash({'method': 'post', 'file': b'other'}))
+
+
+if __name__ == '__main__':
+    unittest.main()
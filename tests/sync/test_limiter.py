@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+import threading
+import time
+import unittest
+
+try:
+    from .abstract import AbstractTest, ApiClient
+except ImportError:
+    from abstract import AbstractTest, ApiClient
+
+from twocaptcha import TwoCaptcha
+from twocaptcha.limiter import RateLimiter
+
+
+class ConcurrencyApiClient(ApiClient):
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def in_(self, files={}, **kwargs):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.02)
+        with self.lock:
+            self.in_flight -= 1
+        return super().in_(files, **kwargs)
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_unlimited(self):
+        limiter = RateLimiter()
+
+        for _ in range(100):
+            with limiter:
+                pass
+
+        self.assertEqual(limiter.stats(), {'acquired': 100, 'delayed': 0, 'wait_time': 0.0, 'in_flight': 0})
+
+    def test_rate(self):
+        limiter = RateLimiter(rate=20, burst=5)
+        start = time.monotonic()
+
+        for _ in range(15):
+            with limiter:
+                pass
+
+        # the first 5 pass at once, the other 10 at 20 per second
+        self.assertGreaterEqual(time.monotonic() - start, 0.45)
+        stats = limiter.stats()
+        self.assertEqual(stats['acquired'], 15)
+        self.assertEqual(stats['delayed'], 10)
+        self.assertGreater(stats['wait_time'], 0.45)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, RateLimiter, rate=0)
+        self.assertRaises(ValueError, RateLimiter, max_in_flight=0)
+
+
+class SolverLimitTest(AbstractTest):
+    def test_submit_concurrency(self):
+        solver = TwoCaptcha('API_KEY', submitConcurrency=2)
+        solver.api_client = api_client = ConcurrencyApiClient()
+
+        threads = [threading.Thread(target=solver.send, kwargs={'method': 'post'}) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(api_client.max_in_flight, 2)
+        self.assertEqual(solver.submit_limiter.stats()['acquired'], 8)
+        self.assertEqual(solver.submit_limiter.stats()['in_flight'], 0)
+
+    def test_poll_rate(self):
+        solver = TwoCaptcha('API_KEY', pollRate=50)
+        solver.api_client = ApiClient()
+
+        for _ in range(60):
+            solver.get_result('123')
+
+        self.assertGreater(solver.poll_limiter.stats()['wait_time'], 0)
+        self.assertEqual(solver.submit_limiter.stats()['acquired'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+import inspect
+import unittest
+
+try:
+    from .abstract import AbstractTest
+except ImportError:
+    from abstract import AbstractTest
+
+from twocaptcha import TwoCaptcha, AsyncTwoCaptcha
+from twocaptcha.batch import task_function
+from twocaptcha.exceptions.solver import ValidationException
+from twocaptcha.methods import METHODS, CaptchaMethod, captcha_method
+
+
+class MethodsTest(AbstractTest):
+    def test_sync_and_async_methods_match(self):
+        for name in METHODS:
+            sync, asynchronous = getattr(TwoCaptcha, name), getattr(AsyncTwoCaptcha, name)
+
+            self.assertEqual(inspect.signature(sync), inspect.signature(asynchronous))
+            self.assertEqual(sync.__doc__, asynchronous.__doc__)
+            self.assertTrue(inspect.iscoroutinefunction(asynchronous))
+
+    def test_signature(self):
+        self.assertEqual(str(inspect.signature(TwoCaptcha.recaptcha)),
+                         "(self, sitekey, url, version='v2', enterprise=0, **kwargs)")
+        self.assertEqual(str(inspect.signature(TwoCaptcha.rotate)), '(self, files, **kwargs)')
+
+    def test_bind(self):
+        spec = CaptchaMethod('capy', 'capy', (('sitekey', 'captchakey'), 'url'), defaults=(('version', 2),))
+        file, params, options = spec.bind(('key',), {'url': 'https://site.com', 'proxy': None})
+
+        self.assertIsNone(file)
+        self.assertEqual(params, {'method': 'capy', 'captchakey': 'key', 'url': 'https://site.com', 'version': 2})
+        self.assertEqual(options, {'proxy': None})
+        self.assertRaises(TypeError, spec.bind, (), {'url': 'https://site.com'})
+
+    def test_choices(self):
+        self.assertRaises(ValidationException, self.solver.audio, 'x' * 60, lang='xx')
+
+    def test_captcha_method(self):
+        self.assertIs(captcha_method(self.solver, 'normal'), METHODS['normal'])
+        self.assertIsNone(captcha_method(self.solver, 'yandex'))
+
+        for name in ('balance', 'solve', '_solve', 'rename_params'):
+            self.assertRaises(ValidationException, task_function, self.solver, name)
+
+
+if __name__ == '__main__':
+    unittest.main()
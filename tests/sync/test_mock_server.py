@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+import unittest
+
+import requests
+
+from twocaptcha import TwoCaptcha, ApiClient
+from twocaptcha.exceptions.api import ApiException
+from twocaptcha.mock_server import MockServer
+from twocaptcha.retry import RetryPolicy
+
+
+class MockServerTest(unittest.TestCase):
+    def setUp(self):
+        self.mock = MockServer(solve_time=0.5, seed=1)
+        self.mock.start()
+        self.addCleanup(self.mock.stop)
+
+        self.solver = TwoCaptcha('API_KEY', pollingInterval=1, server=self.mock.url)
+        self.solver.retry_policy = RetryPolicy(backoff=0.01)
+        self.addCleanup(self.solver.close)
+
+    def test_solve(self):
+        futures = [self.solver.submit('normal', file=b'\x89PNG image', numeric=1),
+                   self.solver.submit('recaptcha', sitekey='6Le-wvkSVVABCPBMRTvw0Q4Muexq1bi0DJwx_mJ-',
+                                      url='https://site.com')]
+
+        self.assertEqual([f.result(10)['code'] for f in futures], ['abcd', 'abcd'])
+
+        normal, recaptcha = sorted(self.mock.captchas(), key=lambda params: params['method'])
+        self.assertEqual(normal['file'], b'\x89PNG image')
+        self.assertEqual(normal['numeric'], '1')
+        self.assertEqual(recaptcha['googlekey'], '6Le-wvkSVVABCPBMRTvw0Q4Muexq1bi0DJwx_mJ-')
+        self.assertEqual(recaptcha['pageurl'], 'https://site.com')
+
+        stats = self.mock.stats()
+        self.assertEqual(stats['requests']['in.php'], 2)
+        self.assertEqual(stats['solved'], 2)
+
+    def test_injected_errors(self):
+        self.mock.inject('ERROR_NO_SLOT_AVAILABLE')
+        self.mock.inject(503)
+        self.assertEqual(self.solver.text('If tomorrow is Saturday, what day is today?')['code'], 'abcd')
+
+        self.mock.inject('ERROR_ZERO_BALANCE')
+        self.assertRaises(ApiException, self.solver.text, 'If tomorrow is Saturday, what day is today?')
+
+        stats = self.mock.stats()
+        self.assertEqual(stats['errors'], {'ERROR_NO_SLOT_AVAILABLE': 1, 503: 1, 'ERROR_ZERO_BALANCE': 1})
+        self.assertEqual(stats['requests']['in.php'], 4)
+
+    def test_other_actions(self):
+        self.assertEqual(self.solver.balance(), 10)
+        self.assertRaises(ApiException, self.solver.report, '1', False)
+
+    def test_json_api(self):
+        task = requests.post(self.mock.url + '/createTask',
+                             json={'clientKey': 'API_KEY', 'task': {'type': 'ImageToTextTask', 'body': 'R0lGOD'}},
+                             timeout=5).json()
+        result = requests.post(self.mock.url + '/getTaskResult',
+                               json={'clientKey': 'API_KEY', 'taskId': task['taskId']}, timeout=5).json()
+
+        self.assertEqual(task['errorId'], 0)
+        self.assertEqual(result, {'errorId': 0, 'status': 'processing'})
+
+    def test_server_url(self):
+        self.assertEqual(ApiClient('2captcha.com').base_url, 'https://2captcha.com')
+        self.assertEqual(ApiClient(self.mock.url).base_url, self.mock.url)
+
+
+if __name__ == '__main__':
+    unittest.main()
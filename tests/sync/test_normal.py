@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import io
 import unittest
 from pathlib import Path
 
@@ -66,6 +67,13 @@ class NormalTest(AbstractTest):
 
         return self.send_return(sends, self.solver.normal, file=file, **params)
 
+    def test_bytes(self):
+        content = Path(file).read_bytes()
+
+        for image in (content, bytearray(content), memoryview(content), io.BytesIO(content)):
+            sends = {'method': 'post', 'file': image}
+            self.send_return(sends, self.solver.normal, file=image)
+
     def test_not_found(self):
         return self.invalid_file(self.solver.normal)
 
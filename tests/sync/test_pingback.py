@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+import threading
+import time
+import unittest
+
+import requests
+
+try:
+    from .abstract import AbstractTest, ApiClient
+except ImportError:
+    from abstract import AbstractTest, ApiClient
+
+from twocaptcha import TwoCaptcha, PingbackReceiver
+from twocaptcha.exceptions.api import ApiException
+
+
+class NotReadyApiClient(ApiClient):
+    def res(self, **kwargs):
+        return 'CAPCHA_NOT_READY'
+
+
+class PingbackTest(AbstractTest):
+    def setUp(self):
+        self.receiver = PingbackReceiver('https://example.com/pingback', host='127.0.0.1', port=0, fallback=5)
+        self.receiver.start()
+        self.addCleanup(self.receiver.stop)
+
+        self.solver = TwoCaptcha('API_KEY', pollingInterval=1, pingback=self.receiver)
+        self.solver.api_client = NotReadyApiClient()
+
+    def post(self, **data):
+        return requests.post(f'http://127.0.0.1:{self.receiver.port}/pingback', data=data, timeout=5)
+
+    def test_solved_by_pingback(self):
+        result = {}
+        thread = threading.Thread(target=lambda: result.update(self.solver.normal('A' * 60)))
+        thread.start()
+
+        while not self.solver.poller.pending():
+            time.sleep(0.01)
+
+        self.assertEqual(self.post(id='123', code='abcd').status_code, 200)
+        thread.join()
+
+        self.assertEqual(result, {'captchaId': '123', 'code': 'abcd'})
+        self.assertEqual(self.solver.api_client.incomings['pingback'], 'https://example.com/pingback')
+
+    def test_error_pingback(self):
+        errors = []
+
+        def solve():
+            try:
+                self.solver.normal('A' * 60)
+            except Exception as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=solve)
+        thread.start()
+
+        while not self.solver.poller.pending():
+            time.sleep(0.01)
+
+        self.post(id='123', code='ERROR_CAPTCHA_UNSOLVABLE')
+        thread.join()
+
+        self.assertIsInstance(errors[0], ApiException)
+        self.assertIn('ERROR_CAPTCHA_UNSOLVABLE', str(errors[0]))
+
+    def test_pingback_before_wait(self):
+        id_ = self.solver.send(method='base64', body='A' * 60)
+        self.post(id=id_, code='abcd')
+
+        self.assertEqual(self.solver.wait_result(id_, 5, 1), 'abcd')
+
+    def test_unknown_pingback_ignored(self):
+        # not sent by the solver, e.g. forged
+        self.assertEqual(self.post(id='456', code='forged').status_code, 200)
+
+        self.assertIsNone(self.receiver.claim('456'))
+        self.assertFalse(self.receiver.receive('456', 'forged'))
+
+    def test_token(self):
+        receiver = PingbackReceiver('https://example.com/pingback/s3cret', host='127.0.0.1', port=0, token='s3cret')
+        solver = TwoCaptcha('API_KEY', pollingInterval=1, pingback=receiver)
+        solver.api_client = NotReadyApiClient()
+
+        with receiver:
+            id_ = solver.send(method='base64', body='A' * 60)
+            url = f'http://127.0.0.1:{receiver.port}/pingback/'
+
+            self.assertEqual(requests.post(url + 'guess', data={'id': id_, 'code': 'forged'}, timeout=5).status_code,
+                             403)
+            self.assertEqual(requests.post(url, data={'id': id_, 'code': 'forged'}, timeout=5).status_code, 403)
+            self.assertEqual(requests.post(url + 's3cret', data={'id': id_, 'code': 'abcd'}, timeout=5).status_code,
+                             200)
+
+            self.assertEqual(receiver.claim(id_), 'abcd')
+
+    def test_fallback_to_polling(self):
+        self.receiver.fallback = 0.1
+        self.solver.api_client = ApiClient()
+
+        self.assertEqual(self.solver.normal('A' * 60)['code'], 'abcd')
+
+    def test_bad_request(self):
+        self.assertEqual(self.post(code='abcd').status_code, 400)
+
+    def test_parse(self):
+        self.assertEqual(self.receiver.parse('', 'application/json', b'{"id": 1, "code": "x"}'), ('1', 'x'))
+        self.assertEqual(self.receiver.parse('id=1&code=x', None, b''), ('1', 'x'))
+        self.assertIsNone(self.receiver.parse('', None, b'id=1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
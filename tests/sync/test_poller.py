@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+import threading
+import time
+import unittest
+
+try:
+    from .abstract import AbstractTest
+except ImportError:
+    from abstract import AbstractTest
+
+from twocaptcha.exceptions.api import ApiException, NetworkException
+from twocaptcha.exceptions.solver import TimeoutException
+
+
+class BulkApiClient():
+    def __init__(self, answers):
+        self.answers = answers
+        self.ready = True
+        self.min_batch = 1
+        self.failures = 0
+        self.requests = []
+
+    def answer(self, id_, batch=1):
+        return self.answers[id_] if self.ready and batch >= self.min_batch else 'CAPCHA_NOT_READY'
+
+    def res(self, **kwargs):
+        self.requests.append(kwargs)
+
+        if self.failures:
+            self.failures -= 1
+            raise NetworkException('bad response: 502', status_code=502)
+
+        if 'ids' in kwargs:
+            ids = kwargs['ids'].split(',')
+            resp = '|'.join(self.answer(id_, len(ids)) for id_ in ids)
+        else:
+            resp = self.answer(kwargs['id'])
+            resp = resp if resp == 'CAPCHA_NOT_READY' or resp.startswith('ERROR') else 'OK|' + resp
+
+        if 'ERROR' in resp:
+            raise ApiException(resp)
+
+        return resp
+
+
+class PollerTest(AbstractTest):
+    def test_fetch_batched(self):
+        self.solver.api_client = BulkApiClient({'1': 'abcd', '2': 'CAPCHA_NOT_READY', '3': 'efgh'})
+
+        answers, errors = self.solver.poller.fetch(['1', '2', '3'])
+
+        self.assertEqual(answers, {'1': 'abcd', '3': 'efgh'})
+        self.assertEqual(errors, {})
+        self.assertEqual(len(self.solver.api_client.requests), 1)
+        self.assertEqual(self.solver.api_client.requests[0]['ids'], '1,2,3')
+
+    def test_fetch_fallback_on_pipe(self):
+        self.solver.api_client = BulkApiClient({'1': 'a|b', '2': 'efgh'})
+
+        answers, errors = self.solver.poller.fetch(['1', '2'])
+
+        self.assertEqual(answers, {'1': 'a|b', '2': 'efgh'})
+        self.assertEqual(len(self.solver.api_client.requests), 3)
+
+    def test_fetch_fallback_on_error(self):
+        self.solver.api_client = BulkApiClient({'1': 'ERROR_CAPTCHA_UNSOLVABLE', '2': 'efgh'})
+
+        answers, errors = self.solver.poller.fetch(['1', '2'])
+
+        self.assertEqual(answers, {'2': 'efgh'})
+        self.assertIsInstance(errors['1'], ApiException)
+
+    def test_fetch_network_error(self):
+        api_client = self.solver.api_client = BulkApiClient({'1': 'abcd', '2': 'efgh'})
+        api_client.failures = 1
+
+        self.assertRaises(NetworkException, self.solver.poller.fetch, ['1', '2'])
+        self.assertEqual(len(api_client.requests), 1)
+
+    def test_batch_rescheduled_after_network_error(self):
+        self.solver.retry_policy.backoff = 0.01
+        ids = [str(i) for i in range(20)]
+        api_client = self.solver.api_client = BulkApiClient({id_: 'code' + id_ for id_ in ids})
+        api_client.failures = 1
+
+        futures = [self.solver.poller.submit(id_, 5, 0.1) for id_ in ids]
+
+        self.assertEqual([future.result(5) for future in futures], ['code' + id_ for id_ in ids])
+        # the failed batch is looked up again as a batch, not captcha by captcha
+        self.assertEqual(len(api_client.requests), 2)
+
+    def test_backoff_doesnt_block_poller(self):
+        api_client = self.solver.api_client = BulkApiClient({'1': 'abcd', '2': 'CAPCHA_NOT_READY'})
+        api_client.failures = 1
+        self.solver.retry_policy.delay = lambda attempt: 5
+
+        failing = self.solver.poller.submit('1', 10, 0.05)
+        while not api_client.requests:
+            time.sleep(0.01)
+
+        # the failed lookup waits for its backoff on the heap, other captchas still expire on time
+        started = time.monotonic()
+        expiring = self.solver.poller.submit('2', 0.2, 1)
+
+        self.assertIsInstance(expiring.exception(2), TimeoutException)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertNotIn('1', [r.get('id') or r.get('ids') for r in api_client.requests[1:]])
+        failing.cancel()
+
+    def test_waiters_share_lookup(self):
+        ids = ['1', '2', '3']
+        api_client = self.solver.api_client = BulkApiClient({id_: 'code' + id_ for id_ in ids})
+        api_client.min_batch = len(ids)
+
+        results = {}
+
+        def wait(id_):
+            results[id_] = self.solver.wait_result(id_, 5, 0.2)
+
+        threads = [threading.Thread(target=wait, args=(id_,)) for id_ in ids]
+        [t.start() for t in threads]
+        [t.join() for t in threads]
+
+        self.assertEqual(results, {id_: 'code' + id_ for id_ in ids})
+        self.assertEqual(sorted(api_client.requests[-1]['ids'].split(',')), ids)
+        self.assertEqual(self.solver.poller.pending(), [])
+
+    def test_timeout(self):
+        api_client = self.solver.api_client = BulkApiClient({'1': 'abcd'})
+        api_client.ready = False
+
+        self.assertRaises(self.solver.exceptions, self.solver.wait_result, '1', 0.1, 0.05)
+        self.assertEqual(self.solver.poller.pending(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
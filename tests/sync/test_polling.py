@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+import unittest
+
+try:
+    from .abstract import AbstractTest
+except ImportError:
+    from abstract import AbstractTest
+
+from twocaptcha import TwoCaptcha
+from twocaptcha.polling import PollingPolicy, AdaptivePolling, estimate_solve_time
+
+
+class PollingPolicyTest(unittest.TestCase):
+    def test_fixed_schedule(self):
+        policy = PollingPolicy()
+        policy.record('userrecaptcha', 30)
+
+        self.assertEqual(policy.schedule('userrecaptcha', 10), (0, 10))
+
+    def test_stats(self):
+        policy = PollingPolicy(window=10)
+        for seconds in range(1, 21):
+            policy.record('post', seconds)
+        policy.record(None, 100)
+
+        stats = policy.stats()
+
+        self.assertEqual(list(stats), ['post'])
+        self.assertEqual(stats['post']['count'], 10)
+        self.assertEqual(stats['post']['mean'], 15.5)
+        self.assertEqual(stats['post']['p50'], 16)
+        self.assertEqual(stats['post']['p90'], 20)
+        self.assertEqual(stats['post']['max'], 20)
+
+    def test_adaptive_schedule(self):
+        policy = AdaptivePolling(min_samples=5, min_interval=1)
+
+        for seconds in (20, 22, 24, 26):
+            policy.record('userrecaptcha', seconds)
+        self.assertEqual(policy.schedule('userrecaptcha', 10), (0, 10))
+
+        for seconds in (28, 30, 32, 34, 36, 38):
+            policy.record('userrecaptcha', seconds)
+        first_delay, interval = policy.schedule('userrecaptcha', 10)
+
+        self.assertEqual(first_delay, 30)
+        self.assertEqual(interval, 2)
+        self.assertEqual(policy.schedule('post', 10), (0, 10))
+
+    def test_adaptive_interval_bounds(self):
+        policy = AdaptivePolling(min_samples=1, min_interval=3)
+
+        policy.record('post', 5)
+        self.assertEqual(policy.schedule('post', 10), (5, 3))
+        self.assertEqual(policy.schedule('post', 1), (5, 1))
+
+        policy.record('post', 200)
+        self.assertEqual(policy.schedule('post', 10), (200, 3))
+
+    def test_adaptive_schedule_converges_down(self):
+        # captchas of a method that took 20 seconds to solve now take 5, looked up as the pollers do
+        policy = AdaptivePolling(min_samples=5, min_interval=1)
+        for _ in range(10):
+            policy.record('post', 20)
+
+        for _ in range(200):
+            first_delay, interval = policy.schedule('post', 10)
+            not_ready, ready = 0, first_delay
+            while ready < 5:
+                not_ready, ready = ready, ready + interval
+            policy.record('post', estimate_solve_time(not_ready, ready))
+
+        first_delay, _ = policy.schedule('post', 10)
+        self.assertLess(first_delay, 7)
+        self.assertGreaterEqual(first_delay, 2.5)
+
+    def test_estimate_solve_time(self):
+        self.assertEqual(estimate_solve_time(0, 10), 5)
+        self.assertEqual(estimate_solve_time(8, 10), 9)
+
+
+class SolverPollingTest(AbstractTest):
+    def test_solve_times_recorded(self):
+        self.solver.normal('A' * 60)
+        self.solver.text('What is 2+2?')
+
+        self.assertEqual(set(self.solver.polling_policy.stats()), {'base64', 'post'})
+
+    def test_options(self):
+        policy = AdaptivePolling(percentile=75)
+
+        self.assertIs(type(TwoCaptcha('API_KEY').polling_policy), PollingPolicy)
+        self.assertIsInstance(TwoCaptcha('API_KEY', adaptivePolling=True).polling_policy, AdaptivePolling)
+        self.assertIs(TwoCaptcha('API_KEY', adaptivePolling=policy).polling_policy, policy)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+import unittest
+from unittest import mock
+
+import requests
+
+try:
+    from .abstract import AbstractTest
+except ImportError:
+    from abstract import AbstractTest
+
+from twocaptcha.exceptions import api
+from twocaptcha.exceptions.solver import ApiException
+from twocaptcha.api import ApiClient
+from twocaptcha.retry import RetryPolicy, is_retryable, is_retryable_submit
+
+
+class FlakyApiClient():
+    def __init__(self, *failures):
+        self.failures = list(failures)
+        self.requests = 0
+
+    def fail(self):
+        self.requests += 1
+        if self.failures:
+            failure = self.failures.pop(0)
+            if isinstance(failure, Exception):
+                raise failure
+            return failure
+
+    def in_(self, files={}, **kwargs):
+        return self.fail() or 'OK|123'
+
+    def res(self, **kwargs):
+        return self.fail() or 'OK|abcd'
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def test_classifier(self):
+        self.assertTrue(is_retryable(api.ApiException('ERROR_NO_SLOT_AVAILABLE')))
+        self.assertTrue(is_retryable(ApiException('cannot recognize response MAX_USER_TURN')))
+        self.assertTrue(is_retryable(api.NetworkException('connection reset')))
+        self.assertTrue(is_retryable(api.NetworkException('bad response: 503', status_code=503)))
+        self.assertTrue(is_retryable(api.NetworkException('bad response: 429', status_code=429)))
+
+        self.assertFalse(is_retryable(api.NetworkException('bad response: 404', status_code=404)))
+        self.assertFalse(is_retryable(api.ApiException('ERROR_WRONG_USER_KEY')))
+        self.assertFalse(is_retryable(api.ApiException('ERROR_ZERO_BALANCE')))
+        self.assertFalse(is_retryable(ValueError('ERROR_NO_SLOT_AVAILABLE')))
+
+    def test_submit_classifier(self):
+        self.assertTrue(is_retryable_submit(api.ApiException('ERROR_NO_SLOT_AVAILABLE')))
+        self.assertTrue(is_retryable_submit(api.NetworkException('connection refused', connect_error=True)))
+        self.assertTrue(is_retryable_submit(api.NetworkException('bad response: 503', status_code=503)))
+
+        self.assertFalse(is_retryable_submit(api.NetworkException('read timed out')))
+        self.assertFalse(is_retryable_submit(api.ApiException('ERROR_ZERO_BALANCE')))
+
+    def test_connect_error(self):
+        with self.assertRaises(api.NetworkException) as context:
+            ApiClient(post_url='127.0.0.1:1').in_(method='post')
+
+        self.assertTrue(context.exception.connect_error)
+
+    def test_backoff(self):
+        policy = RetryPolicy(backoff=1, max_backoff=5)
+
+        with mock.patch('random.uniform', side_effect=lambda a, b: b):
+            self.assertEqual([policy.delay(n) for n in range(1, 6)], [1, 2, 4, 5, 5])
+
+    def test_max_attempts(self):
+        policy = RetryPolicy(max_attempts=3, backoff=0)
+        function = mock.Mock(side_effect=api.ApiException('ERROR_NO_SLOT_AVAILABLE'))
+
+        self.assertRaises(api.ApiException, policy.call, function)
+        self.assertEqual(function.call_count, 3)
+
+    def test_deadline(self):
+        policy = RetryPolicy(max_attempts=10, backoff=10, deadline=1)
+        function = mock.Mock(side_effect=api.ApiException('ERROR_NO_SLOT_AVAILABLE'))
+
+        with mock.patch('random.uniform', return_value=5):
+            self.assertRaises(api.ApiException, policy.call, function)
+        self.assertEqual(function.call_count, 1)
+
+
+class SolverRetryTest(AbstractTest):
+    def setUp(self):
+        super().setUp()
+        self.solver.retry_policy.backoff = 0
+
+    def test_send_retried(self):
+        self.solver.api_client = FlakyApiClient(api.ApiException('ERROR_NO_SLOT_AVAILABLE'),
+                                                api.NetworkException('bad response: 502', status_code=502),
+                                                'MAX_USER_TURN')
+
+        self.assertEqual(self.solver.send(method='post'), '123')
+        self.assertEqual(self.solver.api_client.requests, 4)
+
+    def test_fatal_not_retried(self):
+        self.solver.api_client = FlakyApiClient(api.ApiException('ERROR_ZERO_BALANCE'))
+
+        self.assertRaises(api.ApiException, self.solver.send, method='post')
+        self.assertEqual(self.solver.api_client.requests, 1)
+
+    def test_res_retried(self):
+        self.solver.api_client = FlakyApiClient(api.NetworkException('timed out'))
+
+        self.assertEqual(self.solver.get_result('123'), 'abcd')
+        self.assertEqual(self.solver.api_client.requests, 2)
+
+    def test_send_not_resent_after_read_timeout(self):
+        # the captcha may have been created before the response was lost
+        self.solver.api_client = FlakyApiClient(api.NetworkException(requests.ReadTimeout('read timed out')))
+
+        self.assertRaises(api.NetworkException, self.solver.send, method='post')
+        self.assertEqual(self.solver.api_client.requests, 1)
+
+    def test_send_retried_after_connect_error(self):
+        self.solver.api_client = FlakyApiClient(api.NetworkException('connection refused', connect_error=True))
+
+        self.assertEqual(self.solver.send(method='post'), '123')
+        self.assertEqual(self.solver.api_client.requests, 2)
+
+    def test_attempts_exhausted(self):
+        self.solver.api_client = FlakyApiClient(*[api.ApiException('ERROR_NO_SLOT_AVAILABLE')] * 4)
+
+        self.assertRaises(api.ApiException, self.solver.send, method='post')
+        self.assertEqual(self.solver.api_client.requests, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import base64
 import unittest
 from pathlib import Path
 
@@ -37,6 +38,21 @@ class RotateTest(AbstractTest):
         sends = {'method': 'post', 'files': files_dict, **checks}
         return self.send_return(sends, self.solver.rotate, files=files)
 
+    def test_bytes(self):
+        content = Path(files[0]).read_bytes()
+
+        sends = {'method': 'post', 'file': content, **checks}
+        self.send_return(sends, self.solver.rotate, files=content)
+
+        sends = {'method': 'post', 'files': {'file_1': content, 'file_2': content}, **checks}
+        self.send_return(sends, self.solver.rotate, files=[content, memoryview(content)])
+
+    def test_base64(self):
+        body = base64.b64encode(Path(files[0]).read_bytes()).decode()
+
+        sends = {'body': body, **checks}
+        return self.send_return(sends, self.solver.rotate, files=body)
+
     def test_files_dict(self):
         sends = {'method': 'post', 'files': files_dict, **checks}
         return self.send_return(sends, self.solver.rotate, files=files_dict)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+import itertools
+import threading
+import unittest
+
+try:
+    from .abstract import AbstractTest
+except ImportError:
+    from abstract import AbstractTest
+
+
+class CountingApiClient():
+    def __init__(self):
+        self.ids = itertools.count(1)
+        self.sent = {}
+        self.lock = threading.Lock()
+
+    def in_(self, files={}, **kwargs):
+        with self.lock:
+            id_ = str(next(self.ids))
+            self.sent[id_] = kwargs
+        return 'OK|' + id_
+
+    def res(self, **kwargs):
+        if 'ids' in kwargs:
+            return '|'.join('code' + id_ for id_ in kwargs['ids'].split(','))
+        return 'OK|code' + kwargs['id']
+
+
+class SolveManyTest(AbstractTest):
+    def setUp(self):
+        super().setUp()
+        self.solver.api_client = CountingApiClient()
+
+    def test_results(self):
+        tasks = [('text', {'text': f'question {i}'}) for i in range(20)]
+
+        results = list(self.solver.solve_many(tasks, concurrency=4))
+
+        self.assertEqual(sorted(r.index for r in results), list(range(20)))
+        self.assertTrue(all(r.ok for r in results))
+
+        sent = self.solver.api_client.sent
+        for r in results:
+            self.assertIs(r.task, tasks[r.index])
+            self.assertEqual(sent[r.result['captchaId']]['textcaptcha'], f'question {r.index}')
+            self.assertEqual(r.result['code'], 'code' + r.result['captchaId'])
+
+    def test_errors_reported(self):
+        tasks = [
+            {'method': 'normal', 'file': 'lost_file'},
+            ('text', {'text': 'What is 2+2?'}),
+            ('balance', {}),
+            'normal',
+            {'method': 'userrecaptcha', 'googlekey': 'sitekey', 'pageurl': 'https://site.com'},
+        ]
+
+        results = sorted(self.solver.solve_many(tasks), key=lambda r: r.index)
+
+        self.assertEqual([r.ok for r in results], [False, True, False, False, True])
+        self.assertIsInstance(results[0].error, self.solver.exceptions)
+        self.assertIsInstance(results[3].error, self.solver.exceptions)
+        self.assertIsNone(results[0].result)
+
+        captcha_id = results[4].result['captchaId']
+        self.assertEqual(self.solver.api_client.sent[captcha_id]['method'], 'userrecaptcha')
+
+    def test_lazy_consumption(self):
+        pulled = []
+
+        def tasks():
+            for i in range(100):
+                pulled.append(i)
+                yield 'text', {'text': str(i)}
+
+        results = self.solver.solve_many(tasks(), concurrency=3)
+        next(results)
+        results.close()
+
+        self.assertLess(len(pulled), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+import threading
+import time
+import unittest
+from concurrent.futures import Future, wait
+
+try:
+    from .abstract import AbstractTest
+    from .test_solve_many import CountingApiClient
+except ImportError:
+    from abstract import AbstractTest
+    from test_solve_many import CountingApiClient
+
+from twocaptcha import TimeoutException, ValidationException
+
+
+class NotReadyApiClient(CountingApiClient):
+    def res(self, **kwargs):
+        if 'ids' in kwargs:
+            return '|'.join('CAPCHA_NOT_READY' for _ in kwargs['ids'].split(','))
+        return 'CAPCHA_NOT_READY'
+
+
+class SubmitTest(AbstractTest):
+    def test_future_result(self):
+        future = self.solver.submit('normal', file='A' * 60)
+
+        self.assertIsInstance(future, Future)
+        self.assertEqual(future.result(5), {'captchaId': '123', 'code': 'abcd'})
+        self.assertEqual(self.solver.api_client.incomings['method'], 'base64')
+
+    def test_many_in_flight(self):
+        self.solver.api_client = CountingApiClient()
+        threads = threading.active_count()
+
+        futures = [self.solver.submit('text', text=str(i)) for i in range(200)]
+        done, not_done = wait(futures, timeout=10)
+
+        self.assertFalse(not_done)
+        self.assertEqual({f.result()['code'] for f in futures}, {f'code{i}' for i in range(1, 201)})
+        self.assertLessEqual(threading.active_count() - threads, self.solver.pool_size + 1)
+
+    def test_error(self):
+        future = self.solver.submit('normal', file='lost_file')
+
+        self.assertIsInstance(future.exception(5), ValidationException)
+
+    def test_not_a_method(self):
+        self.assertIsInstance(self.solver.submit('balance').exception(5), ValidationException)
+
+    def test_timeout(self):
+        self.solver.api_client = NotReadyApiClient()
+        self.solver.default_timeout = 0.2
+
+        self.assertIsInstance(self.solver.submit('text', text='?').exception(5), TimeoutException)
+        self.assertEqual(self.solver.poller.pending(), [])
+
+    def test_cancel(self):
+        self.solver.api_client = NotReadyApiClient()
+        future = self.solver.submit('text', text='?')
+
+        while not self.solver.poller.pending():
+            time.sleep(0.01)
+
+        self.assertTrue(future.cancel())
+        while self.solver.poller.pending():
+            time.sleep(0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
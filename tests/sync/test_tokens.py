@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+import time
+import unittest
+
+try:
+    from .abstract import AbstractTest
+    from .test_solve_many import CountingApiClient
+    from .test_submit import NotReadyApiClient
+except ImportError:
+    from abstract import AbstractTest
+    from test_solve_many import CountingApiClient
+    from test_submit import NotReadyApiClient
+
+from twocaptcha import TimeoutException, TokenPool
+from twocaptcha.exceptions.api import ApiException
+
+
+class ZeroBalanceApiClient(CountingApiClient):
+    def in_(self, files={}, **kwargs):
+        super().in_(files, **kwargs)
+        raise ApiException('ERROR_ZERO_BALANCE')
+
+
+def wait_until(condition, timeout=5):
+    end = time.monotonic() + timeout
+    while not condition() and time.monotonic() < end:
+        time.sleep(0.01)
+
+
+class TokenPoolTest(AbstractTest):
+    def setUp(self):
+        super().setUp()
+        self.solver.api_client = CountingApiClient()
+        self.pool = TokenPool(self.solver, size=2)
+        self.addCleanup(self.pool.close)
+
+    def ready(self):
+        return self.pool.stats()['ready'].get(('turnstile', '0x4AAAAAAAC3DHQFLr1GavRN', 'https://site.com'), 0)
+
+    def test_tokens_solved_ahead(self):
+        first = self.pool.acquire('turnstile', '0x4AAAAAAAC3DHQFLr1GavRN', 'https://site.com', timeout=5)
+        wait_until(lambda: self.ready() == 2)
+
+        second = self.pool.acquire('turnstile', '0x4AAAAAAAC3DHQFLr1GavRN', 'https://site.com', timeout=5)
+
+        self.assertTrue(first['code'].startswith('code'))
+        self.assertNotEqual(first['code'], second['code'])
+        self.assertEqual(self.pool.stats()['hits'], 1)
+        self.assertEqual(self.pool.stats()['misses'], 1)
+        self.assertEqual(self.solver.api_client.sent['1']['method'], 'turnstile')
+        self.assertEqual(self.solver.api_client.sent['1']['sitekey'], '0x4AAAAAAAC3DHQFLr1GavRN')
+
+        # the acquired token is replaced
+        wait_until(lambda: self.ready() == 2)
+        self.assertEqual(len(self.solver.api_client.sent), 4)
+
+    def test_options_have_tokens_of_their_own(self):
+        self.pool.acquire('recaptcha', 'sitekey', 'https://site.com', timeout=5)
+        self.pool.acquire('recaptcha', 'sitekey', 'https://site.com', version='v3', timeout=5)
+
+        self.assertEqual(self.pool.stats()['misses'], 2)
+        versions = lambda: [kwargs['version'] for kwargs in list(self.solver.api_client.sent.values())]
+        wait_until(lambda: len(versions()) == 6)
+        self.assertEqual(versions().count('v3'), 3)
+
+    def test_expired_tokens_replaced(self):
+        self.pool.ttl = 0.2
+        self.pool.acquire('turnstile', '0x4AAAAAAAC3DHQFLr1GavRN', 'https://site.com', timeout=5)
+        wait_until(lambda: len(self.solver.api_client.sent) >= 6)
+
+        self.assertGreaterEqual(len(self.solver.api_client.sent), 6)
+
+    def test_timeout(self):
+        self.solver.api_client = NotReadyApiClient()
+
+        with self.assertRaises(TimeoutException):
+            self.pool.acquire('turnstile', '0x4AAAAAAAC3DHQFLr1GavRN', 'https://site.com', timeout=0.1)
+
+    def test_errors_not_repeated(self):
+        self.solver.api_client = ZeroBalanceApiClient()
+
+        with self.assertRaises(ApiException):
+            self.pool.acquire('turnstile', '0x4AAAAAAAC3DHQFLr1GavRN', 'https://site.com', timeout=5)
+        time.sleep(0.2)
+
+        self.assertLessEqual(len(self.solver.api_client.sent), 3)
+
+    def test_close_stops_refills(self):
+        self.pool.acquire('turnstile', '0x4AAAAAAAC3DHQFLr1GavRN', 'https://site.com', timeout=5)
+        self.pool.close()
+        sent = len(self.solver.api_client.sent)
+        time.sleep(0.2)
+
+        self.assertEqual(len(self.solver.api_client.sent), sent)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,14 +1,10 @@
-from .api import ApiClient
-from .solver import TwoCaptcha
+import importlib
 
-from .async_api import AsyncApiClient
-from .async_solver import AsyncTwoCaptcha
-
-from .solver import SolverExceptions, ValidationException, NetworkException, ApiException, TimeoutException
+from .exceptions.solver import SolverExceptions, ValidationException, NetworkException, ApiException, TimeoutException
 
 
 """
-Python 3 package for easy integration with the API of 2captcha captcha solving service to bypass recaptcha, 
+Python 3 package for easy integration with the API of 2captcha captcha solving service to bypass recaptcha,
 funcaptcha, geetest and solve any other captchas.
 
 website 2captcha [https://2captcha.com/]
@@ -18,3 +14,38 @@ support@2captcha.com
 
 __author__ = '2captcha'
 __version__ = '2.0.9'
+
+
+# imported on first use, so that sync users don't load httpx and aiofiles, and async users don't load requests
+_LAZY = {
+    'ApiClient': 'api',
+    'TwoCaptcha': 'solver',
+    'AsyncApiClient': 'async_api',
+    'AsyncTwoCaptcha': 'async_solver',
+    'PingbackReceiver': 'pingback',
+    'AsyncPingbackReceiver': 'pingback',
+    'TokenPool': 'tokens',
+    'AsyncTokenPool': 'tokens',
+    'Hooks': 'hooks',
+    'MetricsCollector': 'hooks',
+    'PrometheusExporter': 'exporter',
+    'AccountPool': 'accounts',
+    'AsyncAccountPool': 'accounts',
+}
+
+__all__ = list(_LAZY) + ['SolverExceptions', 'ValidationException', 'NetworkException', 'ApiException',
+                         'TimeoutException']
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+
+import asyncio
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, InvalidStateError
+
+try:
+    from .batch import run_tasks, submit_tasks
+    from .files import Rewind
+    from .methods import captcha_methods
+    from .hooks import error_code
+    from .exceptions.solver import ValidationException
+except ImportError:
+    from batch import run_tasks, submit_tasks
+    from files import Rewind
+    from methods import captcha_methods
+    from hooks import error_code
+    from twocaptcha.exceptions.solver import ValidationException
+
+
+# errors of an account rather than of a captcha: the captcha wasn't accepted and is sent with another account
+ACCOUNT_ERRORS = {'ERROR_ZERO_BALANCE', 'ERROR_KEY_DOES_NOT_EXIST', 'ERROR_WRONG_USER_KEY', 'ERROR_IP_NOT_ALLOWED',
+                  'IP_BANNED'}
+
+# weight of the recent error rate of an account in its load: an account failing every captcha counts as 5 times busier
+ERROR_PENALTY = 4
+
+
+def _rewind(args, kwargs):
+    # open files among the arguments of a captcha, moved back before it is sent with the next account
+    sources = list(args) + list(kwargs.values())
+    for value in list(sources):
+        if isinstance(value, dict):
+            sources.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            sources.extend(value)
+
+    return Rewind(sources)
+
+
+class _Account():
+    # a key with its solver and usage
+
+    def __init__(self, solver, window):
+        self.solver = solver
+        self.in_flight = 0
+        self.submits = 0
+        self.results = 0
+        self.errors = 0
+        self.recent = deque(maxlen=window)
+        self.balance = None
+        self.balance_updated = None
+        self.disabled_until = 0
+        self.last_used = 0
+
+    @property
+    def name(self):
+        # keys are secrets, only their end is shown
+        return '...' + str(self.solver.API_KEY)[-4:]
+
+    def error_rate(self):
+        return sum(self.recent) / len(self.recent) if self.recent else 0
+
+    def load(self):
+        return (self.in_flight + 1) * (1 + ERROR_PENALTY * self.error_rate())
+
+
+class BaseAccountPool():
+    """
+    Spreads captchas over several 2captcha accounts. Each captcha is sent with the account with the most headroom:
+    the fewest captchas in flight, weighted by its recent error rate, then the highest balance. Its answer is polled
+    with the account that sent it.
+
+    Accounts whose balance is known to be at most min_balance are skipped. Accounts failing with an account error
+    (ERROR_ZERO_BALANCE, ERROR_KEY_DOES_NOT_EXIST...) are skipped for cooldown seconds. If the error was returned when
+    the captcha was sent, the captcha is sent with the next account, with its open files moved back to where they were
+    (files that can only be read once are not sent again). If every account is skipped, captchas are sent anyway, to
+    fail with the error of the account.
+
+    Parameters
+    __________
+    solvers : list
+        Solver of each account.
+    balance_interval : float, optional
+        Time in seconds between balance requests of each account, made in the background. None to ignore balances.
+        Default: 300.
+    min_balance : float, optional
+        Balance at or under which an account is not used.
+        Default: 0.
+    cooldown : float, optional
+        Time in seconds an account is skipped after an account error.
+        Default: 60.
+    window : int, optional
+        Number of recent captchas of an account its error rate is computed from.
+        Default: 50.
+    """
+
+    def __init__(self, solvers, balance_interval=300, min_balance=0, cooldown=60, window=50):
+        if not solvers:
+            raise ValidationException('at least one API key is required')
+        if any(getattr(solver, 'journal', None) is not None for solver in solvers):
+            # the journal of an account would resume the captchas of the others
+            raise ValidationException('journal is not supported with several accounts')
+
+        self.balance_interval = balance_interval
+        self.min_balance = min_balance
+        self.cooldown = cooldown
+
+        self._accounts = [_Account(solver, window) for solver in solvers]
+        self._owners = OrderedDict()
+        self._max_owners = 10000
+        self._uses = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def solvers(self):
+        return [account.solver for account in self._accounts]
+
+    def _acquire(self, tried=()):
+        # account a captcha is sent with, counted as in flight until _release()
+        now = time.monotonic()
+
+        with self._lock:
+            accounts = [account for account in self._accounts if account not in tried]
+            usable = [account for account in accounts if account.disabled_until <= now and
+                      (account.balance is None or account.balance > self.min_balance)]
+
+            account = min(usable or accounts, key=lambda a: (a.load(), -(a.balance or 0), a.last_used))
+            account.in_flight += 1
+            account.submits += 1
+            account.last_used = next(self._uses)
+
+            return account
+
+    def _release(self, account, error=None, cancelled=False):
+        '''Records the outcome of a captcha. Returns whether it failed with an account error.'''
+
+        with self._lock:
+            account.in_flight -= 1
+            if cancelled:
+                return False
+
+            if error is None:
+                account.results += 1
+                account.recent.append(0)
+                return False
+
+            account.errors += 1
+            account.recent.append(1)
+
+            code = error_code(error)
+            if code not in ACCOUNT_ERRORS:
+                return False
+
+            account.disabled_until = time.monotonic() + self.cooldown
+            if code == 'ERROR_ZERO_BALANCE':
+                account.balance = 0
+                account.balance_updated = time.monotonic()
+            return True
+
+    def _failover(self, account, error, tried):
+        # whether a captcha failing with error is sent with another account: only if in.php failed, a captcha failing
+        # while its answer is polled was accepted (and paid for) already
+        account_error = self._release(account, error)
+        return account_error and getattr(error, 'submit_error', False) and len(tried) + 1 < len(self._accounts)
+
+    def _own(self, id_, account):
+        # remembers the account of a captcha, for get_result() and report()
+        with self._lock:
+            self._owners[id_] = account
+            while len(self._owners) > self._max_owners:
+                self._owners.popitem(last=False)
+
+    def _owned(self, result, account):
+        if isinstance(result, dict) and 'captchaId' in result:
+            self._own(result['captchaId'], account)
+        return result
+
+    def _owner(self, id_):
+        with self._lock:
+            account = self._owners.get(id_)
+        if account is None:
+            raise ValidationException(f'captcha {id_} was not sent by this pool')
+        return account
+
+    def _due_balances(self):
+        # accounts whose balance is requested now, claimed so that it's requested once
+        if self.balance_interval is None:
+            return []
+
+        now = time.monotonic()
+        with self._lock:
+            due = [account for account in self._accounts if account.balance_updated is None or
+                   now - account.balance_updated >= self.balance_interval]
+            for account in due:
+                account.balance_updated = now
+            return due
+
+    def _set_balance(self, account, balance):
+        with self._lock:
+            account.balance = balance
+            account.balance_updated = time.monotonic()
+
+    def stats(self):
+        '''Returns the usage of each account, in the order of the keys: the end of its key, captchas in flight, sent,
+        solved and failed, recent error rate, last known balance (None if unknown) and whether it is skipped after an
+        account error.'''
+
+        now = time.monotonic()
+        with self._lock:
+            return [{
+                'key': account.name,
+                'in_flight': account.in_flight,
+                'submits': account.submits,
+                'results': account.results,
+                'errors': account.errors,
+                'error_rate': account.error_rate(),
+                'balance': account.balance,
+                'disabled': account.disabled_until > now,
+            } for account in self._accounts]
+
+
+@captcha_methods
+class AccountPool(BaseAccountPool):
+    """
+    TwoCaptcha spread over several 2captcha accounts, with the same captcha methods (normal, recaptcha, ...), solve(),
+    submit() and solve_many().
+
+    Each captcha is sent with the account with the most headroom: the fewest captchas in flight, weighted by its recent
+    error rate, then the highest balance. Its answer is polled with the account that sent it. Accounts with a balance
+    at or under minBalance are skipped, accounts failing with an account error (ERROR_ZERO_BALANCE,
+    ERROR_KEY_DOES_NOT_EXIST...) are skipped for cooldown seconds and a captcha refused with such an error is sent with
+    the next account.
+
+    Parameters
+    __________
+    apiKeys : list
+        API keys of the accounts, or TwoCaptcha instances to configure accounts differently.
+    balanceInterval : float, optional
+        Time in seconds between balance requests of each account, made in the background. None to ignore balances.
+        Default: 300.
+    minBalance : float, optional
+        Balance at or under which an account is not used.
+        Default: 0.
+    cooldown : float, optional
+        Time in seconds an account is skipped after an account error.
+        Default: 60.
+    **options : dict
+        Options of the TwoCaptcha instances created for the keys (server, pollingInterval, hooks...).
+    """
+
+    def __init__(self, apiKeys, balanceInterval=300, minBalance=0, cooldown=60, **options):
+        try:
+            from .solver import TwoCaptcha
+        except ImportError:
+            from solver import TwoCaptcha
+
+        solvers = [key if isinstance(key, TwoCaptcha) else TwoCaptcha(key, **options) for key in apiKeys]
+        super().__init__(solvers, balanceInterval, minBalance, cooldown)
+
+    def close(self):
+        '''Closes the solvers of the accounts.'''
+
+        for solver in self.solvers:
+            solver.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _acquire(self, tried=()):
+        due = self._due_balances()
+        if due:
+            threading.Thread(target=self._fetch_balances, args=(due,), name='twocaptcha-balances', daemon=True).start()
+
+        return super()._acquire(tried)
+
+    def _fetch_balances(self, accounts):
+        for account in accounts:
+            try:
+                self._set_balance(account, account.solver.balance())
+            except Exception:
+                # tried again after balanceInterval
+                pass
+
+    def refresh_balances(self):
+        '''Requests the balance of every account now.'''
+
+        with self._lock:
+            for account in self._accounts:
+                account.balance_updated = time.monotonic()
+        self._fetch_balances(self._accounts)
+
+    def _run(self, function, rewind):
+        # calls function with the solver of an account, then of the next accounts on account errors
+        tried = []
+
+        while True:
+            account = self._acquire(tried)
+            try:
+                rewind()
+                result = function(account.solver)
+            except Exception as e:
+                # files that can only be read once are not sent again
+                if self._failover(account, e, tried) and rewind.replayable:
+                    tried.append(account)
+                    continue
+                raise
+            except BaseException:
+                self._release(account, cancelled=True)
+                raise
+
+            self._release(account)
+            return self._owned(result, account)
+
+    def _call_method(self, spec, args, kwargs):
+        return self._run(lambda solver: solver._call_method(spec, args, kwargs), _rewind(args, kwargs))
+
+    def solve(self, timeout=0, polling_interval=0, deadline=None, **kwargs):
+        '''Sends a captcha with an account of the pool and waits for its answer, see TwoCaptcha.solve().'''
+
+        return self._run(lambda solver: solver.solve(timeout, polling_interval, deadline, **kwargs),
+                         _rewind((), kwargs))
+
+    def submit(self, method, **kwargs):
+        '''Sends a captcha with an account of the pool without waiting for the answer, see TwoCaptcha.submit().
+
+        Returns
+
+        future : concurrent.futures.Future
+        '''
+
+        future = Future()
+        self._submit(future, method, kwargs, _rewind((), kwargs), [])
+        return future
+
+    def _submit(self, future, method, kwargs, rewind, tried):
+        account = self._acquire(tried)
+        rewind()
+        answer = account.solver.submit(method, **kwargs)
+
+        future.add_done_callback(lambda f: f.cancelled() and answer.cancel())
+        answer.add_done_callback(lambda f: self._submitted(future, method, kwargs, rewind, tried, account, f))
+
+    def _submitted(self, future, method, kwargs, rewind, tried, account, answer):
+        if answer.cancelled():
+            self._release(account, cancelled=True)
+            future.cancel()
+            return
+
+        error = answer.exception()
+        if error is not None and self._failover(account, error, tried) and rewind.replayable and not future.cancelled():
+            self._submit(future, method, kwargs, rewind, tried + [account])
+            return
+
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                self._release(account)
+                future.set_result(self._owned(answer.result(), account))
+        except InvalidStateError:
+            # cancelled by the caller
+            pass
+
+    def solve_many(self, tasks, concurrency=10):
+        '''Solves many captchas concurrently with the accounts of the pool, see TwoCaptcha.solve_many().'''
+
+        return submit_tasks(self.submit, tasks, concurrency)
+
+    def send(self, **kwargs):
+        '''Sends a captcha with an account of the pool, see TwoCaptcha.send(). Its answer is looked up with
+        get_result().'''
+
+        account = self._acquire()
+        try:
+            id_ = account.solver.send(**kwargs)
+        except Exception as e:
+            self._release(account, e)
+            raise
+
+        self._release(account, cancelled=True)
+        self._own(id_, account)
+        return id_
+
+    def get_result(self, id_, deadline=None):
+        '''Looks up the answer of a captcha with the account that sent it, see TwoCaptcha.get_result().'''
+
+        return self._owner(id_).solver.get_result(id_, deadline)
+
+    def report(self, id_, correct):
+        '''Reports the answer of a captcha with the account that sent it, see TwoCaptcha.report().'''
+
+        return self._owner(id_).solver.report(id_, correct)
+
+    def balance(self):
+        '''Returns the total balance of the accounts, requested now. The balance of each account is in stats().'''
+
+        self.refresh_balances()
+        with self._lock:
+            return sum(account.balance or 0 for account in self._accounts)
+
+
+@captcha_methods
+class AsyncAccountPool(BaseAccountPool):
+    """
+    AsyncTwoCaptcha spread over several 2captcha accounts, with the same captcha methods (normal, recaptcha, ...),
+    solve() and solve_many(). Accounts are chosen as by AccountPool.
+
+    Parameters
+    __________
+    apiKeys : list
+        API keys of the accounts, or AsyncTwoCaptcha instances to configure accounts differently.
+    balanceInterval : float, optional
+        Time in seconds between balance requests of each account, made in the background. None to ignore balances.
+        Default: 300.
+    minBalance : float, optional
+        Balance at or under which an account is not used.
+        Default: 0.
+    cooldown : float, optional
+        Time in seconds an account is skipped after an account error.
+        Default: 60.
+    **options : dict
+        Options of the AsyncTwoCaptcha instances created for the keys (server, pollingInterval, hooks...).
+    """
+
+    def __init__(self, apiKeys, balanceInterval=300, minBalance=0, cooldown=60, **options):
+        try:
+            from .async_solver import AsyncTwoCaptcha
+        except ImportError:
+            from async_solver import AsyncTwoCaptcha
+
+        solvers = [key if isinstance(key, AsyncTwoCaptcha) else AsyncTwoCaptcha(key, **options) for key in apiKeys]
+        super().__init__(solvers, balanceInterval, minBalance, cooldown)
+        self._refreshing = set()
+
+    async def aclose(self):
+        '''Closes the solvers of the accounts.'''
+
+        for task in list(self._refreshing):
+            task.cancel()
+        for solver in self.solvers:
+            await solver.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    def _acquire(self, tried=()):
+        due = self._due_balances()
+        if due:
+            task = asyncio.ensure_future(self._fetch_balances(due))
+            self._refreshing.add(task)
+            task.add_done_callback(self._refreshing.discard)
+
+        return super()._acquire(tried)
+
+    async def _fetch_balances(self, accounts):
+        async def fetch(account):
+            try:
+                self._set_balance(account, await account.solver.balance())
+            except Exception:
+                pass
+
+        await asyncio.gather(*(fetch(account) for account in accounts))
+
+    async def refresh_balances(self):
+        '''Requests the balance of every account now.'''
+
+        with self._lock:
+            for account in self._accounts:
+                account.balance_updated = time.monotonic()
+        await self._fetch_balances(self._accounts)
+
+    async def _run(self, function, rewind):
+        tried = []
+
+        while True:
+            account = self._acquire(tried)
+            try:
+                rewind()
+                result = await function(account.solver)
+            except Exception as e:
+                if self._failover(account, e, tried) and rewind.replayable:
+                    tried.append(account)
+                    continue
+                raise
+            except BaseException:
+                self._release(account, cancelled=True)
+                raise
+
+            self._release(account)
+            return self._owned(result, account)
+
+    async def _call_method(self, spec, args, kwargs):
+        return await self._run(lambda solver: solver._call_method(spec, args, kwargs), _rewind(args, kwargs))
+
+    async def solve(self, timeout=0, polling_interval=0, deadline=None, **kwargs):
+        '''Sends a captcha with an account of the pool and waits for its answer, see AsyncTwoCaptcha.solve().'''
+
+        return await self._run(lambda solver: solver.solve(timeout, polling_interval, deadline, **kwargs),
+                               _rewind((), kwargs))
+
+    def solve_many(self, tasks, concurrency=100):
+        '''Solves many captchas concurrently with the accounts of the pool, see AsyncTwoCaptcha.solve_many().'''
+
+        return run_tasks(self, tasks, concurrency)
+
+    async def send(self, **kwargs):
+        '''Sends a captcha with an account of the pool, see AsyncTwoCaptcha.send(). Its answer is looked up with
+        get_result().'''
+
+        account = self._acquire()
+        try:
+            id_ = await account.solver.send(**kwargs)
+        except Exception as e:
+            self._release(account, e)
+            raise
+
+        self._release(account, cancelled=True)
+        self._own(id_, account)
+        return id_
+
+    async def get_result(self, id_, deadline=None):
+        '''Looks up the answer of a captcha with the account that sent it, see AsyncTwoCaptcha.get_result().'''
+
+        return await self._owner(id_).solver.get_result(id_, deadline)
+
+    async def report(self, id_, correct):
+        '''Reports the answer of a captcha with the account that sent it, see AsyncTwoCaptcha.report().'''
+
+        return await self._owner(id_).solver.report(id_, correct)
+
+    async def balance(self):
+        '''Returns the total balance of the accounts, requested now. The balance of each account is in stats().'''
+
+        await self.refresh_balances()
+        with self._lock:
+            return sum(account.balance or 0 for account in self._accounts)
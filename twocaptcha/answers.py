@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, InvalidStateError
+
+try:
+    from .files import as_bytes, is_buffer
+    from .exceptions.solver import ApiException
+except ImportError:
+    from files import as_bytes, is_buffer
+    from twocaptcha.exceptions.solver import ApiException
+
+
+def answer_key(content, options):
+    '''Returns the cache key of a captcha: a hash of its image and of the options it is solved with.
+
+    Parameters
+    __________
+    content : bytes
+        Content of the captcha image.
+    options : dict
+        Options affecting the answer (numeric, minLen, lang, ...). Buffers, e.g. the content of hintImg, are hashed.
+
+    Returns
+
+    key : str, or None if an option can't be hashed (e.g. an open file)
+    '''
+
+    values = {}
+    for name, value in options.items():
+        if is_buffer(value):
+            value = hashlib.sha256(as_bytes(value)).hexdigest()
+        elif not isinstance(value, (str, int, float, bool, type(None))):
+            return None
+        values[name] = value
+
+    digest = hashlib.sha256(as_bytes(content))
+    digest.update(b'\0' + json.dumps(values, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class MemoryStorage():
+    """
+    Answers cached in memory, least recently used ones are evicted first.
+
+    Parameters
+    __________
+    max_entries : int, optional
+        Maximum number of answers kept.
+        Default: 1000.
+    """
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        '''Returns the answer stored for a key, None if there is none or it expired.'''
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires, result = entry
+            if expires <= time.time():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return result
+
+    def set(self, key, result, expires):
+        '''Stores an answer until the expires timestamp (time.time()).'''
+
+        with self._lock:
+            self._entries[key] = (expires, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, captcha_id):
+        '''Removes the answers of a captcha.'''
+
+        with self._lock:
+            for key in [key for key, (_, result) in self._entries.items() if result.get('captchaId') == captcha_id]:
+                del self._entries[key]
+
+
+class SqliteStorage():
+    """
+    Answers cached in a sqlite database, so that they survive restarts and can be shared by processes. Least
+    recently used ones are evicted first.
+
+    Parameters
+    __________
+    path : str
+        Path of the database file, created if missing.
+    max_entries : int, optional
+        Maximum number of answers kept.
+        Default: 100000.
+    """
+
+    def __init__(self, path, max_entries=100000):
+        self.path = path
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('CREATE TABLE IF NOT EXISTS answers (key TEXT PRIMARY KEY, captcha_id TEXT, result TEXT, '
+                         'expires REAL, used REAL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS answers_used ON answers (used)')
+
+    def get(self, key):
+        '''Returns the answer stored for a key, None if there is none or it expired.'''
+
+        now = time.time()
+
+        with self._lock:
+            row = self._db.execute('SELECT result, expires FROM answers WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+
+            if row[1] <= now:
+                self._db.execute('DELETE FROM answers WHERE key = ?', (key,))
+                return None
+
+            self._db.execute('UPDATE answers SET used = ? WHERE key = ?', (now, key))
+            return json.loads(row[0])
+
+    def set(self, key, result, expires):
+        '''Stores an answer until the expires timestamp (time.time()).'''
+
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?)',
+                             (key, result.get('captchaId'), json.dumps(result), expires, time.time()))
+            self._db.execute('DELETE FROM answers WHERE key IN (SELECT key FROM answers ORDER BY used DESC '
+                             'LIMIT -1 OFFSET ?)', (self.max_entries,))
+
+    def discard(self, captcha_id):
+        '''Removes the answers of a captcha.'''
+
+        with self._lock:
+            self._db.execute('DELETE FROM answers WHERE captcha_id = ?', (captcha_id,))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class AnswerCache():
+    """
+    Answers of image captchas by content, so that byte-identical captchas are solved once.
+
+    Answers are kept for ttl seconds. Identical captchas sent while the first one is being solved wait for its answer
+    instead of creating 2captcha tasks of their own. Failures are not cached, and answers reported as incorrect with
+    report() are removed.
+
+    Parameters
+    __________
+    ttl : float, optional
+        Time in seconds answers are kept.
+        Default: 3600.
+    storage : MemoryStorage or SqliteStorage, optional
+        Where answers are kept.
+        Default: MemoryStorage().
+    """
+
+    def __init__(self, ttl=3600, storage=None):
+        self.ttl = ttl
+        self.storage = storage if storage is not None else MemoryStorage()
+
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+
+    def _join(self, key):
+        # (future of the answer, whether the caller has to solve the captcha and settle the future)
+        with self._lock:
+            result = self.storage.get(key)
+            if result is not None:
+                self._hits += 1
+                future = Future()
+                future.set_result(dict(result))
+                return future, False
+
+            solve = self._in_flight.get(key)
+            if solve is not None:
+                self._coalesced += 1
+                solve.callers += 1
+                return solve.future, False
+
+            self._misses += 1
+            solve = self._in_flight[key] = _Solve()
+            return solve.future, True
+
+    def _start(self, key, future, cancel):
+        # cancel stops the solve, once no caller waits for its answer anymore
+        with self._lock:
+            solve = self._in_flight.get(key)
+            if solve is not None and solve.future is future:
+                solve.cancel = cancel
+
+    def _detach(self, key, future):
+        # a caller stopped waiting, the solve goes on as long as others wait for it
+        with self._lock:
+            solve = self._in_flight.get(key)
+            if solve is None or solve.future is not future:
+                return
+            solve.callers -= 1
+            if solve.callers:
+                return
+            del self._in_flight[key]
+
+        if solve.cancel is not None:
+            solve.cancel()
+        self._settle(key, future, error=_cancelled())
+
+    def _settle(self, key, future, result=None, error=None):
+        with self._lock:
+            if error is None:
+                self.storage.set(key, dict(result), time.time() + self.ttl)
+            solve = self._in_flight.get(key)
+            if solve is not None and solve.future is future:
+                del self._in_flight[key]
+
+        if error is not None and not isinstance(error, Exception):
+            # the solve was interrupted, the callers waiting for it fail instead of being cancelled
+            error = _cancelled()
+
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            pass
+
+    def _settle_from(self, key, future, answer):
+        # settles the shared future from the future or task solving the captcha
+        if answer.cancelled():
+            self._settle(key, future, error=_cancelled())
+        elif answer.exception() is not None:
+            self._settle(key, future, error=answer.exception())
+        else:
+            self._settle(key, future, answer.result())
+
+    def call(self, key, function):
+        '''Returns the cached answer of a captcha, calling function (without arguments) to solve it on a miss.'''
+
+        future, solves = self._join(key)
+        if not solves:
+            return dict(future.result())
+
+        try:
+            result = function()
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+
+        self._settle(key, future, result)
+        return result
+
+    def complete(self, key, future, function):
+        '''Completes future (a concurrent.futures.Future) with the cached answer of a captcha or, on a miss, calls
+        function with a new future, which it completes with the answer after sending the captcha.
+
+        Cancelling future only detaches the caller: the captcha is polled until every caller waiting for its answer
+        cancelled.
+
+        Returns
+
+        called : bool
+            Whether function was called.
+        '''
+
+        shared, solves = self._join(key)
+        answer = Future()
+        if solves:
+            self._start(key, shared, answer.cancel)
+            answer.add_done_callback(lambda f: self._settle_from(key, shared, f))
+
+        shared.add_done_callback(lambda f: _copy(f, future))
+        future.add_done_callback(lambda f: f.cancelled() and self._detach(key, shared))
+        if not solves or answer.cancelled():
+            return False
+
+        try:
+            function(answer)
+        except Exception as e:
+            self._settle(key, shared, error=e)
+            raise
+        return True
+
+    async def acall(self, key, function):
+        '''Returns the cached answer of a captcha, awaiting function (a coroutine function without arguments) to solve
+        it on a miss.
+
+        The captcha is solved in a task of its own: cancelling the caller only detaches it, the task is cancelled
+        once every caller waiting for its answer is.'''
+
+        future, solves = self._join(key)
+        if solves:
+            task = asyncio.ensure_future(function())
+            self._start(key, future, task.cancel)
+            task.add_done_callback(lambda t: self._settle_from(key, future, t))
+
+        try:
+            return dict(await asyncio.shield(asyncio.wrap_future(future)))
+        except asyncio.CancelledError:
+            self._detach(key, future)
+            raise
+
+    def discard(self, captcha_id):
+        '''Removes the answers of a captcha, e.g. after it was reported as incorrect.'''
+
+        self.storage.discard(captcha_id)
+
+    def stats(self):
+        '''Returns the number of answers found in the cache (hits), of captchas solved (misses) and of captchas that
+        waited for an identical one being solved (coalesced).'''
+
+        with self._lock:
+            return {'hits': self._hits, 'misses': self._misses, 'coalesced': self._coalesced}
+
+
+class _Solve():
+    # captcha being solved, shared by the identical captchas sent meanwhile
+    def __init__(self):
+        self.future = Future()
+        self.callers = 1
+        self.cancel = None
+
+
+def _cancelled():
+    return ApiException('solving the captcha was cancelled')
+
+
+def _copy(answer, future):
+    try:
+        if answer.exception() is not None:
+            future.set_exception(answer.exception())
+        else:
+            future.set_result(dict(answer.result()))
+    except InvalidStateError:
+        # cancelled by the caller
+        pass
@@ -1,26 +1,140 @@
 #!/usr/bin/env python3
 
+import threading
+import time
+from contextlib import ExitStack
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from urllib3.util import Timeout
 
 try:
     from .exceptions.api import NetworkException, ApiException
+    from .files import as_bytes, is_buffer, is_stream
+    from .timeouts import RequestTimeout, DEFAULT_UPLOAD_TIMEOUT, DEFAULT_POLL_TIMEOUT
 except ImportError:
     from twocaptcha.exceptions.api import NetworkException, ApiException
+    from twocaptcha.files import as_bytes, is_buffer, is_stream
+    from twocaptcha.timeouts import RequestTimeout, DEFAULT_UPLOAD_TIMEOUT, DEFAULT_POLL_TIMEOUT
 
 
 class ApiClient():
-    def __init__(self, post_url='2captcha.com'):
+    def __init__(self, post_url='2captcha.com', pool_connections=10, pool_maxsize=10, keep_alive=True,
+                 upload_timeout=DEFAULT_UPLOAD_TIMEOUT, poll_timeout=DEFAULT_POLL_TIMEOUT):
+        '''
+
+        Parameters
+        ----------
+        post_url : str, optional
+            API server, with an optional scheme (https:// if there is none). The default is '2captcha.com'.
+        pool_connections : int, optional
+            Number of connection pools (one per host) to cache. The default is 10.
+        pool_maxsize : int, optional
+            Maximum number of connections kept open per host. The default is 10.
+        keep_alive : bool, optional
+            Reuse connections between requests. The default is True.
+        upload_timeout : RequestTimeout or float, optional
+            Timeouts of requests sending captchas (in.php). The default is
+            10s to connect, 60s to read and 180s in total.
+        poll_timeout : RequestTimeout or float, optional
+            Timeouts of the other requests (res.php). The default is 10s to
+            connect, 30s to read and 60s in total.
+
+        '''
+
         self.post_url = post_url
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.upload_timeout = RequestTimeout.of(upload_timeout)
+        self.poll_timeout = RequestTimeout.of(poll_timeout)
+
+        self._adapter = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        # https is assumed for servers given without a scheme, e.g. 2captcha.com
+        return self.post_url if '://' in self.post_url else 'https://' + self.post_url
+
+    @property
+    def session(self):
+        '''
+        requests.Session of the calling thread.
+
+        Every thread gets its own session (sessions keep mutable state such as
+        cookies), but all of them share a single connection pool, so
+        connections opened by one thread are reused by the others.
+        '''
+
+        session = getattr(self._local, 'session', None)
+        if session is not None:
+            return session
+
+        with self._lock:
+            if self._adapter is None:
+                self._adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                                            pool_maxsize=self.pool_maxsize)
+            adapter = self._adapter
 
-    def in_(self, files={}, **kwargs):
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if not self.keep_alive:
+            session.headers['Connection'] = 'close'
+
+        self._local.session = session
+        return session
+
+    def close(self):
+        '''
+        closes all pooled connections. The client can still be used afterwards,
+        a new pool is created on the next request.
+        '''
+
+        with self._lock:
+            adapter, self._adapter = self._adapter, None
+            self._local = threading.local()
+
+        if adapter is not None:
+            adapter.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def _timeout(timeouts, remaining):
+        # urllib3 applies the total timeout to connecting and waiting for the response, the read timeout is what is
+        # left of it once connected
+        timeouts = timeouts.limit(remaining)
+        return Timeout(connect=timeouts.connect, read=timeouts.read, total=timeouts.total)
+
+    @staticmethod
+    def _part(stack, key, file):
+        # in-memory images are sent as they are, without copying them to a file or encoding them
+        if is_buffer(file):
+            return key, as_bytes(file)
+        if is_stream(file):
+            return file
+        return stack.enter_context(open(file, 'rb'))
+
+    def in_(self, files={}, timeout=None, **kwargs):
         '''
         
         sends POST-request (files and/or params) to solve captcha
 
         Parameters
         ----------
-        files : TYPE, optional
-            DESCRIPTION. The default is {}.
+        files : dict, optional
+            Files by field name: paths, open files or buffers such as bytes
+            or memoryview. The default is {}.
+        timeout : float, optional
+            Time left for the request in seconds, caps upload_timeout. The default is None.
         **kwargs : TYPE
             DESCRIPTION.
 
@@ -38,33 +152,26 @@ class ApiClient():
 
         '''
 
-        try:
-            current_url = 'https://' + self.post_url + '/in.php'
-            if files:
-
-                files = {key: open(path, 'rb') for key, path in files.items()}
-                resp = requests.post(current_url,
-                                     data=kwargs,
-                                     files=files)
+        timeout = self._timeout(self.upload_timeout, timeout)
 
-                [f.close() for f in files.values()]
+        if 'file' in kwargs:
+            files = dict(files, file=kwargs.pop('file'))
 
-            elif 'file' in kwargs:
+        try:
+            current_url = self.base_url + '/in.php'
 
-                with open(kwargs.pop('file'), 'rb') as f:
-                    resp = requests.post(current_url,
+            with ExitStack() as stack:
+                parts = {key: self._part(stack, key, file) for key, file in files.items()}
+                resp = self.session.post(current_url,
                                          data=kwargs,
-                                         files={'file': f})
-
-            else:
-                resp = requests.post(current_url,
-                                     data=kwargs)
+                                         files=parts or None,
+                                         timeout=timeout)
 
         except requests.RequestException as e:
-            raise NetworkException(e)
+            raise NetworkException(e, connect_error=_connect_error(e))
 
         if resp.status_code != 200:
-            raise NetworkException(f'bad response: {resp.status_code}')
+            raise NetworkException(f'bad response: {resp.status_code}', status_code=resp.status_code)
 
         resp = resp.content.decode('utf-8')
 
@@ -73,12 +180,14 @@ class ApiClient():
 
         return resp
 
-    def res(self, **kwargs):
+    def res(self, timeout=None, **kwargs):
         '''
         sends additional GET-requests (solved captcha, balance, report etc.)
 
         Parameters
         ----------
+        timeout : float, optional
+            Time left for the request in seconds, caps poll_timeout. The default is None.
         **kwargs : TYPE
             DESCRIPTION.
 
@@ -96,12 +205,14 @@ class ApiClient():
 
         '''
 
+        timeout = self._timeout(self.poll_timeout, timeout)
+
         try:
-            current_url_out = 'https://' + self.post_url + '/res.php'
-            resp = requests.get(current_url_out, params=kwargs)
+            current_url_out = self.base_url + '/res.php'
+            resp = self.session.get(current_url_out, params=kwargs, timeout=timeout)
 
             if resp.status_code != 200:
-                raise NetworkException(f'bad response: {resp.status_code}')
+                raise NetworkException(f'bad response: {resp.status_code}', status_code=resp.status_code)
 
             resp = resp.content.decode('utf-8')
 
@@ -112,3 +223,81 @@ class ApiClient():
             raise NetworkException(e)
 
         return resp
+
+    def download(self, url, max_size=None, etag=None, timeout=None):
+        '''
+        downloads a captcha image through the connection pool
+
+        Parameters
+        ----------
+        url : str
+            URL of the image.
+        max_size : int, optional
+            Maximum size of the image in bytes, None for no limit. The default is None.
+        etag : str, optional
+            ETag of a cached copy of the image, sent as If-None-Match. The default is None.
+        timeout : float, optional
+            Time left for the request in seconds, caps upload_timeout. The default is None.
+
+        Raises
+        ------
+        NetworkException
+            The image could not be downloaded or is larger than max_size.
+
+        Returns
+        -------
+        content, etag : tuple
+            Content of the image (None if the cached copy is still valid) and
+            its ETag (None if the server sent none).
+
+        '''
+
+        timeout = self._timeout(self.upload_timeout, timeout)
+        headers = {'If-None-Match': etag} if etag else {}
+        started = time.monotonic()
+
+        try:
+            with self.session.get(url, headers=headers, timeout=timeout, stream=True) as resp:
+                if etag and resp.status_code == 304:
+                    return None, etag
+
+                if resp.status_code != 200:
+                    raise NetworkException(f'bad response: {resp.status_code}', status_code=resp.status_code)
+
+                content = _read_limited(resp.iter_content(64 * 1024), resp.headers, max_size,
+                                        _deadline(started, timeout.total))
+                return content, resp.headers.get('ETag')
+
+        except requests.RequestException as e:
+            raise NetworkException(e)
+
+
+def _deadline(started, total):
+    # time.monotonic() timestamp ending a request, None if it has no total timeout
+    return started + total if total is not None else None
+
+
+def _read_limited(chunks, headers, max_size, deadline=None):
+    # the image is never read past max_size, whatever Content-Length says, nor past the total timeout of the request
+    length = headers.get('Content-Length')
+    if max_size is not None and length and length.isdigit() and int(length) > max_size:
+        raise NetworkException(f'image of {length} bytes exceeds the limit of {max_size} bytes')
+
+    content = bytearray()
+    for chunk in chunks:
+        content += chunk
+        if max_size is not None and len(content) > max_size:
+            raise NetworkException(f'image exceeds the limit of {max_size} bytes')
+        if deadline is not None and time.monotonic() > deadline:
+            raise NetworkException('request timed out before the image was downloaded')
+
+    return bytes(content)
+
+
+def _connect_error(e):
+    # the connection to the server could not be opened (refused, unresolved, timed out), so no request was sent
+    if isinstance(e, requests.ConnectTimeout):
+        return True
+
+    reason = getattr(e.args[0], 'reason', None) if e.args else None
+    return isinstance(e, requests.ConnectionError) and isinstance(reason, NewConnectionError)
@@ -1,29 +1,276 @@
 #!/usr/bin/env python3
 
-from contextlib import AsyncExitStack
+import asyncio
+import inspect
+import io
+import mimetypes
+import os
+import weakref
 
 import aiofiles
 import httpx
 
 try:
     from .exceptions.api import NetworkException, ApiException
+    from .files import as_bytes, is_buffer
+    from .timeouts import RequestTimeout, DEFAULT_UPLOAD_TIMEOUT, DEFAULT_POLL_TIMEOUT
 except ImportError:
     from twocaptcha.exceptions.api import NetworkException, ApiException
+    from twocaptcha.files import as_bytes, is_buffer
+    from twocaptcha.timeouts import RequestTimeout, DEFAULT_UPLOAD_TIMEOUT, DEFAULT_POLL_TIMEOUT
+
+
+class AsyncMultipartStream():
+    """
+    multipart/form-data request body streamed from the files in chunks, so they are never held in memory as a whole.
+
+    Files can be given as paths, buffers such as bytes or memoryview (sent without copying them), open files (read in
+    the default executor so that the event loop isn't blocked, except io.BytesIO, or awaited for async files such as
+    those of aiofiles) or async iterables of bytes.
+
+    Parameters
+    __________
+    data : dict
+        Form fields.
+    files : dict
+        Files by field name.
+    chunk_size : int, optional
+        Size of the chunks files are read in.
+        Default: 64 KiB.
+    """
+
+    def __init__(self, data, files, chunk_size=64 * 1024):
+        self.data = data
+        self.files = files
+        self.chunk_size = chunk_size
+        self.boundary = os.urandom(16).hex()
+
+    @property
+    def headers(self):
+        headers = {'Content-Type': f'multipart/form-data; boundary={self.boundary}'}
+
+        length = self.content_length()
+        if length is not None:
+            headers['Content-Length'] = str(length)
+
+        return headers
+
+    def content_length(self):
+        '''Size of the body in bytes, None if the size of a file is unknown (the body is then sent chunked).'''
+
+        length = sum(len(part) for part in self._fields()) + len(self._closing())
+
+        for name, file in self.files.items():
+            size = self._size(file)
+            if size is None:
+                return None
+            length += len(self._file_header(name, file)) + size + 2
+
+        return length
+
+    def _fields(self):
+        for name, value in self.data.items():
+            yield (f'--{self.boundary}\r\nContent-Disposition: form-data; name="{_quote(name)}"\r\n\r\n'
+                   f'{value}\r\n').encode('utf-8')
+
+    def _file_header(self, name, file):
+        path = file if isinstance(file, (str, os.PathLike)) else getattr(file, 'name', None)
+        filename = os.path.basename(path) if isinstance(path, (str, os.PathLike)) else name
+        content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+        return (f'--{self.boundary}\r\nContent-Disposition: form-data; name="{_quote(name)}"; '
+                f'filename="{_quote(filename)}"\r\nContent-Type: {content_type}\r\n\r\n').encode('utf-8')
+
+    def _closing(self):
+        return f'--{self.boundary}--\r\n'.encode('utf-8')
+
+    @staticmethod
+    def _size(file):
+        if is_buffer(file):
+            return as_bytes(file).nbytes
+
+        if isinstance(file, (str, os.PathLike)):
+            return os.path.getsize(file)
+
+        if isinstance(file, io.IOBase) and file.seekable():
+            position = file.tell()
+            end = file.seek(0, io.SEEK_END)
+            file.seek(position)
+            return end - position
+
+        return None
+
+    async def _chunks(self, file):
+        if is_buffer(file):
+            content = as_bytes(file)
+            for start in range(0, len(content), self.chunk_size):
+                yield content[start:start + self.chunk_size]
+
+        elif isinstance(file, (str, os.PathLike)):
+            async with aiofiles.open(file, 'rb') as f:
+                async for chunk in self._chunks(f):
+                    yield chunk
+
+        elif hasattr(file, 'read'):
+            loop = asyncio.get_running_loop()
+            blocking = not isinstance(file, io.BytesIO) and not inspect.iscoroutinefunction(file.read)
+
+            while True:
+                if blocking:
+                    chunk = await loop.run_in_executor(None, file.read, self.chunk_size)
+                else:
+                    chunk = file.read(self.chunk_size)
+                if inspect.isawaitable(chunk):
+                    chunk = await chunk
+                if not chunk:
+                    break
+                yield chunk
+
+        else:
+            async for chunk in file:
+                yield chunk
+
+    async def __aiter__(self):
+        for part in self._fields():
+            yield part
+
+        for name, file in self.files.items():
+            yield self._file_header(name, file)
+            async for chunk in self._chunks(file):
+                yield chunk
+            yield b'\r\n'
+
+        yield self._closing()
+
+
+def _quote(value):
+    # escaping of field names and file names in multipart/form-data, as done by browsers
+    return str(value).replace('"', '%22').replace('\r', '%0D').replace('\n', '%0A')
+
+
+async def _close_on_shutdown(client):
+    try:
+        yield
+    finally:
+        await client.aclose()
 
 
 class AsyncApiClient():
-    def __init__(self, post_url='2captcha.com'):
+    def __init__(self, post_url='2captcha.com', max_connections=100, max_keepalive_connections=20, http2=False,
+                 upload_timeout=DEFAULT_UPLOAD_TIMEOUT, poll_timeout=DEFAULT_POLL_TIMEOUT):
+        '''
+
+        Parameters
+        ----------
+        post_url : str, optional
+            API server, with an optional scheme (https:// if there is none). The default is '2captcha.com'.
+        max_connections : int, optional
+            Maximum number of concurrent connections to the API server. The default is 100.
+        max_keepalive_connections : int, optional
+            Maximum number of idle connections kept open for reuse, 0 disables keep-alive. The default is 20.
+        http2 : bool, optional
+            Multiplex requests over HTTP/2 connections. Requires the h2 package
+            (pip install httpx[http2]). The default is False.
+        upload_timeout : RequestTimeout or float, optional
+            Timeouts of requests sending captchas (in.php). The default is
+            10s to connect, 60s to read or write and 180s in total.
+        poll_timeout : RequestTimeout or float, optional
+            Timeouts of the other requests (res.php). The default is 10s to
+            connect, 30s to read or write and 60s in total.
+
+        '''
+
         self.post_url = post_url
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.http2 = http2
+        self.upload_timeout = RequestTimeout.of(upload_timeout)
+        self.poll_timeout = RequestTimeout.of(poll_timeout)
+
+        # one client per event loop, and the async generators closing them when their loop shuts down
+        self._clients = weakref.WeakKeyDictionary()
+        self._closers = weakref.WeakKeyDictionary()
+
+    @property
+    def base_url(self):
+        # https is assumed for servers given without a scheme, e.g. 2captcha.com
+        return self.post_url if '://' in self.post_url else 'https://' + self.post_url
+
+    @property
+    def client(self):
+        '''
+        httpx.AsyncClient shared by all requests made from the running event loop.
+
+        Connections cannot be shared between event loops, so each loop gets a
+        client of its own. It is closed when the loop shuts down its async
+        generators, as asyncio.run() does before closing the loop.
+        '''
+
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
 
-    async def in_(self, files={}, **kwargs):
+        if client is None or client.is_closed:
+            limits = httpx.Limits(max_connections=self.max_connections,
+                                  max_keepalive_connections=self.max_keepalive_connections)
+            client = self._clients[loop] = httpx.AsyncClient(follow_redirects=True, limits=limits, http2=self.http2)
+
+            # a started async generator is finalized by its loop on shutdown, while the loop can still run aclose()
+            closer = self._closers[loop] = _close_on_shutdown(client)
+            asyncio.ensure_future(closer.__anext__())
+
+        return client
+
+    async def aclose(self):
+        '''
+        closes all pooled connections of the running event loop. The client
+        can still be used afterwards, a new pool is created on the next request.
+        '''
+
+        loop = asyncio.get_running_loop()
+        client = self._clients.pop(loop, None)
+        self._closers.pop(loop, None)
+
+        if client is not None:
+            await client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    @staticmethod
+    def _timeout(timeouts, remaining):
+        # httpx.Timeout of the phases of a request, and its total timeout
+        timeouts = timeouts.limit(remaining)
+        phases = httpx.Timeout(connect=timeouts.connect, read=timeouts.read, write=timeouts.read,
+                               pool=timeouts.connect)
+        return phases, timeouts.total
+
+    @staticmethod
+    async def _within(request, total):
+        # httpx has no timeout for the whole request
+        if total is None:
+            return await request
+
+        try:
+            return await asyncio.wait_for(request, total)
+        except asyncio.TimeoutError:
+            raise NetworkException(f'request timed out after {total} seconds')
+
+    async def in_(self, files={}, timeout=None, **kwargs):
         '''
         
         sends POST-request (files and/or params) to solve captcha
 
         Parameters
         ----------
-        files : TYPE, optional
-            DESCRIPTION. The default is {}.
+        files : dict, optional
+            Files by field name: paths, buffers such as bytes or memoryview,
+            open files or async iterables of bytes, streamed in chunks. The
+            default is {}.
+        timeout : float, optional
+            Time left for the request in seconds, caps upload_timeout. The default is None.
         **kwargs : TYPE
             DESCRIPTION.
 
@@ -41,38 +288,17 @@ class AsyncApiClient():
 
         '''
 
-        try:
-            current_url = 'https://' + self.post_url + '/in.php'
-
-            async with httpx.AsyncClient(follow_redirects=True) as client:
-                if files:
-                    async with AsyncExitStack() as stack:
-                        file_objects = {}
-                        for key, path in files.items():
-                            file_handle = await stack.enter_async_context(aiofiles.open(path, 'rb'))
-                            content = await file_handle.read()
-                            file_objects[key] = content
-
-                        resp = await client.post(current_url,
-                                                 data=kwargs,
-                                                 files=file_objects)
-
-                elif 'file' in kwargs:
-                    file_path = kwargs.pop('file')
-                    async with aiofiles.open(file_path, 'rb') as file_handle:
-                        content = await file_handle.read()
-                        resp = await client.post(current_url,
-                                                 data=kwargs,
-                                                 files={'file': content})
-                else:
-                    resp = await client.post(current_url,
-                                             data=kwargs)
+        timeout, total = self._timeout(self.upload_timeout, timeout)
 
+        try:
+            resp = await self._within(self._post(files, timeout, kwargs), total)
         except httpx.RequestError as e:
-            raise NetworkException(e)
+            # no request was sent if no connection could be opened
+            raise NetworkException(e, connect_error=isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout,
+                                                                   httpx.PoolTimeout)))
 
         if resp.status_code != 200:
-            raise NetworkException(f'bad response: {resp.status_code}')
+            raise NetworkException(f'bad response: {resp.status_code}', status_code=resp.status_code)
 
         resp = resp.content.decode('utf-8')
 
@@ -81,12 +307,27 @@ class AsyncApiClient():
 
         return resp
 
-    async def res(self, **kwargs):
+    async def _post(self, files, timeout, kwargs):
+        current_url = self.base_url + '/in.php'
+
+        if 'file' in kwargs:
+            files = dict(files, file=kwargs.pop('file'))
+
+        if not files:
+            return await self.client.post(current_url, data=kwargs, timeout=timeout)
+
+        # file parts are streamed from disk (or from the given file objects) while the request is sent
+        body = AsyncMultipartStream(kwargs, files)
+        return await self.client.post(current_url, content=body, headers=body.headers, timeout=timeout)
+
+    async def res(self, timeout=None, **kwargs):
         '''
         sends additional GET-requests (solved captcha, balance, report etc.)
 
         Parameters
         ----------
+        timeout : float, optional
+            Time left for the request in seconds, caps poll_timeout. The default is None.
         **kwargs : TYPE
             DESCRIPTION.
 
@@ -104,21 +345,79 @@ class AsyncApiClient():
 
         '''
 
+        timeout, total = self._timeout(self.poll_timeout, timeout)
+
         try:
-            current_url_out = 'https://' + self.post_url + '/res.php'
+            current_url_out = self.base_url + '/res.php'
 
-            async with httpx.AsyncClient(follow_redirects=True) as client:
-                resp = await client.get(current_url_out, params=kwargs)
+            resp = await self._within(self.client.get(current_url_out, params=kwargs, timeout=timeout), total)
 
-                if resp.status_code != 200:
-                    raise NetworkException(f'bad response: {resp.status_code}')
+            if resp.status_code != 200:
+                raise NetworkException(f'bad response: {resp.status_code}', status_code=resp.status_code)
 
-                resp = resp.content.decode('utf-8')
+            resp = resp.content.decode('utf-8')
 
-                if 'ERROR' in resp:
-                    raise ApiException(resp)
+            if 'ERROR' in resp:
+                raise ApiException(resp)
 
         except httpx.RequestError as e:
             raise NetworkException(e)
 
         return resp
+
+    async def download(self, url, max_size=None, etag=None, timeout=None):
+        '''
+        downloads a captcha image through the connection pool
+
+        Parameters
+        ----------
+        url : str
+            URL of the image.
+        max_size : int, optional
+            Maximum size of the image in bytes, None for no limit. The default is None.
+        etag : str, optional
+            ETag of a cached copy of the image, sent as If-None-Match. The default is None.
+        timeout : float, optional
+            Time left for the request in seconds, caps upload_timeout. The default is None.
+
+        Raises
+        ------
+        NetworkException
+            The image could not be downloaded or is larger than max_size.
+
+        Returns
+        -------
+        content, etag : tuple
+            Content of the image (None if the cached copy is still valid) and
+            its ETag (None if the server sent none).
+
+        '''
+
+        timeout, total = self._timeout(self.upload_timeout, timeout)
+        headers = {'If-None-Match': etag} if etag else {}
+
+        try:
+            return await self._within(self._download(url, headers, max_size, etag, timeout), total)
+        except httpx.RequestError as e:
+            raise NetworkException(e)
+
+    async def _download(self, url, headers, max_size, etag, timeout):
+        async with self.client.stream('GET', url, headers=headers, timeout=timeout) as resp:
+            if etag and resp.status_code == 304:
+                return None, etag
+
+            if resp.status_code != 200:
+                raise NetworkException(f'bad response: {resp.status_code}', status_code=resp.status_code)
+
+            # the image is never read past max_size, whatever Content-Length says
+            length = resp.headers.get('Content-Length')
+            if max_size is not None and length and length.isdigit() and int(length) > max_size:
+                raise NetworkException(f'image of {length} bytes exceeds the limit of {max_size} bytes')
+
+            content = bytearray()
+            async for chunk in resp.aiter_bytes(64 * 1024):
+                content += chunk
+                if max_size is not None and len(content) > max_size:
+                    raise NetworkException(f'image exceeds the limit of {max_size} bytes')
+
+            return bytes(content), resp.headers.get('ETag')
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+
+try:
+    from .polling import estimate_solve_time
+    from .pingback import pingback_error
+    from .exceptions import api
+    from .exceptions.solver import ApiException, NetworkException, TimeoutException
+except ImportError:
+    from polling import estimate_solve_time
+    from pingback import pingback_error
+    from twocaptcha.exceptions import api
+    from twocaptcha.exceptions.solver import ApiException, NetworkException, TimeoutException
+
+
+class AsyncPendingResult():
+    """
+    Captcha waiting for its answer in an async poller.
+    """
+
+    def __init__(self, id_, polling_interval, future, timeout, method=None, first_delay=0):
+        self.id = id_
+        self.method = method
+        self.interval = polling_interval
+        self.created = time.monotonic()
+        self.next_poll = self.created + first_delay
+        # last lookup finding the answer not ready
+        self.not_ready = self.created
+        # lookups failed in a row
+        self.failures = 0
+        # end of the longest wait for the answer
+        self.deadline = self.created + timeout
+        self.waiters = 0
+        self.future = future
+
+
+class AsyncPoller():
+    """
+    Polling scheduler of an async solver.
+
+    A single task owns every pending captcha ID of the solver, kept in a heap ordered by the time of the next lookup,
+    so the number of timers doesn't grow with the number of captchas. When the earliest ID is due, it is looked up
+    together with the IDs due within half of their polling interval with one res.php?action=get&ids=... request (up
+    to batch_size IDs per request). Lookups run concurrently (at most max_requests at a time) and resolve the futures
+    awaited in wait(). Captchas looked up together are rescheduled together, with a random delay of up to jitter *
+    polling_interval, so batches that happen to fire at the same moment drift apart instead of hitting the API as a
+    burst on every tick.
+
+    The task is started on demand and exits when nothing is pending.
+
+    Parameters
+    __________
+    solver : AsyncTwoCaptcha
+        Solver used to query the API.
+    batch_size : int, optional
+        Maximum number of IDs looked up with a single request. Set to 1 to disable batched lookups.
+        Default: 100.
+    max_requests : int, optional
+        Maximum number of lookup requests in flight.
+        Default: 10.
+    jitter : float, optional
+        Random extra delay added to the polling interval when rescheduling, as a fraction of the interval.
+        Default: 0.1.
+    """
+
+    def __init__(self, solver, batch_size=100, max_requests=10, jitter=0.1):
+        self.solver = solver
+        self.batch_size = batch_size
+        self.max_requests = max_requests
+        self.jitter = jitter
+
+        self._pending = {}
+        self._heap = []
+        self._counter = itertools.count()
+        self._loop = None
+        self._task = None
+        self._wakeup = None
+        self._requests = None
+
+    async def wait(self, id_, timeout, polling_interval, method=None):
+        '''Waits until the captcha is solved.
+
+        Parameters
+        __________
+        id_ : str
+            ID of the captcha sent for solution.
+        timeout : float
+            Maximum time to wait in seconds.
+        polling_interval : float
+            Interval in seconds between lookups of this captcha.
+        method : str, optional
+            2captcha method of the captcha, used by the solver's polling policy.
+
+        Returns
+
+        answer : str or dict
+        '''
+
+        loop = asyncio.get_running_loop()
+
+        if self._loop is not loop:
+            # pending state of another event loop can't be awaited from this one
+            self._pending = {}
+            self._heap = []
+            self._loop = loop
+            self._task = None
+            self._wakeup = asyncio.Event()
+            self._requests = asyncio.Semaphore(self.max_requests)
+
+        pingback = self.solver.pingback
+
+        entry = self._pending.get(id_)
+        if entry is None:
+            first_delay, interval = self.solver.polling_policy.schedule(method, polling_interval)
+            if pingback is not None:
+                first_delay = max(first_delay, pingback.fallback)
+
+            entry = AsyncPendingResult(id_, interval, loop.create_future(), timeout, method, first_delay)
+            self._pending[id_] = entry
+            self._schedule(entry)
+        else:
+            entry.deadline = max(entry.deadline, time.monotonic() + timeout)
+        entry.waiters += 1
+
+        if self._task is None:
+            self._task = loop.create_task(self._run())
+
+        code = pingback.claim(id_) if pingback is not None else None
+        if code is not None:
+            self.deliver(id_, code)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(entry.future), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutException(f'timeout {timeout} exceeded')
+        finally:
+            entry.waiters -= 1
+            if not entry.waiters and self._pending.get(id_) is entry:
+                del self._pending[id_]
+
+    def deliver(self, id_, code):
+        '''Completes a pending captcha with an answer received by other means than polling (e.g. a pingback).
+
+        Must be called from the event loop the captcha is awaited on.
+
+        Parameters
+        __________
+        id_ : str
+            ID of the captcha.
+        code : str
+            Answer of the captcha, or the error code it failed with.
+
+        Returns
+
+        matched : bool
+            False if the captcha is not pending.
+        '''
+
+        entry = self._pending.pop(id_, None)
+        if entry is None:
+            return False
+
+        error = pingback_error(code)
+        if error is None:
+            self.solver.polling_policy.record(entry.method, time.monotonic() - entry.created)
+
+        if not entry.future.done():
+            if error is not None:
+                entry.future.set_exception(error)
+            elif self.solver.extendedResponse == True:
+                entry.future.set_result({'status': 1, 'request': code})
+            else:
+                entry.future.set_result(code)
+        self._wakeup.set()
+
+        return True
+
+    def pending(self):
+        '''IDs of the captchas currently being polled.'''
+
+        return list(self._pending)
+
+    def _schedule(self, entry):
+        heapq.heappush(self._heap, (entry.next_poll, next(self._counter), entry))
+
+        if self._heap[0][2] is entry:
+            self._wakeup.set()
+
+    def _is_scheduled(self, next_poll, entry):
+        # heap items of finished captchas and of superseded schedules are dropped lazily
+        return self._pending.get(entry.id) is entry and entry.next_poll == next_poll
+
+    async def _run(self):
+        lookups = set()
+
+        try:
+            while self._pending:
+                while self._heap and not self._is_scheduled(self._heap[0][0], self._heap[0][2]):
+                    heapq.heappop(self._heap)
+
+                now = time.monotonic()
+                delay = self._heap[0][0] - now if self._heap else None
+
+                if delay is None or delay > 0:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                batch = []
+                while self._heap and len(batch) < self.batch_size:
+                    next_poll, _, entry = self._heap[0]
+                    if next_poll - now > entry.interval / 2:
+                        break
+
+                    heapq.heappop(self._heap)
+                    if self._is_scheduled(next_poll, entry):
+                        batch.append(entry)
+
+                await self._requests.acquire()
+                lookup = asyncio.ensure_future(self._poll(batch))
+                lookups.add(lookup)
+                lookup.add_done_callback(lookups.discard)
+        finally:
+            self._task = None
+            for lookup in lookups:
+                lookup.cancel()
+
+    async def _poll(self, entries):
+        try:
+            # the lookup is useful until the last of the captchas expires
+            answers, errors = await self.fetch([e.id for e in entries], max(e.deadline for e in entries))
+        except Exception as e:
+            answers, errors = {}, {entry.id: e for entry in entries}
+        finally:
+            self._requests.release()
+
+        now = time.monotonic()
+        stretch = 1 + random.uniform(0, self.jitter)
+
+        for entry in entries:
+            if self._pending.get(entry.id) is not entry:
+                continue
+
+            if entry.id in answers:
+                result, exception = answers[entry.id], None
+                self.solver.polling_policy.record(
+                    entry.method, estimate_solve_time(entry.not_ready - entry.created, now - entry.created))
+            elif entry.id in errors:
+                entry.failures += 1
+                # transient errors are retried by rescheduling the lookup, without holding a request slot
+                delay = self.solver.retry_policy.next_delay(errors[entry.id], entry.failures, entry.deadline)
+                if delay is not None:
+                    entry.next_poll = now + delay
+                    self._schedule(entry)
+                    continue
+                result, exception = None, errors[entry.id]
+            else:
+                entry.failures = 0
+                entry.not_ready = now
+                entry.next_poll = now + entry.interval * stretch
+                self._schedule(entry)
+                continue
+
+            del self._pending[entry.id]
+
+            if entry.future.done():
+                continue
+            if exception is not None:
+                entry.future.set_exception(exception)
+            else:
+                entry.future.set_result(result)
+
+        if not self._pending:
+            self._wakeup.set()
+
+    async def fetch(self, ids, deadline=None):
+        '''Looks up answers for several captchas.
+
+        Uses a single batched request when possible and falls back to one request per captcha when the batched
+        response cannot be attributed to individual captchas (e.g. one of them failed or an answer contains "|").
+        Network errors of the batched request are raised: the lookup of every captcha failed. Requests are not
+        repeated, the poller looks failed captchas up again after the backoff of the solver's retry policy.
+
+        Parameters
+        __________
+        ids : list
+            IDs of the captchas.
+        deadline : float, optional
+            time.monotonic() timestamp limiting the requests.
+
+        Returns
+
+        answers, errors : tuple of dict
+            Answers of solved captchas and exceptions of failed ones, keyed by captcha ID. Captchas that are not
+            solved yet are in neither.
+        '''
+
+        if len(ids) > 1 and self.solver.extendedResponse != True:
+            try:
+                return await self.solver.get_results(ids, deadline, retry=False), {}
+            except (ApiException, api.ApiException):
+                pass
+
+        answers, errors = {}, {}
+        results = await asyncio.gather(*(self.solver.get_result(id_, deadline, retry=False) for id_ in ids),
+                                       return_exceptions=True)
+
+        for id_, result in zip(ids, results):
+            if isinstance(result, NetworkException):
+                continue
+            if isinstance(result, Exception):
+                errors[id_] = result
+            else:
+                answers[id_] = result
+
+        return answers, errors
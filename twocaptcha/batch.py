@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+try:
+    from .exceptions.solver import ValidationException
+    from .methods import captcha_method
+except ImportError:
+    from twocaptcha.exceptions.solver import ValidationException
+    from methods import captcha_method
+
+
+class TaskResult():
+    """
+    Outcome of one task of solve_many().
+
+    Attributes
+    __________
+    index : int
+        Position of the task in the input.
+    task : tuple or dict
+        The task as it was passed.
+    result : dict
+        Result of the solver method, None if the task failed.
+    error : Exception
+        Exception raised by the solver method, None if the task succeeded.
+    """
+
+    def __init__(self, index, task, result=None, error=None):
+        self.index = index
+        self.task = task
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        outcome = f'error={self.error!r}' if self.error is not None else f'result={self.result!r}'
+        return f'TaskResult(index={self.index}, {outcome})'
+
+
+def split_task(task):
+    '''Splits a task spec into the method name and its keyword arguments.
+
+    A task is either a (method, kwargs) pair or a dict with the method name under 'method' and the arguments as the
+    other keys, e.g. ('normal', {'file': 'captcha.jpg'}) or {'method': 'normal', 'file': 'captcha.jpg'}.
+    '''
+
+    if isinstance(task, dict):
+        kwargs = dict(task)
+        method = kwargs.pop('method', None)
+    elif isinstance(task, (tuple, list)) and len(task) == 2 and isinstance(task[1], dict):
+        method, kwargs = task[0], dict(task[1])
+    else:
+        raise ValidationException(f'cannot recognize task {task!r}')
+
+    if not isinstance(method, str) or not method:
+        raise ValidationException(f'task method required: {task!r}')
+
+    return method, kwargs
+
+
+def task_function(solver, method):
+    '''Returns the solver function running a task: the wrapper method of that name (normal, recaptcha, ...), or
+    solve() with the 2captcha method parameter set for methods without a wrapper.'''
+
+    spec = captcha_method(solver, method)
+    if spec is not None:
+        return getattr(solver, spec.name)
+
+    return lambda **kwargs: solver.solve(method=method, **kwargs)
+
+
+def submit_tasks(submit, tasks, concurrency):
+    '''Runs tasks with submit(method, **kwargs), which returns a concurrent.futures.Future, at most concurrency at a
+    time. Yields a TaskResult per task, in the order the tasks complete. Used by the solve_many() methods of the
+    solvers and account pools.'''
+
+    tasks = enumerate(tasks)
+    running = {}
+
+    try:
+        while True:
+            if len(running) < concurrency:
+                for index, task in tasks:
+                    running[_submit_task(submit, task)] = (index, task)
+                    if len(running) >= concurrency:
+                        break
+
+            if not running:
+                return
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                index, task = running.pop(future)
+                error = future.exception()
+                yield TaskResult(index, task, None if error else future.result(), error)
+    finally:
+        for future in running:
+            future.cancel()
+
+
+def _submit_task(submit, task):
+    try:
+        method, kwargs = split_task(task)
+    except Exception as e:
+        future = Future()
+        future.set_exception(e)
+        return future
+
+    return submit(method, **kwargs)
+
+
+async def run_tasks(solver, tasks, concurrency):
+    '''Runs tasks (an iterable or async iterable) with the methods of an async solver, at most concurrency at a time.
+    Yields a TaskResult per task, in the order the tasks complete. Used by the solve_many() methods of the async
+    solvers and account pools.'''
+
+    if hasattr(tasks, '__aiter__'):
+        tasks = tasks.__aiter__()
+        next_task = tasks.__anext__
+    else:
+        tasks = iter(tasks)
+
+        async def next_task():
+            try:
+                return next(tasks)
+            except StopIteration:
+                raise StopAsyncIteration
+
+    index = 0
+    exhausted = False
+    running = {}
+
+    try:
+        while True:
+            while not exhausted and len(running) < concurrency:
+                try:
+                    task = await next_task()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+
+                running[asyncio.ensure_future(_run_task(solver, task))] = (index, task)
+                index += 1
+
+            if not running:
+                return
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
+            for future in done:
+                index_, task = running.pop(future)
+                result, error = future.result()
+                yield TaskResult(index_, task, result, error)
+    finally:
+        for future in running:
+            future.cancel()
+
+
+async def _run_task(solver, task):
+    try:
+        method, kwargs = split_task(task)
+        return await task_function(solver, method)(**kwargs), None
+    except Exception as e:
+        return None, e
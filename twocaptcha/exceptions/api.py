@@ -1,5 +1,9 @@
 class NetworkException(Exception):
-    pass
+    def __init__(self, *args, status_code=None, connect_error=False):
+        super().__init__(*args)
+        self.status_code = status_code
+        # the server could not be reached, nothing was sent
+        self.connect_error = connect_error
 
 
 class ApiException(Exception):
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+
+import inspect
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    from .hooks import MetricsCollector
+except ImportError:
+    from hooks import MetricsCollector
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# name, type, help and label of the counters of MetricsCollector.snapshot()
+COUNTERS = (
+    ('submits', 'submits_total', 'Captchas sent.', 'method'),
+    ('bytes_sent', 'submit_bytes_total', 'Approximate bytes of parameters and files sent with captchas.', 'method'),
+    ('polls', 'polls_total', 'Lookups of answers (res.php requests).', 'method'),
+    ('lookups', 'poll_captchas_total', 'Captchas looked up by successful polls.', 'method'),
+    ('not_ready', 'not_ready_total', 'Captchas looked up whose answer was not ready yet (CAPCHA_NOT_READY).',
+     'method'),
+    ('results', 'results_total', 'Answers received.', 'method'),
+)
+
+HISTOGRAMS = (
+    ('submit_seconds', 'submit_seconds', 'Duration of captcha submissions (in.php requests).'),
+    ('poll_seconds', 'poll_seconds', 'Duration of answer lookups (res.php requests).'),
+    ('solve_seconds', 'solve_seconds', 'Time from the submission of a captcha to its answer.'),
+    ('polls_per_solve', 'polls_per_solve', 'Lookups needed per answer.'),
+)
+
+
+class PrometheusExporter():
+    """
+    Publishes the metrics of a solver in the Prometheus text exposition format, without third-party dependencies.
+
+    Exposes the counters and histograms of a MetricsCollector (captchas sent, polls, answers not ready, latencies by
+    2captcha method, errors by error code, retries), the captchas in flight, the time spent waiting for the rate
+    limiters and the balance of the account. render() returns the payload, to be served by any web framework; start()
+    serves it on /metrics from a background thread.
+
+    Parameters
+    __________
+    solver : TwoCaptcha or AsyncTwoCaptcha
+        Solver whose metrics are exported.
+    metrics : MetricsCollector, optional
+        Collector passed to the hooks of the solver. Default: a new MetricsCollector, added to the hooks of the solver.
+    prefix : str, optional
+        Prefix of the names of the metrics.
+        Default: twocaptcha.
+    balance_interval : float, optional
+        Minimum time in seconds between two balance requests, None to not export the balance. The balance of a
+        TwoCaptcha is requested from a background thread when render() finds it older than that, render() exports the
+        last known value. The balance of an AsyncTwoCaptcha is only updated by await exporter.arefresh_balance().
+        Default: 60.
+    host : str, optional
+        Interface the HTTP endpoint listens on.
+        Default: 127.0.0.1.
+    port : int, optional
+        Port of the HTTP endpoint, 0 picks a free port.
+        Default: 9464.
+    """
+
+    def __init__(self, solver, metrics=None, prefix='twocaptcha', balance_interval=60, host='127.0.0.1', port=9464):
+        if metrics is None:
+            metrics = MetricsCollector()
+            solver.hooks.add(metrics)
+
+        self.solver = solver
+        self.metrics = metrics
+        self.prefix = prefix
+        self.balance_interval = balance_interval
+        self.host = host
+        self.port = port
+
+        self._balance = None
+        self._balance_updated = None
+        self._balance_lock = threading.Lock()
+        self._balance_thread = None
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        '''URL of the metrics endpoint.'''
+
+        return f'http://{self.host}:{self.port}/metrics'
+
+    def refresh_balance(self):
+        '''Requests the balance of a TwoCaptcha if the last value is older than balance_interval, and waits for it.'''
+
+        if self._claim_balance():
+            self._fetch_balance()
+
+    def _fetch_balance(self):
+        try:
+            balance = self.solver.balance()
+        except Exception:
+            # the last known balance is kept
+            balance = self._balance
+
+        self._set_balance(balance)
+
+    async def arefresh_balance(self):
+        '''Requests the balance of an AsyncTwoCaptcha if the last value is older than balance_interval.'''
+
+        if not self._claim_balance():
+            return
+
+        try:
+            balance = await self.solver.balance()
+        except Exception:
+            balance = self._balance
+
+        self._set_balance(balance)
+
+    def _claim_balance(self):
+        # whether the balance is requested now, claimed so that a single request is in progress
+        if self.balance_interval is None:
+            return False
+
+        with self._balance_lock:
+            now = time.monotonic()
+            if self._balance_updated is not None and now - self._balance_updated < self.balance_interval:
+                return False
+
+            self._balance_updated = now
+            return True
+
+    def _set_balance(self, balance):
+        with self._balance_lock:
+            self._balance = balance
+            self._balance_updated = time.monotonic()
+
+    def render(self):
+        '''Returns the metrics in the text exposition format, served with the CONTENT_TYPE content type.'''
+
+        if not inspect.iscoroutinefunction(self.solver.balance) and self._claim_balance():
+            # a scrape doesn't wait for the balance request, its result is exported by the next scrapes
+            self._balance_thread = threading.Thread(target=self._fetch_balance, name='twocaptcha-balance',
+                                                    daemon=True)
+            self._balance_thread.start()
+
+        snapshot = self.metrics.snapshot()
+        lines = []
+
+        for key, name, help_, label in COUNTERS:
+            self._family(lines, name, 'counter', help_,
+                         [({label: method}, value) for method, value in snapshot[key].items()])
+
+        self._family(lines, 'errors_total', 'counter', 'Captchas failed, by error code or exception class.',
+                     [({'method': method, 'code': code}, value)
+                      for (method, code), value in snapshot['errors'].items()])
+        self._family(lines, 'retries_total', 'counter', 'Requests repeated after a transient error.',
+                     [({'request': request, 'method': method}, value)
+                      for (request, method), value in snapshot['retries'].items()])
+
+        for key, name, help_ in HISTOGRAMS:
+            self._histogram(lines, name, help_, snapshot[key])
+
+        self._family(lines, 'in_flight', 'gauge', 'Captchas sent whose answer was not received yet.',
+                     [({}, self.solver.hooks.in_flight())])
+
+        limiters = {'submit': self.solver.submit_limiter.stats(), 'poll': self.solver.poll_limiter.stats()}
+        self._family(lines, 'rate_limit_wait_seconds_total', 'counter', 'Time spent waiting for the rate limiters.',
+                     [({'limiter': name}, stats['wait_time']) for name, stats in limiters.items()])
+        self._family(lines, 'rate_limit_delayed_total', 'counter', 'Requests that waited for the rate limiters.',
+                     [({'limiter': name}, stats['delayed']) for name, stats in limiters.items()])
+        self._family(lines, 'requests_in_progress', 'gauge', 'Requests in progress.',
+                     [({'limiter': name}, stats['in_flight']) for name, stats in limiters.items()])
+
+        with self._balance_lock:
+            balance = self._balance
+        if balance is not None:
+            self._family(lines, 'balance', 'gauge', 'Balance of the account.', [({}, balance)])
+
+        return '\n'.join(lines) + '\n'
+
+    def _family(self, lines, name, type_, help_, samples):
+        name = f'{self.prefix}_{name}'
+        lines.append(f'# HELP {name} {help_}')
+        lines.append(f'# TYPE {name} {type_}')
+        for labels, value in samples:
+            lines.append(f'{name}{_labels(labels)} {_number(value)}')
+
+    def _histogram(self, lines, name, help_, histograms):
+        name = f'{self.prefix}_{name}'
+        lines.append(f'# HELP {name} {help_}')
+        lines.append(f'# TYPE {name} histogram')
+
+        for method, histogram in histograms.items():
+            for bound, count in histogram['buckets']:
+                lines.append(f'{name}_bucket{_labels({"method": method, "le": _number(bound)})} {count}')
+            lines.append(f'{name}_bucket{_labels({"method": method, "le": "+Inf"})} {histogram["count"]}')
+            lines.append(f'{name}_sum{_labels({"method": method})} {_number(histogram["sum"])}')
+            lines.append(f'{name}_count{_labels({"method": method})} {histogram["count"]}')
+
+    def start(self):
+        '''Serves the metrics on /metrics from a background thread.'''
+
+        if self._server is not None:
+            return
+
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+
+                content = exporter.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            daemon_threads = True
+
+        self._server = Server((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.5},
+                                        name='twocaptcha-exporter', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        '''Stops serving the metrics.'''
+
+        server, self._server = self._server, None
+
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            self._thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return '{' + pairs + '}'
+
+
+def _escape(value):
+    # unknown methods (None) are exported as an empty label
+    value = '' if value is None else str(value)
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import io
+import os
+
+
+def is_buffer(file):
+    '''Tells whether a captcha file is given as its content: bytes, bytearray, memoryview or any other object supporting
+    the buffer protocol.'''
+
+    if isinstance(file, str):
+        return False
+
+    try:
+        memoryview(file)
+    except TypeError:
+        return False
+
+    return True
+
+
+def is_content(file):
+    '''Tells whether a captcha file is given as its content or as an object it is read from, rather than as a path, URL
+    or base64 string. Such files are sent as binary multipart parts.'''
+
+    return is_buffer(file) or is_stream(file)
+
+
+def as_bytes(file):
+    '''Returns the content of a buffer as a flat memoryview of bytes, without copying it.'''
+
+    view = memoryview(file)
+    return view if view.format == 'B' and view.ndim == 1 else view.cast('B')
+
+
+def is_stream(file):
+    '''Tells whether a captcha file is given as an open file, or another object the content is read from, rather than
+    as a path, URL or base64 string.'''
+
+    if isinstance(file, (str, bytes, os.PathLike)):
+        return False
+
+    return hasattr(file, 'read') or hasattr(file, '__aiter__')
+
+
+class Rewind():
+    """
+    Remembers the position of the open files sent with a request, so that it can be sent again.
+
+    Parameters
+    __________
+    sources : iterable
+        Files sent with the request: paths, open files, async iterables, ...
+    """
+
+    def __init__(self, sources):
+        self.positions = []
+        self.replayable = True
+
+        for source in sources:
+            if not is_stream(source):
+                continue
+
+            if isinstance(source, io.IOBase) and source.seekable():
+                self.positions.append((source, source.tell()))
+            else:
+                # async files and iterables can only be read once
+                self.replayable = False
+
+    def __call__(self):
+        '''Moves the open files back to the position they were at when the request was first sent.'''
+
+        for source, position in self.positions:
+            source.seek(position)
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+
+try:
+    from .files import as_bytes, is_buffer, is_stream
+except ImportError:
+    from files import as_bytes, is_buffer, is_stream
+
+
+# upper bounds of the latency histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15, 20, 30, 45, 60, 90, 120, 300, 600)
+
+# upper bounds of the polls per solve histogram buckets
+POLL_BUCKETS = (1, 2, 3, 4, 5, 7, 10, 15, 20, 30, 50, 100)
+
+# message of the exceptions raised for 2captcha errors, e.g. ERROR_ZERO_BALANCE
+_ERROR_CODE = re.compile(r'[A-Z][A-Z0-9_]{3,}')
+
+
+class Event():
+    """
+    What happened to a captcha or to a request, passed to the methods of Hooks. Attributes that don't apply to an
+    event are None.
+
+    Attributes
+    __________
+    method : str
+        2captcha method of the captcha (post, base64, userrecaptcha, turnstile...).
+    captcha_id : str
+        ID of the captcha.
+    ids : list
+        IDs of the captchas looked up by a poll.
+    seconds : float
+        Duration of the request for on_submit, on_poll and on_retry (of the failed attempt). Time since the captcha
+        was sent for on_result and on_error.
+    bytes_sent : int
+        Size of the parameters and files sent to in.php.
+    attempt : int
+        Number of the attempt of the request, 1 for the first one.
+    polls : int
+        Number of lookups of the answer of the captcha, for on_result and on_error.
+    ready : int
+        Number of answers received by a poll.
+    delay : float
+        Time in seconds before the request is repeated, for on_retry.
+    request : str
+        in.php or res.php, for on_retry.
+    error : Exception
+        Exception the captcha or the request failed with.
+    """
+
+    def __init__(self, method=None, captcha_id=None, ids=None, seconds=None, bytes_sent=None, attempt=None, polls=None,
+                 ready=None, delay=None, request=None, error=None):
+        self.method = method
+        self.captcha_id = captcha_id
+        self.ids = ids
+        self.seconds = seconds
+        self.bytes_sent = bytes_sent
+        self.attempt = attempt
+        self.polls = polls
+        self.ready = ready
+        self.delay = delay
+        self.request = request
+        self.error = error
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={value!r}' for name, value in vars(self).items() if value is not None)
+        return f'Event({fields})'
+
+
+class Hooks():
+    """
+    Receives the events of a solver, pass it with TwoCaptcha(..., hooks=hooks) or AsyncTwoCaptcha(..., hooks=hooks).
+    Override the methods of the events of interest.
+
+    Hooks are called from the thread (or the event loop) doing the work, e.g. the poller thread for on_poll: keep them
+    short. Exceptions raised by hooks are ignored.
+    """
+
+    def on_submit(self, event):
+        '''Called when a captcha was sent (in.php), with method, captcha_id, seconds, bytes_sent and attempt.'''
+
+    def on_poll(self, event):
+        '''Called after each lookup of answers (res.php), with ids, seconds and ready, or error if it failed. method
+        and captcha_id are set when a single captcha was looked up.'''
+
+    def on_result(self, event):
+        '''Called when the answer of a captcha was received, with method, captcha_id, seconds and polls.'''
+
+    def on_error(self, event):
+        '''Called when a captcha failed, with method, error and, if it was sent, captcha_id, seconds and polls.'''
+
+    def on_retry(self, event):
+        '''Called before a failed request is repeated, with request, method, attempt, delay, error and seconds, and
+        captcha_id for res.php requests about a single captcha.'''
+
+
+class Histogram():
+    """
+    Distribution of observed values, counted in buckets.
+
+    Parameters
+    __________
+    buckets : tuple, optional
+        Upper bounds of the buckets, in increasing order. Values above the last one are only counted in count and sum.
+        Default: DEFAULT_BUCKETS.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self):
+        '''Returns (upper bound, number of values <= bound) pairs, as in Prometheus histograms.'''
+
+        total, pairs = 0, []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def percentile(self, q):
+        '''Returns an estimate of the q-th percentile (0-100), interpolated within its bucket. None without values.'''
+
+        if not self.count:
+            return None
+
+        rank = self.count * q / 100
+        lower, seen = 0, 0
+        for bound, count in zip(self.buckets, self.counts):
+            if count and seen + count >= rank:
+                return lower + (bound - lower) * (rank - seen) / count
+            lower, seen = bound, seen + count
+
+        return self.buckets[-1]
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'buckets': self.cumulative(),
+        }
+
+
+class MetricsCollector(Hooks):
+    """
+    Hooks keeping metrics of the captchas of a solver in memory: latency histograms per 2captcha method of submits,
+    polls and solves, a histogram of polls per solved captcha, and counters of captchas, answers not ready yet, errors
+    and retries.
+
+    Parameters
+    __________
+    buckets : tuple, optional
+        Upper bounds of the latency histogram buckets in seconds.
+        Default: DEFAULT_BUCKETS.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+
+        self.submit_seconds = {}
+        self.poll_seconds = {}
+        self.solve_seconds = {}
+        self.polls_per_solve = {}
+        self.submits = Counter()
+        self.bytes_sent = Counter()
+        self.polls = Counter()
+        self.lookups = Counter()
+        self.not_ready = Counter()
+        self.results = Counter()
+        self.errors = Counter()
+        self.retries = Counter()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _observe(histograms, method, value, buckets):
+        histogram = histograms.get(method)
+        if histogram is None:
+            histogram = histograms[method] = Histogram(buckets)
+        histogram.observe(value)
+
+    def on_submit(self, event):
+        with self._lock:
+            self.submits[event.method] += 1
+            self.bytes_sent[event.method] += event.bytes_sent or 0
+            self._observe(self.submit_seconds, event.method, event.seconds, self.buckets)
+
+    def on_poll(self, event):
+        with self._lock:
+            self.polls[event.method] += 1
+            if event.ready is not None:
+                self.lookups[event.method] += len(event.ids)
+                self.not_ready[event.method] += len(event.ids) - event.ready
+            self._observe(self.poll_seconds, event.method, event.seconds, self.buckets)
+
+    def on_result(self, event):
+        with self._lock:
+            self.results[event.method] += 1
+            self._observe(self.solve_seconds, event.method, event.seconds, self.buckets)
+            self._observe(self.polls_per_solve, event.method, event.polls, POLL_BUCKETS)
+
+    def on_error(self, event):
+        with self._lock:
+            self.errors[(event.method, error_code(event.error))] += 1
+
+    def on_retry(self, event):
+        with self._lock:
+            self.retries[(event.request, event.method)] += 1
+
+    def snapshot(self):
+        '''Returns the metrics collected so far. Histograms and counters are keyed by 2captcha method (None when
+        unknown, e.g. polls of captchas of several methods), errors by (method, error code) and retries by
+        (request, method). lookups counts the captchas looked up by successful polls, not_ready those of them whose
+        answer was not ready yet.'''
+
+        with self._lock:
+            return {
+                'submit_seconds': {method: h.snapshot() for method, h in self.submit_seconds.items()},
+                'poll_seconds': {method: h.snapshot() for method, h in self.poll_seconds.items()},
+                'solve_seconds': {method: h.snapshot() for method, h in self.solve_seconds.items()},
+                'polls_per_solve': {method: h.snapshot() for method, h in self.polls_per_solve.items()},
+                'submits': dict(self.submits),
+                'bytes_sent': dict(self.bytes_sent),
+                'polls': dict(self.polls),
+                'lookups': dict(self.lookups),
+                'not_ready': dict(self.not_ready),
+                'results': dict(self.results),
+                'errors': dict(self.errors),
+                'retries': dict(self.retries),
+            }
+
+
+class _Sent():
+    # a captcha waiting for its answer
+
+    def __init__(self, method):
+        self.method = method
+        self.sent = time.monotonic()
+        self.polls = 0
+
+
+class HookDispatcher():
+    """
+    Calls the hooks of a solver, and remembers the method, sending time and number of polls of the captchas sent until
+    their answer is received. Does nothing without hooks.
+
+    Parameters
+    __________
+    hooks : Hooks or list of Hooks, optional
+        Hooks called.
+    max_tracked : int, optional
+        Maximum number of captchas remembered. Captchas sent with send() and never waited for are eventually forgotten.
+        Default: 10000.
+    """
+
+    def __init__(self, hooks=None, max_tracked=10000):
+        if hooks is None:
+            hooks = []
+        elif isinstance(hooks, Hooks):
+            hooks = [hooks]
+
+        self.hooks = list(hooks)
+        self.max_tracked = max_tracked
+
+        self._sent = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __bool__(self):
+        return bool(self.hooks)
+
+    def add(self, hook):
+        '''Starts calling a hook, e.g. a MetricsCollector attached to a solver after it was created.'''
+
+        self.hooks = self.hooks + [hook]
+
+    def in_flight(self):
+        '''Returns the number of captchas sent whose answer was not received yet.'''
+
+        with self._lock:
+            return len(self._sent)
+
+    def emit(self, name, event):
+        for hook in self.hooks:
+            try:
+                getattr(hook, name)(event)
+            except Exception:
+                # a failing hook must not fail captchas
+                pass
+
+    def submitted(self, params, files, response, timing):
+        if not self.hooks:
+            return
+
+        id_ = response[3:]
+        with self._lock:
+            self._sent[id_] = _Sent(params.get('method'))
+            while len(self._sent) > self.max_tracked:
+                self._sent.popitem(last=False)
+
+        event = Event(method=params.get('method'), captcha_id=id_, seconds=time.monotonic() - timing['started'],
+                      bytes_sent=_request_size(params, files), attempt=timing['attempt'])
+        self.emit('on_submit', event)
+
+    def polled(self, params, timing, response=None, error=None):
+        if not self.hooks or params.get('action') != 'get':
+            return
+
+        ids = params['ids'].split(',') if 'ids' in params else [params.get('id')]
+        with self._lock:
+            sent = [self._sent.get(id_) for id_ in ids]
+            for captcha in sent:
+                if captcha is not None:
+                    captcha.polls += 1
+
+        methods = {captcha.method for captcha in sent if captcha is not None}
+        event = Event(method=methods.pop() if len(methods) == 1 else None, ids=ids,
+                      seconds=time.monotonic() - timing['started'], error=error)
+        if len(ids) == 1:
+            event.captcha_id = ids[0]
+        if response is not None:
+            event.ready = _ready(response, len(ids))
+
+        self.emit('on_poll', event)
+
+    def retrying(self, request, params, timing, files=None):
+        '''Returns the on_retry callback of RetryPolicy.call() for a request, None without hooks.'''
+
+        if not self.hooks:
+            return None
+
+        def retry(error, attempt, delay):
+            event = Event(request=request, method=params.get('method'), attempt=attempt, delay=delay, error=error,
+                          seconds=time.monotonic() - timing['started'])
+            if request == 'in.php':
+                event.bytes_sent = _request_size(params, files or {})
+            else:
+                event.captcha_id = params.get('id')
+                with self._lock:
+                    captcha = self._sent.get(params.get('id'))
+                event.method = captcha.method if captcha is not None else None
+            self.emit('on_retry', event)
+
+        return retry
+
+    def finished(self, id_, error=None):
+        '''Reports the answer of a captcha (or its failure) and forgets it.'''
+
+        if not self.hooks:
+            return
+
+        with self._lock:
+            captcha = self._sent.pop(id_, None)
+        if captcha is None:
+            return
+
+        event = Event(method=captcha.method, captcha_id=id_, seconds=time.monotonic() - captcha.sent,
+                      polls=captcha.polls, error=error)
+        self.emit('on_result' if error is None else 'on_error', event)
+
+    def failed(self, method, error):
+        '''Reports a captcha that could not be sent.'''
+
+        if self.hooks:
+            self.emit('on_error', Event(method=method, error=error))
+
+    def forget(self, id_):
+        if self.hooks:
+            with self._lock:
+                self._sent.pop(id_, None)
+
+
+def error_code(error):
+    '''Returns the 2captcha error code of an exception (e.g. ERROR_CAPTCHA_UNSOLVABLE), or its class name for other
+    errors (NetworkException, TimeoutException...).'''
+
+    code = str(error)
+    return code if _ERROR_CODE.fullmatch(code) else type(error).__name__
+
+
+def _request_size(params, files):
+    '''Returns the approximate number of bytes of a request to in.php: parameters and the content of files (open files
+    that can't be measured are not counted).'''
+
+    size = sum(len(str(name)) + len(str(value)) + 2 for name, value in params.items() if name != 'file')
+    for file in list(files.values()) + [params.get('file')]:
+        size += _file_size(file)
+    return size
+
+
+def _file_size(file):
+    if file is None:
+        return 0
+    if is_buffer(file):
+        return as_bytes(file).nbytes
+    if is_stream(file):
+        try:
+            return os.fstat(file.fileno()).st_size - file.tell()
+        except (AttributeError, OSError, ValueError):
+            return 0
+    try:
+        return os.path.getsize(file)
+    except (OSError, TypeError, ValueError):
+        return 0
+
+
+def _ready(response, count):
+    # number of answers in a res.php?action=get response
+    if count > 1:
+        return sum(1 for answer in response.split('|') if answer != 'CAPCHA_NOT_READY')
+
+    if response.startswith('{'):
+        try:
+            return int(json.loads(response).get('status') == 1)
+        except ValueError:
+            return 0
+
+    return int(response.startswith('OK|'))
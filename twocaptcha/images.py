@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+import threading
+from collections import OrderedDict
+
+
+# images and audio files downloaded from URLs are aborted past this size
+DEFAULT_MAX_IMAGE_SIZE = 10 * 1024 * 1024
+
+class ImageCache():
+    """
+    Least recently used cache of captcha images downloaded from URLs.
+
+    Images are stored with the ETag the server sent them with and are reused only after a conditional request (with
+    If-None-Match) confirms they didn't change, so a URL serving a new captcha on every request is never answered from
+    the cache. Responses without an ETag are not cached.
+
+    Parameters
+    __________
+    max_entries : int, optional
+        Maximum number of images kept.
+        Default: 64.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        '''Returns the (etag, content) pair cached for a URL, None if there is none.'''
+
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def put(self, url, etag, content):
+        '''Caches the content downloaded from a URL with its ETag.'''
+
+        with self._lock:
+            self._entries[url] = (etag, content)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+try:
+    from .files import as_bytes, is_buffer
+except ImportError:
+    from files import as_bytes, is_buffer
+
+
+# parameters left out of params_hash(): the same captcha sent with another key or in another mode hashes the same
+UNHASHED_PARAMS = {'key', 'soft_id', 'json', 'header_acao', 'pingback'}
+
+
+def params_hash(params):
+    '''Returns a hash of the parameters of a captcha, to recognize it among the captchas of a journal.
+
+    Parameters
+    __________
+    params : dict
+        Parameters of the captcha (method, file, sitekey...). Buffers, e.g. image content, are hashed. Open files are
+        only identified by their type.
+
+    Returns
+
+    hash : str
+    '''
+
+    values = {}
+    for name, value in params.items():
+        if name in UNHASHED_PARAMS:
+            continue
+        if is_buffer(value):
+            value = hashlib.sha256(as_bytes(value)).hexdigest()
+        elif not isinstance(value, (str, int, float, bool, type(None))):
+            value = f'<{type(value).__name__}>'
+        values[name] = value
+
+    return hashlib.sha256(json.dumps(values, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class JournalEntry():
+    """
+    Captcha recorded in a journal.
+
+    Attributes
+    __________
+    id : str
+        ID of the captcha.
+    method : str
+        2captcha method of the captcha.
+    params_hash : str
+        params_hash() of the parameters of the captcha.
+    sent : float
+        time.time() timestamp of the submission of the captcha.
+    deadline : float
+        time.time() timestamp after which the answer is not waited for anymore.
+    """
+
+    def __init__(self, id_, method, params_hash, sent, deadline):
+        self.id = id_
+        self.method = method
+        self.params_hash = params_hash
+        self.sent = sent
+        self.deadline = deadline
+
+    def __repr__(self):
+        return f'JournalEntry(id={self.id!r}, method={self.method!r}, deadline={self.deadline!r})'
+
+
+class Journal():
+    """
+    Captchas waiting for their answer, recorded in a sqlite database so that they survive process restarts.
+
+    The solver records every captcha it waits for once it was sent, and removes it when its answer is received, it
+    fails or the wait is cancelled. Captchas left in the journal by a process that stopped are resumed with the
+    resume() method of the solver, instead of being paid for and never collected. Processes running at the same time
+    must not share a journal.
+
+    Parameters
+    __________
+    path : str
+        Path of the database file, created if missing.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # records survive a crash of the process (not of the OS) without syncing every write to disk
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS captchas (id TEXT PRIMARY KEY, method TEXT, params_hash TEXT, '
+                         'sent REAL, deadline REAL)')
+
+    def add(self, id_, method, params_hash, timeout):
+        '''Records a captcha sent, waited for at most timeout seconds.'''
+
+        now = time.time()
+
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO captchas VALUES (?, ?, ?, ?, ?)',
+                             (id_, method, params_hash, now, now + timeout))
+
+    def remove(self, id_):
+        '''Removes a captcha, once its answer was received or it failed.'''
+
+        with self._lock:
+            self._db.execute('DELETE FROM captchas WHERE id = ?', (id_,))
+
+    def pending(self):
+        '''Returns the captchas whose deadline has not passed, as JournalEntry objects in the order they were sent.
+        Expired captchas are removed.'''
+
+        now = time.time()
+
+        with self._lock:
+            self._db.execute('DELETE FROM captchas WHERE deadline <= ?', (now,))
+            rows = self._db.execute('SELECT id, method, params_hash, sent, deadline FROM captchas '
+                                    'ORDER BY sent').fetchall()
+
+        return [JournalEntry(*row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
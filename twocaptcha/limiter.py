@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+
+import asyncio
+import math
+import threading
+import time
+
+
+class BaseRateLimiter():
+    """
+    Token bucket rate limit combined with a limit on the number of requests in flight.
+
+    The bucket holds up to burst tokens and is refilled with rate tokens per second. Every request takes a token,
+    waiting for the bucket to refill if it is empty; waiting requests are served in arrival order.
+
+    Parameters
+    __________
+    rate : float, optional
+        Maximum sustained number of requests per second, None for no rate limit.
+        Default: None.
+    burst : int, optional
+        Number of requests that can be made at once after a period of inactivity.
+        Default: rate rounded up, at least 1.
+    max_in_flight : int, optional
+        Maximum number of requests in progress at the same time, None for no limit.
+        Default: None.
+    """
+
+    def __init__(self, rate=None, burst=None, max_in_flight=None):
+        if rate is not None and rate <= 0:
+            raise ValueError(f'rate must be positive: {rate}')
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError(f'max_in_flight must be at least 1: {max_in_flight}')
+
+        self.rate = rate
+        self.burst = burst or max(1, math.ceil(rate or 1))
+        self.max_in_flight = max_in_flight
+
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._stats_lock = threading.Lock()
+        self._acquired = 0
+        self._delayed = 0
+        self._wait_time = 0.0
+        self._in_flight = 0
+
+    def _reserve(self):
+        # takes a token, possibly ahead of time, and returns how long to wait until it is available
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+
+        return max(0.0, -self._tokens / self.rate)
+
+    def _refund(self):
+        self._tokens = min(self.burst, self._tokens + 1)
+
+    def _record(self, waited):
+        # waited is None for requests that went through without waiting
+        with self._stats_lock:
+            self._acquired += 1
+            self._in_flight += 1
+            if waited is not None:
+                self._delayed += 1
+                self._wait_time += waited
+
+    def _released(self):
+        with self._stats_lock:
+            self._in_flight -= 1
+
+    def stats(self):
+        '''Returns the usage of the limiter.
+
+        Returns
+
+        stats : dict
+            {'acquired': int, 'delayed': int, 'wait_time': float, 'in_flight': int} - number of requests let through,
+            how many of them had to wait, total seconds spent waiting and the number of requests in progress.
+        '''
+
+        with self._stats_lock:
+            return {
+                'acquired': self._acquired,
+                'delayed': self._delayed,
+                'wait_time': self._wait_time,
+                'in_flight': self._in_flight,
+            }
+
+
+class RateLimiter(BaseRateLimiter):
+    """
+    Blocking rate limiter for TwoCaptcha.
+
+    Use it as a context manager around a request: entering blocks until the request may be made, exiting frees its
+    in-flight slot.
+
+    Parameters
+    __________
+    rate : float, optional
+        Maximum sustained number of requests per second, None for no rate limit.
+        Default: None.
+    burst : int, optional
+        Number of requests that can be made at once after a period of inactivity.
+        Default: rate rounded up, at least 1.
+    max_in_flight : int, optional
+        Maximum number of requests in progress at the same time, None for no limit.
+        Default: None.
+    """
+
+    def __init__(self, rate=None, burst=None, max_in_flight=None):
+        super().__init__(rate, burst, max_in_flight)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+
+    def acquire(self):
+        '''Blocks until a request may be made. Each call must be followed by release().'''
+
+        start = time.monotonic()
+        waited = False
+
+        if self._slots is not None and not self._slots.acquire(blocking=False):
+            self._slots.acquire()
+            waited = True
+
+        if self.rate is not None:
+            with self._lock:
+                delay = self._reserve()
+            if delay:
+                time.sleep(delay)
+                waited = True
+
+        self._record(time.monotonic() - start if waited else None)
+
+    def release(self):
+        '''Marks a request as finished.'''
+
+        self._released()
+        if self._slots is not None:
+            self._slots.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class AsyncRateLimiter(BaseRateLimiter):
+    """
+    Rate limiter for AsyncTwoCaptcha.
+
+    Use it as an async context manager around a request: entering waits until the request may be made, exiting frees
+    its in-flight slot.
+
+    Parameters
+    __________
+    rate : float, optional
+        Maximum sustained number of requests per second, None for no rate limit.
+        Default: None.
+    burst : int, optional
+        Number of requests that can be made at once after a period of inactivity.
+        Default: rate rounded up, at least 1.
+    max_in_flight : int, optional
+        Maximum number of requests in progress at the same time, None for no limit.
+        Default: None.
+    """
+
+    def __init__(self, rate=None, burst=None, max_in_flight=None):
+        super().__init__(rate, burst, max_in_flight)
+        self._loop = None
+        self._slots = None
+
+    def _semaphore(self):
+        # asyncio primitives are bound to the loop they are first used on
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+        return self._slots
+
+    async def acquire(self):
+        '''Waits until a request may be made. Each call must be followed by release().'''
+
+        start = time.monotonic()
+        slots = self._semaphore() if self.max_in_flight else None
+        waited = slots is not None and slots.locked()
+
+        if slots is not None:
+            await slots.acquire()
+
+        try:
+            if self.rate is not None:
+                delay = self._reserve()
+                if delay:
+                    waited = True
+                    try:
+                        await asyncio.sleep(delay)
+                    except asyncio.CancelledError:
+                        self._refund()
+                        raise
+        except BaseException:
+            if slots is not None:
+                slots.release()
+            raise
+
+        self._record(time.monotonic() - start if waited else None)
+
+    def release(self):
+        '''Marks a request as finished.'''
+
+        self._released()
+        if self.max_in_flight and self._loop is not None:
+            self._slots.release()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.release()
@@ -0,0 +1,1064 @@
+#!/usr/bin/env python3
+
+import inspect
+import os
+
+try:
+    from .exceptions.solver import ValidationException
+    from .files import is_content
+except ImportError:
+    from twocaptcha.exceptions.solver import ValidationException
+    from files import is_content
+
+
+class CaptchaMethod():
+    """
+    Declarative description of a captcha method of the solvers (normal, recaptcha, turnstile...). The methods of
+    TwoCaptcha and AsyncTwoCaptcha are generated from the descriptions in METHODS.
+
+    Parameters
+    __________
+    name : str
+        Name of the solver method.
+    method : str, optional
+        Value of the 2captcha method parameter. None for image captchas sent with method post or base64 depending on
+        how the image is given.
+    args : tuple, optional
+        Required arguments, after the file argument if any. Arguments sent under another name are given as
+        (argument, parameter) pairs, e.g. ('sitekey', 'googlekey').
+    defaults : tuple, optional
+        Optional arguments following args, as (argument, default value) pairs.
+    params : dict, optional
+        Parameters always sent, e.g. {'recaptcha': 1} for grid captchas.
+    file : str, optional
+        How the first argument is sent: 'image' (path, URL, base64 string or content of an image), 'images' (one image,
+        or a list or dict of them) or 'audio' (path, URL or base64 string of an mp3 file). None if there is none.
+    timeout : str, optional
+        Solver timeout used by default: 'default' (defaultTimeout) or 'recaptcha' (recaptchaTimeout).
+    choices : dict, optional
+        Allowed values of arguments.
+    required_any : tuple, optional
+        Options at least one of which is required.
+    cached : bool, optional
+        Whether answers can be served from the answerCache of the solver.
+    doc : str, optional
+        Docstring of the solver method.
+    """
+
+    def __init__(self, name, method=None, args=(), defaults=(), params={}, file=None, timeout='default', choices={},
+                 required_any=(), cached=False, doc=None):
+        self.name = name
+        self.method = method
+        self.params = params
+        self.file = file
+        self.timeout = timeout
+        self.choices = choices
+        self.required_any = required_any
+        self.cached = cached
+        self.doc = doc
+
+        # precomputed once: argument names, the parameters they are sent as and the signature binding them
+        args = [arg if isinstance(arg, tuple) else (arg, arg) for arg in args]
+        self.file_arg = ('files' if file == 'images' else 'file') if file else None
+        self.renames = {arg: param for arg, param in args if arg != param}
+
+        parameters = [inspect.Parameter(self.file_arg, inspect.Parameter.POSITIONAL_OR_KEYWORD)] if file else []
+        parameters += [inspect.Parameter(arg, inspect.Parameter.POSITIONAL_OR_KEYWORD) for arg, _ in args]
+        parameters += [inspect.Parameter(arg, inspect.Parameter.POSITIONAL_OR_KEYWORD, default=value)
+                       for arg, value in defaults]
+        parameters += [inspect.Parameter('kwargs', inspect.Parameter.VAR_KEYWORD)]
+        self.signature = inspect.Signature(parameters)
+
+    def bind(self, args, kwargs):
+        '''Binds the arguments of a call of the method.
+
+        Returns
+
+        file, params, options : tuple
+            The file argument (None if there is none), the parameters of the captcha set by the method and its
+            arguments, and the other options passed.
+        '''
+
+        bound = self.signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+
+        arguments = bound.arguments
+        options = arguments.pop('kwargs')
+        file = arguments.pop(self.file_arg) if self.file else None
+
+        for name, allowed in self.choices.items():
+            if arguments[name] not in allowed:
+                values = ', '.join(f'"{value}"' for value in allowed)
+                raise ValidationException(f'{name.capitalize()} not in {values}. You send {arguments[name]}')
+
+        if self.required_any and not any(name in options for name in self.required_any):
+            raise ValidationException(f'parameters required: {" and/or ".join(self.required_any)}')
+
+        params = dict(self.params)
+        if self.method is not None:
+            params['method'] = self.method
+        for name, value in arguments.items():
+            params[self.renames.get(name, name)] = value
+
+        return file, params, options
+
+    def function(self, asynchronous=False):
+        '''Returns the solver method, calling the _call_method() of the solver.'''
+
+        spec = self
+
+        if asynchronous:
+            async def method(self, *args, **kwargs):
+                return await self._call_method(spec, args, kwargs)
+        else:
+            def method(self, *args, **kwargs):
+                return self._call_method(spec, args, kwargs)
+
+        method.__name__ = self.name
+        method.__doc__ = self.doc
+        method.__signature__ = self.signature.replace(
+            parameters=[inspect.Parameter('self', inspect.Parameter.POSITIONAL_OR_KEYWORD)] +
+                       list(self.signature.parameters.values()))
+        return method
+
+    def __repr__(self):
+        return f'CaptchaMethod({self.name!r}, {self.method!r})'
+
+
+def captcha_methods(cls):
+    '''Class decorator adding the methods of METHODS to a solver class. Methods defined by the class are kept.'''
+
+    asynchronous = inspect.iscoroutinefunction(cls._call_method)
+
+    for spec in METHODS.values():
+        if spec.name not in vars(cls):
+            method = spec.function(asynchronous)
+            method.__qualname__ = f'{cls.__name__}.{spec.name}'
+            setattr(cls, spec.name, method)
+
+    return cls
+
+
+def captcha_method(solver, name):
+    '''Returns the CaptchaMethod of a solver method, None for a captcha type without one (sent with solve()).
+
+    Raises ValidationException for the other methods of the solver (balance, report, ...).
+    '''
+
+    spec = METHODS.get(name)
+    if spec is None and (name.startswith('_') or hasattr(solver, name)):
+        raise ValidationException(f'not a captcha method: {name}')
+
+    return spec
+
+
+# names of the solver options sent to the API under another name
+RENAMED_PARAMS = {
+    'caseSensitive': 'regsense',
+    'minLen': 'min_len',
+    'maxLen': 'max_len',
+    'minLength': 'min_len',
+    'maxLength': 'max_len',
+    'hintText': 'textinstructions',
+    'hintImg': 'imginstructions',
+    'url': 'pageurl',
+    'score': 'min_score',
+    'text': 'textcaptcha',
+    'rows': 'recaptcharows',
+    'cols': 'recaptchacols',
+    'previousId': 'previousID',
+    'canSkip': 'can_no_answer',
+    'apiServer': 'api_server',
+    'softId': 'soft_id',
+    'callback': 'pingback',
+    'datas': 'data-s',
+}
+
+
+class BaseTwoCaptcha():
+    """
+    Building of the parameters of captchas, shared by TwoCaptcha and AsyncTwoCaptcha.
+    """
+
+    def rename_params(self, params):
+
+        new_params = {
+            v: params.pop(k)
+            for k, v in RENAMED_PARAMS.items() if k in params
+        }
+
+        proxy = params.pop('proxy', '')
+        proxy and new_params.update({
+            'proxy': proxy['uri'],
+            'proxytype': proxy['type']
+        })
+
+        new_params.update(params)
+
+        return new_params
+
+    def default_params(self, params):
+
+        params.update({'key': self.API_KEY})
+
+        callback = params.pop('callback', self.callback)
+        soft_id = params.pop('softId', self.soft_id)
+
+        if callback: params.update({'callback': callback})
+        if soft_id: params.update({'softId': soft_id})
+
+        self.has_callback = bool(callback)
+
+        return params
+
+    def extract_files(self, files):
+
+        if len(files) > self.max_files:
+            raise ValidationException(
+                f'Too many files (max: {self.max_files})')
+
+        not_exists = [f for f in files if not is_content(f) and not os.path.exists(f)]
+
+        if not_exists:
+            raise ValidationException(f'File not found: {not_exists}')
+
+        files = {f'file_{e + 1}': f for e, f in enumerate(files)}
+        return files
+
+    def check_hint_img(self, params):
+
+        hint = params.pop('imginstructions', None)
+        files = params.pop('files', {})
+
+        if not hint:
+            return params, files
+
+        if not is_content(hint):
+            if not '.' in hint and len(hint) > 50:
+                params.update({'imginstructions': hint})
+                return params, files
+
+            if not os.path.exists(hint):
+                raise ValidationException(f'File not found: {hint}')
+
+        if not files:
+            files = {'file': params.pop('file', {})}
+
+        files.update({'imginstructions': hint})
+
+        return params, files
+
+    def _answer_options(self, params):
+        # parameters of a captcha affecting its answer, for the answer cache
+        options = {name: value for name, value in params.items() if name not in
+                   ('method', 'file', 'body', 'timeout', 'polling_interval', 'deadline', 'callback', 'softId')}
+        options['extendedResponse'] = self.extendedResponse
+        return options
+
+
+# methods of TwoCaptcha and AsyncTwoCaptcha by name
+METHODS = {spec.name: spec for spec in (
+    CaptchaMethod('normal', file='image', cached=True,
+                  doc='''Wrapper for solving a normal captcha (image).
+
+        Parameters
+        __________
+        file : file
+            Captcha image file. * required if you submit image as a file (method=post).
+        body : str
+            Base64-encoded captcha image. * required if you submit image as Base64-encoded string (method=base64).
+        phrase : int, optional
+            0 - captcha contains one word. 1 - captcha contains two or more words.
+            Default: 0.
+        numeric : int, optional
+            0 - not specified. 1 - captcha contains only numbers. 2 - captcha contains only letters. 3 - captcha
+            contains only numbers OR only letters. 4 - captcha MUST contain both numbers AND letters.
+            Default: 0
+        minLen : int, optional
+            0 - not specified. 1..20 - minimal number of symbols in captcha.
+            Default: 0.
+        maxLen : int, optional
+            0 - not specified. 1..20 - maximal number of symbols in captcha.
+            Default: 0.
+        caseSensitive : int, optional
+            0 - captcha in not case sensitive. 1 - captcha is case sensitive.
+            Default: 0.
+        calc : int, optional
+            0 - not specified. 1 - captcha requires calculation (e.g. type the result 4 + 8 = ).
+            Default: 0.
+        lang : str, optional
+            Language code. See the list of supported languages https://2captcha.com/2captcha-api#language.
+        hintText : str, optional
+            Max 140 characters. Encoding: UTF-8. Text will be shown to worker to help him to solve the captcha correctly.
+            For example: type red symbols only.
+        hintImg : img, optional
+            Max 400x150px, 100 kB. Image with instruction for solving reCAPTCHA. Not required if you're sending
+            instruction as text with textinstructions.
+        softId : int, optional
+            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
+            spendings of their software users.
+        callback : str, optional
+            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
+            the server. More info here https://2captcha.com/2captcha-api#pingback.
+        '''),
+    CaptchaMethod('audio', 'audio', ('lang',), file='audio', choices={'lang': ('en', 'ru', 'de', 'el', 'pt', 'fr')},
+                  doc='''Wrapper for solving audio captcha.
+
+        Parameters
+        __________
+        body : str
+            Base64 encoded audio file in mp3 format. Max file size: 1 MB.
+        lang : str
+          The language of audio record. Supported languages are: "en", "ru", "de", "el", "pt", "fr".
+        '''),
+    CaptchaMethod('text', 'post', ('text',),
+                  doc='''Wrapper for solving text captcha.
+
+        Parameters
+        __________
+        text : str
+            Max 140 characters. Encoding: UTF-8. Text will be shown to worker to help him to solve the captcha correctly.
+            For example: type red symbols only.
+        lang: str, optional
+            Language code. See the list of supported languages https://2captcha.com/2captcha-api#language.
+        softId : int, optional
+            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
+            spendings of their software users.
+        callback : str, optional
+            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
+            the server. More info here https://2captcha.com/2captcha-api#pingback.
+        '''),
+    CaptchaMethod('recaptcha', 'userrecaptcha', (('sitekey', 'googlekey'), 'url'),
+                  defaults=(('version', 'v2'), ('enterprise', 0)), timeout='recaptcha',
+                  doc='''Wrapper for solving recaptcha (v2, v3).
+
+        Parameters
+        __________
+        sitekey : str
+            Value of sitekey parameter you found on page.
+        url : str
+            Full URL of the page where you see the reCAPTCHA.
+        domain : str, optional
+            Domain used to load the captcha: google.com or recaptcha.net. Default: google.com.
+        invisible : int, optional
+            1 - means that reCAPTCHA is invisible. 0 - normal reCAPTCHA. Default: 0.
+        version : str, optional
+            v3 — defines that you're sending a reCAPTCHA V3. Default: v2.
+        enterprise : str, optional
+            1 - defines that you're sending reCAPTCHA Enterpise. Default: 0.
+        action : str, optional
+            Value of action parameter you found on page. Default: verify.
+        score : str, only for v3, optional
+            The score needed for resolution. Currently, it's almost impossible to get token with score higher than 0.3.
+            Default: 0.4.
+        data-s : str, only for v2, optional
+            Value of data-s parameter you found on page. Curenttly applicable for Google Search and other Google services.
+        cookies : str, only for v2, optional
+            Your cookies that will be passed to our worker who solve the captha. We also return worker's cookies in the
+            response if you use json=1. Format: KEY:Value, separator: semicolon, example: KEY1:Value1;KEY2:Value2;
+        userAgent : str, only for v2, optional
+            Your userAgent that will be passed to our worker and used to solve the captcha.
+        softId : int, optional
+            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
+            spendings of their software users.
+        callback : str, optional
+            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
+            the server. More info here https://2captcha.com/2captcha-api#pingback.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('funcaptcha', 'funcaptcha', (('sitekey', 'publickey'), 'url'),
+                  doc='''Wrapper for solving funcaptcha.
+
+        Parameters
+        __________
+        sitekey : str
+            Value of pk or data-pkey parameter you found on page.
+        url : str
+            Full URL of the page where you see the FunCaptcha.
+        surl : str, optional
+            Value of surl parameter you found on page.
+        userAgent: str, optional
+            Tells us to use your user-agent value.
+        data[key] : str, optional
+            Custom data to pass to FunCaptcha. For example: data[blob]=stringValue.
+        softId : int, optional
+            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
+            spendings of their software users.
+        callback : str, optional
+            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
+            the server. More info here https://2captcha.com/2captcha-api#pingback.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('geetest', 'geetest', ('gt', 'challenge', 'url'),
+                  doc='''Wrapper for solving geetest captcha.
+
+        Parameters
+        __________
+        gt : str
+            Value of gt parameter you found on target website.
+        challenge : str
+            Value of challenge parameter you found on target website.
+        url : str
+            Full URL of the page where you see Geetest captcha.
+        offline : num, optional
+            In rare cases initGeetest can be called with offline parameter. If the call uses offline: true, set the
+            value to 1. Default: 0.
+        new_captcha : num, optional
+            In rare cases initGeetest can be called with new_captcha parameter. If the call uses new_captcha: true, set
+            the value to 1. Mostly used with offline parameter.
+        userAgent : str, optional
+            Your userAgent that will be passed to our worker and used to solve the captcha.
+        apiServer : str, optional
+            Value of api_server parameter you found on target website.
+        softId : int, optional
+            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
+            spendings of their software users.
+        callback : str, optional
+            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
+            the server. More info here https://2captcha.com/2captcha-api#pingback.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('hcaptcha', 'hcaptcha', ('sitekey', 'url'),
+                  doc='''Wrapper for solving hcaptcha.
+
+        Parameters
+        __________
+        sitekey : str
+            Value of data-sitekey parameter you found on page.
+        url : str
+            Full URL of the page where you bypass the captcha.
+        invisible : num, optional
+            Use 1 for invisible version of hcaptcha. Currently it is a very rare case.
+            Default: 0.
+        data : str, optional
+            Custom data that is used in some implementations of hCaptcha, mostly with invisible=1. In most cases you see
+            it as rqdata inside network requests. Format: "data": "rqDataValue".
+        domain : str, optional
+            Domain used to load the captcha: hcaptcha.com or js.hcaptcha.com. Default: hcaptcha.com.
+        softId : int, optional
+            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
+            spendings of their software users.
+        callback : str, optional
+            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
+            the server. More info here https://2captcha.com/2captcha-api#pingback.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('keycaptcha', 'keycaptcha',
+                  ('s_s_c_user_id', 's_s_c_session_id', 's_s_c_web_server_sign', 's_s_c_web_server_sign2', 'url'),
+                  doc='''Wrapper for solving.
+
+        Parameters
+        __________
+        s_s_c_user_id : str
+            Value of s_s_c_user_id parameter you found on page.
+        s_s_c_session_id : str
+            Value of s_s_c_session_id parameter you found on page.
+        s_s_c_web_server_sign : str
+            Value of s_s_c_web_server_sign parameter you found on page.
+        s_s_c_web_server_sign2 : str
+            Value of s_s_c_web_server_sign2 parameter you found on page.
+        url : str
+            Full URL of the page where you see the KeyCaptcha.
+        softId : int, optional
+            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
+            spendings of their software users.
+        callback : str, optional
+            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
+            the server. More info here https://2captcha.com/2captcha-api#pingback.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('capy', 'capy', (('sitekey', 'captchakey'), 'url'),
+                  doc='''Wrapper for solving capy.
+
+        Parameters
+        __________
+        sitekey : str
+            The domain part of script URL you found on page. Default value: https://jp.api.capy.me/.
+        url : str
+            Full URL of the page where you see the captcha.
+        api_server : str, optional
+            The domain part of script URL you found on page. Default value: https://jp.api.capy.me/.
+        version : str, optional
+            The version of captcha task: "puzzle" (assemble a puzzle) or "avatar" (drag an object). Default: puzzle.
+        softId : int, optional
+            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
+            spendings of their software users.
+        callback : str, optional
+            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
+            the server. More info here https://2captcha.com/2captcha-api#pingback.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('grid', file='image', params={'recaptcha': 1},
+                  doc='''Wrapper for solving grid captcha (image).
+
+        Parameters
+        __________
+        file : file
+            Captcha image file. * required if you submit image as a file (method=post).
+        body : str
+            Base64-encoded captcha image. * required if you submit image as Base64-encoded string (method=base64).
+        hintText : str
+            Max 140 characters. Encoding: UTF-8. Text with instruction for solving reCAPTCHA. For example: select images
+            with trees. Not required if you're sending instruction as an image with imginstructions.
+        hintImg : img
+            Max 400x150px, 100 kB. Image with instruction for solving reCAPTCHA. Not required if you're sending
+            instruction as text with textinstructions.
+        rows : int, optional
+            Number of rows in reCAPTCHA grid.
+        cols : itn, optional
+            Number of columns in reCAPTCHA grid.
+        img_type : str, optional
+            The type of captcha to solve. Supported values:
+            - funcaptcha: FunCaptcha where you need to click the correct square.
+            - funcaptcha_compare: FunCaptcha where you select the square using arrows.
+            - recaptcha: reCAPTCHA.
+            - hcaptcha: hCaptcha.
+            Important: You must also provide the textinstructions parameter with the original instructions in English,
+            and send the original image files, not screenshots.
+        previousId : str, optional
+            Id of your previous request with the same captcha challenge.
+        canSkip : int, optional
+            0 - not specified. 1 - possibly there's no images that fit the instruction. Set the value to 1 only if it's
+            possible that there's no images matching to the instruction. We'll provide a button "No matching images" to
+            worker, and you will receive No_matching_images as answer.
+            Default: 0.
+        lang: str, optional
+            Language code. See the list of supported languages https://2captcha.com/2captcha-api#language.
+        softId : int, optional
+            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
+            spendings of their software users.
+        callback : str, optional
+            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
+            the server. More info here https://2captcha.com/2captcha-api#pingback.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('canvas', file='image', params={'recaptcha': 1, 'canvas': 1}, required_any=('hintText', 'hintImg'),
+                  doc='''Wrapper for solving canvas captcha (image).
+
+        Parameters
+        __________
+        file : file
+            Captcha image file. * required if you submit image as a file (method=post).
+        body : str
+            Base64-encoded captcha image. * required if you submit image as Base64-encoded string (method=base64).
+        hintText : str
+            Max 140 characters. Encoding: UTF-8. Text with instruction for solving reCAPTCHA. For example: select
+            images with trees. Not required if you're sending instruction as an image with imginstructions.
+        hintImg : img
+            Max 400x150px, 100 kB. Image with instruction for solving reCAPTCHA. Not required if you're sending
+            instruction as text with textinstructions.
+        canSkip : int, optional
+            0 - not specified. 1 - possibly there's no images that fit the instruction. Set the value to 1 only if it's
+            possible that there's no images matching to the instruction. We'll provide a button "No matching images" to
+            worker, and you will receive No_matching_images as answer.
+            Default: 0.
+        lang : int, optional
+            0 - not specified. 1 - Cyrillic captcha. 2 - Latin captcha.
+            Default: 0.
+        softId : int, optional
+            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
+            spendings of their software users.
+        callback : str, optional
+            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
+            the server. More info here https://2captcha.com/2captcha-api#pingback.
+        '''),
+    CaptchaMethod('coordinates', file='image', params={'coordinatescaptcha': 1},
+                  doc='''Wrapper for solving coordinates captcha (image).
+
+        Parameters
+        __________
+        file : file
+            Captcha image file. * required if you submit image as a file (method=post).
+        body : str
+            Base64-encoded captcha image. * required if you submit image as Base64-encoded string (method=base64).
+        hintText : str
+            Max 140 characters. Encoding: UTF-8. Text with instruction for solving the captcha. For example: click on
+            images with ghosts. Not required if the image already contains the instruction.
+        hintImg : img
+             Max 400x150px, 100 kB. Image with instruction for solving reCAPTCHA. Not required if you're sending
+             instruction as text with textinstructions.
+        lang : str, optional
+            Language code. See the list of supported languages https://2captcha.com/2captcha-api#language.
+        min_clicks : int, optional
+            The minimum number of clicks that need to be done.
+        max_clicks : int, optional
+            The maximum number of clicks that can be done.
+        softId : int, optional
+            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
+            spendings of their software users.
+        callback : str, optional
+            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
+            the server. More info here https://2captcha.com/2captcha-api#pingback.
+        '''),
+    CaptchaMethod('rotate', 'rotatecaptcha', file='images',
+                  doc='''Wrapper for solving rotate captcha (image).
+
+        Parameters
+        __________
+        files : file
+            Captcha image file. * required if you submit image as a file (method=post).
+        body : str
+            Base64-encoded captcha image. * required if you submit image as Base64-encoded string (method=base64).
+        angle : int, optional
+            Angle for one rotation step in degrees. If not defined we'll use the default value for FunCaptcha: 40 degrees.
+            Default: 40.
+        lang : str, optional
+            Language code. See the list of supported languages https://2captcha.com/2captcha-api#language.
+        hintImg : str, optional
+            Image with instruction for worker to help him to solve captcha correctly.
+        hintText : str, optional
+            Text will be shown to worker to help him to to solve captcha correctly.
+        softId : int, optional
+            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
+            spendings of their software users.
+        callback : str, optional
+            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
+            the server. More info here https://2captcha.com/2captcha-api#pingback.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('geetest_v4', 'geetest_v4', ('captcha_id', 'url'),
+                  doc='''Wrapper for solving geetest_v4 captcha.
+
+        Parameters
+        __________
+        captcha_id : str
+            Value of captcha_id parameter you found on target website.
+        url: str
+            Full URL of the page where you see Geetest captcha.
+        risk_type: str, optional
+            Value of risk_type parameter is contained in the captcha loading request.
+        softId : int, optional
+            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
+            spendings of their software users.
+        callback : str, optional
+            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
+            the server. More info here https://2captcha.com/2captcha-api#pingback.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('lemin', 'lemin', ('captcha_id', 'div_id', 'url'),
+                  doc='''Wrapper for solving Lemin Cropped Captcha.
+
+        Parameters
+        __________
+        captcha_id : str
+            Value of captcha_id parameter you found on page.
+        div_id : str
+            The id of captcha parent div element.
+        url : str
+            Full URL of the page where you see the captcha.
+        api_server : str, optional
+            The domain part of script URL you found on page. Default value: https://api.leminnow.com/.
+        softId : int, optional
+            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
+            spendings of their software users.
+        callback : str, optional
+            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
+            the server. More info here https://2captcha.com/2captcha-api#pingback.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('atb_captcha', 'atb_captcha', ('app_id', 'api_server', 'url'),
+                  doc='''Wrapper for solving atbCAPTCHA.
+
+        Parameters
+        __________
+        app_id : str
+            The value of appId parameter in the website source code.
+        api_server : str
+            The value of apiServer parameter in the website source code.
+        url : str
+            The full URL of target web page where the captcha is loaded. We do not open the page, not a problem if it is
+            available only for authenticated users.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+
+        '''),
+    CaptchaMethod('turnstile', 'turnstile', ('sitekey', 'url'),
+                  doc='''Wrapper for solving Cloudflare Turnstile.
+
+        Parameters
+        __________
+        sitekey : str
+            Value of sitekey parameter you found on page.
+        url : str
+            Full URL of the page where you see the captcha.
+        useragent : str
+            User-Agent of your browser. Must match the User-Agent you use to access the site.
+            Use only modern browsers released within the last 6 months.
+        action : str. optional
+            Value of optional action parameter you found on page, can be defined in data-action attribute or passed
+            to turnstile.render call.
+        data : str, optional
+            The value of cData passed to turnstile.render call. Also can be defined in data-cdata attribute.
+        pagedata : str, optional
+            The value of the chlPageData parameter when calling turnstile.render.
+        softId : int, optional
+            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
+            spendings of their software users.
+        callback : str, optional
+            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
+            the server. More info here https://2captcha.com/2captcha-api#pingback.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('amazon_waf', 'amazon_waf', ('sitekey', 'iv', 'context', 'url'),
+                  doc='''Wrapper for solving Amazon WAF.
+
+        Parameters
+        __________
+        sitekey : str
+            Value of key parameter you found on the page.
+        iv : str
+            Value of iv parameter you found on the page.
+        context : str
+            Value of optional context parameter you found on page.
+        url : str
+            Full URL of the page where you see the captcha.
+        challenge_script : str, optional
+            The source URL of challenge.js script on the page.
+        captcha_script : str, optional
+            The source URL of captcha.js script on the page.
+        softId : int, optional
+            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
+            spendings of their software users.
+        callback : str, optional
+            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
+            the server. More info here https://2captcha.com/2captcha-api#pingback.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('mtcaptcha', 'mt_captcha', ('sitekey', 'url'),
+                  doc='''Wrapper for solving MTCaptcha.
+
+        Parameters
+        __________
+        sitekey : str
+            The value of sitekey parameter found on the page.
+        url : str
+            Full URL of the page where you solve the captcha.
+        softId : int, optional
+            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
+            spendings of their software users.
+        callback : str, optional
+            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
+            the server. More info here https://2captcha.com/2captcha-api#pingback.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('friendly_captcha', 'friendly_captcha', ('sitekey', 'url'),
+                  doc='''Wrapper for solving Friendly Captcha.
+
+        Parameters
+        __________
+        sitekey : str
+            The value of data-sitekey attribute of captcha's div element on page.
+        url : str
+            Full URL of the page where you solve the captcha.
+        softId : int, optional
+            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
+            spendings of their software users.
+        callback : str, optional
+            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
+            the server. More info here https://2captcha.com/2captcha-api#pingback.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('tencent', 'tencent', ('app_id', 'url'),
+                  doc='''Wrapper for solving Tencent captcha.
+
+        Parameters
+        __________
+        app_id : str
+            The value of appId parameter in the website source code.
+        url : str
+            The full URL of target web page where the captcha is loaded. We do not open the page, not a problem if it is
+            available only for authenticated users.
+        softId : int, optional
+            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
+            spendings of their software users.
+        callback : str, optional
+            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
+            the server. More info here https://2captcha.com/2captcha-api#pingback.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('cutcaptcha', 'cutcaptcha', ('misery_key', ('apikey', 'api_key'), 'url'),
+                  doc='''Wrapper for solving Friendly Captcha.
+
+        Parameters
+        __________
+        misery_key : str
+            The value of CUTCAPTCHA_MISERY_KEY variable defined on page.
+        apikey : str
+            The value of data-apikey attribute of iframe's body. Also, the name of javascript file included on the page.
+        url : str
+            Full URL of the page where you solve the captcha.
+        softId : int, optional
+            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
+            spendings of their software users.
+        callback : str, optional
+            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
+            the server. More info here https://2captcha.com/2captcha-api#pingback.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('vkimage', 'vkimage', ('steps',), file='images',
+                  doc='''Wrapper for solving vkimage captcha.
+
+        Parameters
+        __________
+        file : str
+            Captcha image as a file or base64.
+        steps: str
+            Array of steps.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('vkcaptcha', 'vkcaptcha', ('redirect_uri', ('userAgent', 'useragent'), 'proxy'),
+                  doc='''Wrapper for solving VK captcha using tokens.
+
+        Parameters
+        __________
+        redirect_uri : str
+            The URL that is returned for requests to the captchas API.
+        userAgent : str
+            User-Agent of the browser that will be used by the employee when loading the captcha.
+        proxy : dict
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('captchafox', 'captchafox', ('sitekey', 'pageurl', ('userAgent', 'useragent'), 'proxy'),
+                  doc='''Wrapper for solving CaptchaFox using tokens.
+
+        Parameters
+        __________
+        sitekey : str
+            The sitekey parameter value found on the page or in network requests.
+        pageurl : str
+            Full URL of the page with captcha.
+        userAgent : str
+            User-Agent of the browser that will be used by the employee when loading the captcha.
+        proxy : dict
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        api_server : str, optional
+            Default: https://cdn.captchafox.com/. Depending on the parameter value, the token format
+            changes — it will be prefixed with MAM_. For this, you need to set the server URL to:
+            https://s.uicdn.com/mampkg/@mamdev/core.frontend.libs.captchafox/. Two different APIs
+            return two different tokens. Choose the one you need.
+        '''),
+    CaptchaMethod('prosopo', 'prosopo', ('sitekey', 'pageurl'),
+                  doc='''Wrapper for solving Prosopo captcha using tokens.
+
+        Parameters
+        __________
+        sitekey : str
+            The sitekey parameter value found on the page or in network requests.
+        pageurl : str
+            Full URL of the page with captcha.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('temu', 'temuimage', ('body', 'part1', 'part2', 'part3'),
+                  doc='''Wrapper for solving Temu captcha .
+
+        Parameters
+        __________
+        body : str
+            Main captcha image as a base64 string.
+        part1 : str
+            Tile element as a base64 string.
+        part2 : str
+            Tile element as a base64 string.
+        part3 : str
+            Tile element as a base64 string.
+        '''),
+    CaptchaMethod('datadome', 'datadome', ('captcha_url', 'pageurl', 'userAgent', 'proxy'),
+                  doc='''Wrapper for solving DataDome Captcha.
+
+        Parameters
+        __________
+        captcha_url: str
+            The value of the 'src' parameter for the 'iframe' element containing the captcha on the page.
+        pageurl: str
+            Full URL of the page that triggers the captcha when you go to it.
+        userAgent: str
+            User-Agent of the browser that will be used by the employee when loading the captcha.
+        proxy : dict
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('cybersiara', 'cybersiara', ('master_url_id', 'pageurl', 'userAgent'),
+                  doc='''Wrapper for solving CyberSiARA captcha.
+
+        Parameters
+        __________
+        master_url_id : str
+            The value of the MasterUrlId parameter from the request to API/CyberSiara/GetCyberSiara.
+        pageurl : str
+            Full URL of the page with captcha.
+        userAgent : str
+            User-Agent of your browser.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('yandex_smart', 'yandex', ('sitekey', 'url'),
+                  doc='''Wrapper for solving Yandex Smart.
+
+        Parameters
+        __________
+        sitekey : str
+            The value of data-sitekey attribute of captcha's div element on page.
+        url : str
+            Full URL of the page where you solve the captcha.
+        softId : int, optional
+            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
+            spendings of their software users.
+        callback : str, optional
+            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
+            the server. More info here https://2captcha.com/2captcha-api#pingback.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        userAgent: str, optional
+            User-Agent of the browser that will be used by the employee when loading the captcha.
+        '''),
+    CaptchaMethod('altcha', 'altcha', ('pageurl',),
+                  doc='''Wrapper for solving Altcha Captcha.
+
+        Parameters
+        __________
+        pageurl : str
+            Full URL of the page where you solve the captcha.
+        challenge_url : str, optional
+            The value of the 'challenge_url' parameter for the 'altcha-widget' element containing the captcha on the page.
+            At least one of the parameters 'challenge_url', 'challenge_json' must be passed.
+        challenge_json : str, optional
+            The contents of the file from the 'challenge_url' parameter.
+            At least one of the parameters 'challenge_url', 'challenge_json' must be passed.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+
+        '''),
+    CaptchaMethod('binance', 'binance', ('pageurl', 'sitekey', 'validate_id'),
+                  doc='''Wrapper for solving Binance captcha.
+
+        Parameters
+        __________
+        pageurl : str
+            Full URL of the page where you solve the captcha.
+        sitekey : str
+            Value of 'bizId', 'bizType', or 'bizCode' from page requests.
+        validate_id : str
+            Dynamic value of 'validateId', 'securityId', or 'securityCheckResponseValidateId'.
+        useragent : str, optional
+            Browser User-Agent. We recommend sending a valid Windows browser string.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('yidun', 'yidun', ('sitekey', 'pageurl'),
+                  doc='''Wrapper for solving Yidun captcha.
+
+        Parameters
+        __________
+        
+        sitekey : str
+            The 'sitekey' value found in the website source code.
+        pageurl : str
+            Full URL of the page containing the captcha.
+        yidun_get_lib : str, optional
+            Path to the JavaScript file that loads the captcha on the page. Important: use the full URL (https://...). Recommended if the site includes challenge, hcg, or hct fields.
+        yidun_api_server_subdomain : str, optional
+            Yidun API server subdomain. Enter only the domain, without the https:// prefix.
+        challenge : str, optional
+            Usually sent in network requests during captcha initialization or display.
+        hcg : str, optional
+            Captcha hash used when forming the request. You can get this together with challenge.
+        hct : int, optional
+            Numeric timestamp or identifier used for Enterprise version validation.
+        useragent : str, optional
+            Browser User-Agent. We recommend sending a valid Windows browser string.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('hunt', 'hunt', ('pageurl', 'api_get_lib'),
+                  doc='''Wrapper for solving Hunt captcha.
+
+        Parameters
+        __________
+        pageurl : str
+            Full URL of the page with the captcha.
+        api_get_lib : str
+            Full link to the api.js file that loads the captcha on the page.
+        data : str, optional
+            Value of `meta.token` that the site returned after a request with X-HD.
+            Use only for the captcha solving mode (second step).
+        useragent : str, optional
+            Browser User-Agent used to open the page.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('alibaba', 'alibaba', ('pageurl', 'scene_id', 'prefix'),
+                  doc='''Wrapper for solving Alibaba captcha.
+
+        Parameters
+        __________
+        pageurl : str
+            Full URL of the page with the captcha.
+        scene_id : str
+            Captcha scenario identifier.
+        prefix : str
+            Prefix from the captcha loading request subdomain.
+        user_id : str, optional
+            User or session identifier on the website.
+        user_user_id : str, optional
+            Additional user identifier.
+        verify_type : str, optional
+            Verification mechanism version or type.
+        region : str, optional
+            Captcha processing region.
+        user_certify_id : str, optional
+            Verification ID for the current captcha session.
+        api_get_lib : str, optional
+            URL of the Alibaba Captcha JS library.
+        useragent : str, optional
+            Browser User-Agent used to open the page.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+    CaptchaMethod('tspd', 'tspd', ('pageurl', 'tspd_cookie', 'html_page_base64', 'proxy'),
+                  doc='''Wrapper for solving TSPD captcha.
+
+        Parameters
+        __________
+        pageurl : str
+            Full URL of the page with the captcha.
+        tspd_cookie : str
+            Cookies received on the TSPD challenge page.
+        html_page_base64 : str
+            Full HTML of the challenge page, Base64 encoded.
+        proxy : dict
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        useragent : str, optional
+            Browser User-Agent. We recommend sending a valid Windows browser string.
+        '''),
+    CaptchaMethod('basilisk', 'basilisk', ('pageurl', 'sitekey'),
+                  doc='''Wrapper for solving Basilisk captcha.
+
+        Parameters
+        __________
+        pageurl : str
+            Full URL of the page with the captcha.
+        sitekey : str
+            The value of the data-site-key parameter found on the page.
+        useragent : str, optional
+            Browser User-Agent used to open the page.
+        proxy : dict, optional
+            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        '''),
+)}
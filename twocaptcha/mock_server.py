@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+
+import itertools
+import json
+import random
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+
+# JSON API task types answered with a text instead of a token
+TEXT_TASKS = {'ImageToTextTask', 'AudioTask', 'TextCaptchaTask'}
+
+
+class _Captcha():
+    # a captcha received by the server
+
+    def __init__(self, params, files, ready, answer):
+        self.params = params
+        self.files = files
+        self.ready = ready
+        self.answer = answer
+        self.solved = False
+
+
+class MockServer():
+    """
+    Local stand-in for the 2captcha API, for integration tests and benchmarks without network access or costs.
+
+    Serves in.php, res.php and the JSON API (createTask, getTaskResult, getBalance, reportCorrect, reportIncorrect)
+    over plain HTTP from a background thread. Pass its url as the server of a solver:
+    TwoCaptcha('API_KEY', server=mock.url). Captchas are solved solve_time seconds after they are received, res.php
+    answers CAPCHA_NOT_READY until then.
+
+    Parameters
+    __________
+    solve_time : float, tuple or callable, optional
+        Time in seconds a captcha takes to be solved: a number, a (low, high) range sampled uniformly, or a function
+        returning a sample, e.g. lambda: random.expovariate(1 / 15).
+        Default: 0.
+    latency : float, tuple or callable, optional
+        Delay of every response in seconds, in the same forms as solve_time.
+        Default: 0.
+    answer : str or callable, optional
+        Answer of the captchas, or a function returning it from the parameters of a captcha (the fields sent to
+        in.php, or the task sent to createTask).
+        Default: 'abcd'.
+    in_errors : dict, optional
+        Probabilities of errors injected into captcha submissions (in.php, createTask), by response: a 2captcha error
+        code such as 'ERROR_NO_SLOT_AVAILABLE', or an HTTP status code such as 503.
+    res_errors : dict, optional
+        Probabilities of errors injected into the other requests (res.php, getTaskResult, ...), e.g.
+        {'CAPCHA_NOT_READY': 0.2, 502: 0.01}.
+    api_key : str, optional
+        Key accepted by the server, None to accept any key.
+    balance : float, optional
+        Balance of the account.
+        Default: 10.
+    host : str, optional
+        Interface to listen on.
+        Default: 127.0.0.1.
+    port : int, optional
+        Port to listen on, 0 picks a free port.
+        Default: 0.
+    seed : int, optional
+        Seed of the random samples and errors, for reproducible runs.
+    """
+
+    def __init__(self, solve_time=0, latency=0, answer='abcd', in_errors=None, res_errors=None, api_key=None,
+                 balance=10, host='127.0.0.1', port=0, seed=None):
+        self.answer = answer
+        self.in_errors = in_errors or {}
+        self.res_errors = res_errors or {}
+        self.api_key = api_key
+        self.balance = balance
+        self.host = host
+        self.port = port
+
+        self._random = random.Random(seed)
+        self._solve_time = self._sampler(solve_time)
+        self._latency = self._sampler(latency)
+
+        self._captchas = OrderedDict()
+        self._ids = itertools.count(1)
+        self._injected = {'in': deque(), 'res': deque()}
+        self._requests = Counter()
+        self._errors = Counter()
+        self._not_ready = 0
+        self._lock = threading.Lock()
+
+        self._server = None
+        self._thread = None
+
+    def _sampler(self, value):
+        if callable(value):
+            return value
+        if isinstance(value, (tuple, list)):
+            low, high = value
+            return lambda: self._random.uniform(low, high)
+        return lambda: value
+
+    @property
+    def url(self):
+        '''URL of the server, to be used as the server of a solver.'''
+
+        return f'http://{self.host}:{self.port}'
+
+    def start(self):
+        '''Starts listening in a background thread.'''
+
+        if self._server is not None:
+            return
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # headers and body are written separately, Nagle's algorithm would delay the body
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                if 'chunked' in self.headers.get('Transfer-Encoding', '').lower():
+                    # sent by AsyncTwoCaptcha for files read from async iterables
+                    self.respond(self.read_chunks())
+                    return
+
+                length = int(self.headers.get('Content-Length') or 0)
+                self.respond(self.rfile.read(length) if length else b'')
+
+            def read_chunks(self):
+                chunks = []
+                while True:
+                    size = int(self.rfile.readline().split(b';')[0], 16)
+                    if not size:
+                        break
+                    chunks.append(self.rfile.read(size))
+                    self.rfile.readline()
+
+                # trailers, up to the empty line
+                while self.rfile.readline() not in (b'\r\n', b'\n', b''):
+                    pass
+
+                return b''.join(chunks)
+
+            def do_GET(self):
+                self.respond(b'')
+
+            def respond(self, body):
+                url = urlsplit(self.path)
+                status, content_type, content = server.handle(url.path, url.query, self.headers.get('Content-Type'),
+                                                              body)
+
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            daemon_threads = True
+            # the default backlog of 5 drops connections opened by concurrent clients
+            request_queue_size = 1024
+
+        self._server = Server((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.1},
+                                        name='twocaptcha-mock-server', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        '''Stops listening.'''
+
+        server, self._server = self._server, None
+
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            self._thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def inject(self, response, endpoint='in', count=1):
+        '''Makes the next requests fail, whatever in_errors and res_errors are.
+
+        Parameters
+        __________
+        response : str or int
+            2captcha error code (or CAPCHA_NOT_READY) or HTTP status code answered.
+        endpoint : str, optional
+            'in' for captcha submissions (in.php, createTask), 'res' for the other requests.
+            Default: 'in'.
+        count : int, optional
+            Number of requests failing.
+            Default: 1.
+        '''
+
+        with self._lock:
+            self._injected[endpoint].extend([response] * count)
+
+    def captchas(self):
+        '''Returns the parameters of the captchas received, in the order they were received. Files sent with in.php
+        are included as bytes.'''
+
+        with self._lock:
+            return [dict(captcha.params, **captcha.files) for captcha in self._captchas.values()]
+
+    def stats(self):
+        '''Returns the number of requests per endpoint, of captchas received and solved (their answer was sent), of
+        CAPCHA_NOT_READY responses and of injected errors by response.'''
+
+        with self._lock:
+            return {
+                'requests': dict(self._requests),
+                'captchas': len(self._captchas),
+                'solved': sum(1 for captcha in self._captchas.values() if captcha.solved),
+                'not_ready': self._not_ready,
+                'errors': dict(self._errors),
+            }
+
+    def reset(self):
+        '''Forgets the captchas received and resets the counters of stats().'''
+
+        with self._lock:
+            self._captchas.clear()
+            self._requests.clear()
+            self._errors.clear()
+            self._not_ready = 0
+
+    def handle(self, path, query, content_type, body):
+        '''Answers a request.
+
+        Returns
+
+        status, content_type, content : tuple
+        '''
+
+        delay = self._latency()
+        if delay > 0:
+            time.sleep(delay)
+
+        endpoint = path.strip('/')
+
+        with self._lock:
+            self._requests[endpoint] += 1
+
+        if endpoint in ('in.php', 'res.php'):
+            fields, files = _form(content_type, body)
+            fields = dict(parse_qsl(query), **fields)
+            response = self._error('in' if endpoint == 'in.php' else 'res')
+
+            if isinstance(response, int):
+                return response, 'text/plain', b'error'
+            if response is None and self.api_key is not None and fields.get('key') != self.api_key:
+                response = 'ERROR_KEY_DOES_NOT_EXIST'
+            if response is None:
+                response = self._in(fields, files) if endpoint == 'in.php' else self._res(fields)
+
+            if fields.get('json') == '1':
+                if response.startswith('OK|'):
+                    response = json.dumps({'status': 1, 'request': response[3:]})
+                else:
+                    failed = response.startswith('ERROR') or response == 'CAPCHA_NOT_READY'
+                    response = json.dumps({'status': 0 if failed else 1, 'request': response})
+
+            return 200, 'text/plain', response.encode('utf-8')
+
+        try:
+            data = json.loads(body or b'{}')
+        except ValueError:
+            data = {}
+
+        response = self._error('in' if endpoint == 'createTask' else 'res')
+
+        if isinstance(response, int):
+            return response, 'text/plain', b'error'
+        if response is None and self.api_key is not None and data.get('clientKey') != self.api_key:
+            response = 'ERROR_KEY_DOES_NOT_EXIST'
+        if response == 'CAPCHA_NOT_READY':
+            result = {'errorId': 0, 'status': 'processing'}
+        elif response is not None:
+            result = {'errorId': 1, 'errorCode': response}
+        else:
+            result = self._json(endpoint, data)
+
+        if result is None:
+            return 404, 'text/plain', b'not found'
+
+        return 200, 'application/json', json.dumps(result).encode('utf-8')
+
+    def _error(self, endpoint):
+        # injected response of a request, None to answer it normally
+        with self._lock:
+            if self._injected[endpoint]:
+                response = self._injected[endpoint].popleft()
+            else:
+                response = None
+                errors = self.in_errors if endpoint == 'in' else self.res_errors
+                draw = self._random.random()
+                for error, probability in errors.items():
+                    draw -= probability
+                    if draw < 0:
+                        response = error
+                        break
+
+            if response == 'CAPCHA_NOT_READY':
+                self._not_ready += 1
+            elif response is not None:
+                self._errors[response] += 1
+
+            return response
+
+    def _add(self, params, files):
+        answer = self.answer(params) if callable(self.answer) else self.answer
+        captcha = _Captcha(params, files, time.monotonic() + self._solve_time(), answer)
+
+        with self._lock:
+            id_ = str(next(self._ids))
+            self._captchas[id_] = captcha
+
+        return id_
+
+    def _answer(self, id_):
+        # answer of a captcha, CAPCHA_NOT_READY or an error code
+        with self._lock:
+            captcha = self._captchas.get(id_)
+            if captcha is None:
+                return 'ERROR_WRONG_CAPTCHA_ID'
+
+            if captcha.ready > time.monotonic():
+                self._not_ready += 1
+                return 'CAPCHA_NOT_READY'
+
+            captcha.solved = True
+            return 'OK|' + captcha.answer
+
+    def _in(self, fields, files):
+        return 'OK|' + self._add(fields, files)
+
+    def _res(self, fields):
+        action = fields.get('action')
+
+        if action == 'get' and 'ids' in fields:
+            answers = [self._answer(id_) for id_ in fields['ids'].split(',')]
+            return '|'.join(answer[3:] if answer.startswith('OK|') else answer for answer in answers)
+
+        if action == 'get':
+            return self._answer(fields.get('id'))
+
+        if action == 'getbalance':
+            return str(self.balance)
+
+        if action in ('reportgood', 'reportbad'):
+            with self._lock:
+                return 'OK_REPORT_RECORDED' if fields.get('id') in self._captchas else 'ERROR_WRONG_CAPTCHA_ID'
+
+        return 'ERROR_BAD_PARAMETERS'
+
+    def _json(self, endpoint, data):
+        if endpoint == 'createTask':
+            task = data.get('task') or {}
+            return {'errorId': 0, 'taskId': int(self._add(task, {}))}
+
+        if endpoint == 'getTaskResult':
+            id_ = str(data.get('taskId'))
+            answer = self._answer(id_)
+
+            if answer == 'CAPCHA_NOT_READY':
+                return {'errorId': 0, 'status': 'processing'}
+            if not answer.startswith('OK|'):
+                return {'errorId': 1, 'errorCode': answer}
+
+            with self._lock:
+                task_type = self._captchas[id_].params.get('type')
+            solution = {'text' if task_type in TEXT_TASKS else 'token': answer[3:]}
+            return {'errorId': 0, 'status': 'ready', 'solution': solution}
+
+        if endpoint == 'getBalance':
+            return {'errorId': 0, 'balance': self.balance}
+
+        if endpoint in ('reportCorrect', 'reportIncorrect'):
+            with self._lock:
+                if str(data.get('taskId')) not in self._captchas:
+                    return {'errorId': 1, 'errorCode': 'ERROR_NO_SUCH_CAPCHA_ID'}
+            return {'errorId': 0, 'status': 'success'}
+
+        return None
+
+
+def _form(content_type, body):
+    # fields and files of an urlencoded or multipart/form-data request body
+    if not body:
+        return {}, {}
+
+    if not (content_type or '').startswith('multipart/form-data'):
+        return dict(parse_qsl(body.decode('utf-8'))), {}
+
+    header = b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n'
+    message = BytesParser(policy=HTTP).parsebytes(header + body)
+
+    fields, files = {}, {}
+    for part in message.iter_parts():
+        name = part.get_param('name', header='content-disposition')
+        content = part.get_payload(decode=True)
+        if part.get_filename() is not None:
+            files[name] = content
+        else:
+            fields[name] = content.decode('utf-8')
+
+    return fields, files
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+
+import asyncio
+import hmac
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+try:
+    from .exceptions.api import ApiException
+except ImportError:
+    from twocaptcha.exceptions.api import ApiException
+
+
+def pingback_error(code):
+    '''Returns the exception raised for a pingback that carries no answer (e.g. ERROR_CAPTCHA_UNSOLVABLE), as res.php
+    would for the same code, None if the code is an answer.'''
+
+    if not code or code == 'CAPCHA_NOT_READY' or code.startswith('ERROR'):
+        return ApiException(code or 'empty pingback')
+
+    return None
+
+
+class BasePingbackReceiver():
+    """
+    Matches 2captcha pingbacks (callbacks) to the captchas solvers are waiting for.
+
+    Only pingbacks of captchas sent by the attached solvers are accepted, others are ignored. As anyone can post to the
+    receiver, set a token: the last segment of the path of the URL, which only 2captcha knows. Requests to other paths
+    are rejected.
+
+    Parameters
+    __________
+    url : str
+        Public URL of the receiver registered in the pingback settings of your account. Used as the default callback
+        of the solvers the receiver is attached to.
+    host : str, optional
+        Interface to listen on.
+        Default: 0.0.0.0.
+    port : int, optional
+        Port to listen on, 0 picks a free port.
+        Default: 8080.
+    fallback : float, optional
+        Seconds to wait for a pingback before falling back to polling res.php for the answer.
+        Default: 60.
+    max_unmatched : int, optional
+        Number of pingbacks kept for captchas that are not (yet) waited for.
+        Default: 1000.
+    token : str, optional
+        Secret expected as the last segment of the path of pingback requests, e.g. url='https://your.site/pingback/'
+        + token. Default: None, any path is accepted.
+    """
+
+    def __init__(self, url, host='0.0.0.0', port=8080, fallback=60, max_unmatched=1000, token=None):
+        self.url = url
+        self.host = host
+        self.port = port
+        self.fallback = fallback
+        self.max_unmatched = max_unmatched
+        self.token = token
+
+        self._pollers = []
+        self._unmatched = OrderedDict()
+        # captchas sent by the attached solvers whose answer was not received yet
+        self._expected = OrderedDict()
+        self._max_expected = 10000
+        self._lock = threading.Lock()
+
+    def attach(self, poller):
+        '''Delivers pingbacks to the captchas the poller is waiting for.'''
+
+        with self._lock:
+            self._pollers.append(poller)
+
+    def detach(self, poller):
+        with self._lock:
+            self._pollers.remove(poller)
+
+    def expect(self, id_):
+        '''Registers a captcha sent with the receiver URL as callback, so that its pingback is accepted even if it
+        arrives before anyone waits for the answer.'''
+
+        with self._lock:
+            self._expected[id_] = True
+            while len(self._expected) > self._max_expected:
+                self._expected.popitem(last=False)
+
+    def claim(self, id_):
+        '''Returns and forgets the answer received for a captcha nobody was waiting for, None if there is none.'''
+
+        with self._lock:
+            self._expected.pop(id_, None)
+            return self._unmatched.pop(id_, None)
+
+    def authorized(self, path):
+        '''Tells whether a request to the path carries the token of the receiver.'''
+
+        if self.token is None:
+            return True
+
+        return hmac.compare_digest(path.rstrip('/').rsplit('/', 1)[-1].encode('utf-8'), self.token.encode('utf-8'))
+
+    def receive(self, id_, code):
+        '''Hands the answer of a captcha over to the poller waiting for it.
+
+        Parameters
+        __________
+        id_ : str
+            ID of the solved captcha.
+        code : str
+            Answer of the captcha.
+
+        Returns
+
+        matched : bool
+            False if no poller is waiting for the captcha. The answer of a captcha sent by an attached solver is kept
+            and can be claimed later, pingbacks of unknown captchas are ignored.
+        '''
+
+        with self._lock:
+            pollers = list(self._pollers)
+
+        for poller in pollers:
+            if poller.deliver(id_, code):
+                with self._lock:
+                    self._expected.pop(id_, None)
+                return True
+
+        with self._lock:
+            if self._expected.pop(id_, None) is None:
+                return False
+
+            self._unmatched[id_] = code
+            while len(self._unmatched) > self.max_unmatched:
+                self._unmatched.popitem(last=False)
+
+        return False
+
+    def parse(self, query, content_type, body):
+        '''Extracts the captcha ID and answer from a pingback request, None if it is not a pingback.'''
+
+        fields = dict(parse_qsl(query))
+
+        if body:
+            body = body.decode('utf-8', 'replace')
+            if 'json' in (content_type or ''):
+                try:
+                    data = json.loads(body)
+                except ValueError:
+                    data = None
+                if isinstance(data, dict):
+                    fields.update({k: str(v) for k, v in data.items()})
+            else:
+                fields.update(parse_qsl(body))
+
+        if not fields.get('id') or 'code' not in fields:
+            return None
+
+        return fields['id'], fields['code']
+
+
+class PingbackReceiver(BasePingbackReceiver):
+    """
+    HTTP server receiving 2captcha pingbacks in a background thread, for TwoCaptcha.
+
+    Pass it to the solver with TwoCaptcha(..., pingback=receiver): the receiver URL becomes the default callback and
+    solve() returns as soon as the pingback arrives. res.php is polled only if no pingback arrives within fallback
+    seconds.
+
+    Parameters
+    __________
+    url : str
+        Public URL of the receiver registered in the pingback settings of your account.
+    host : str, optional
+        Interface to listen on.
+        Default: 0.0.0.0.
+    port : int, optional
+        Port to listen on, 0 picks a free port.
+        Default: 8080.
+    fallback : float, optional
+        Seconds to wait for a pingback before falling back to polling res.php for the answer.
+        Default: 60.
+    token : str, optional
+        Secret expected as the last segment of the path of pingback requests, e.g. url='https://your.site/pingback/'
+        + token. Default: None, any path is accepted.
+    """
+
+    def __init__(self, url, host='0.0.0.0', port=8080, fallback=60, max_unmatched=1000, token=None):
+        super().__init__(url, host, port, fallback, max_unmatched, token)
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        '''Starts listening in a background thread.'''
+
+        if self._server is not None:
+            return
+
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                self.handle_pingback(body)
+
+            def do_GET(self):
+                self.handle_pingback(b'')
+
+            def handle_pingback(self, body):
+                url = urlsplit(self.path)
+                if not receiver.authorized(url.path):
+                    self.send_error(403)
+                    return
+
+                pingback = receiver.parse(url.query, self.headers.get('Content-Type'), body)
+
+                if pingback is None:
+                    self.send_error(400)
+                    return
+
+                receiver.receive(*pingback)
+
+                self.send_response(200)
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'OK')
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.1},
+                                        name='twocaptcha-pingback', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        '''Stops listening.'''
+
+        server, self._server = self._server, None
+
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            self._thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class AsyncPingbackReceiver(BasePingbackReceiver):
+    """
+    HTTP server receiving 2captcha pingbacks on the running event loop, for AsyncTwoCaptcha.
+
+    Pass it to the solver with AsyncTwoCaptcha(..., pingback=receiver) and start it with `await receiver.start()` or
+    `async with receiver`: the receiver URL becomes the default callback and solve() returns as soon as the pingback
+    arrives. res.php is polled only if no pingback arrives within fallback seconds.
+
+    Parameters
+    __________
+    url : str
+        Public URL of the receiver registered in the pingback settings of your account.
+    host : str, optional
+        Interface to listen on.
+        Default: 0.0.0.0.
+    port : int, optional
+        Port to listen on, 0 picks a free port.
+        Default: 8080.
+    fallback : float, optional
+        Seconds to wait for a pingback before falling back to polling res.php for the answer.
+        Default: 60.
+    token : str, optional
+        Secret expected as the last segment of the path of pingback requests, e.g. url='https://your.site/pingback/'
+        + token. Default: None, any path is accepted.
+    """
+
+    def __init__(self, url, host='0.0.0.0', port=8080, fallback=60, max_unmatched=1000, token=None):
+        super().__init__(url, host, port, fallback, max_unmatched, token)
+        self._server = None
+
+    async def start(self):
+        '''Starts listening on the running event loop.'''
+
+        if self._server is not None:
+            return
+
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        '''Stops listening.'''
+
+        server, self._server = self._server, None
+
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            headers = {}
+
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            length = int(headers.get('content-length') or 0)
+            body = await reader.readexactly(length) if length else b''
+
+            parts = request_line.decode('latin-1').split()
+            url = urlsplit(parts[1]) if len(parts) >= 2 else None
+            pingback = None
+            if url is not None:
+                pingback = self.parse(url.query, headers.get('content-type'), body)
+
+            if url is not None and not self.authorized(url.path):
+                writer.write(b'HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+            elif pingback is None:
+                writer.write(b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+            else:
+                self.receive(*pingback)
+                writer.write(b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\nOK')
+
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+try:
+    from .polling import estimate_solve_time
+    from .pingback import pingback_error
+    from .exceptions import api
+    from .exceptions.solver import ApiException, NetworkException, TimeoutException
+except ImportError:
+    from polling import estimate_solve_time
+    from pingback import pingback_error
+    from twocaptcha.exceptions import api
+    from twocaptcha.exceptions.solver import ApiException, NetworkException, TimeoutException
+
+
+class PendingResult():
+    """
+    Captcha waiting for its answer in a poller.
+    """
+
+    def __init__(self, id_, polling_interval, future, timeout, method=None, first_delay=0):
+        self.id = id_
+        self.method = method
+        self.interval = polling_interval
+        self.future = future
+        self.timeout = timeout
+        self.created = time.monotonic()
+        self.next_poll = self.created + first_delay
+        # last lookup finding the answer not ready
+        self.not_ready = self.created
+        # lookups failed in a row
+        self.failures = 0
+        self.deadline = self.created + timeout
+
+
+class Poller():
+    """
+    Polling scheduler of a solver.
+
+    A single background thread owns every pending captcha ID of the solver, kept in a heap ordered by the time of the
+    next lookup (and of the deadline), so any number of captchas can be in flight without blocking a thread each.
+    When the earliest ID is due, it is looked up together with the IDs due within half of their polling interval with
+    one res.php?action=get&ids=... request (up to batch_size IDs per request). Answers, errors and timeouts complete
+    the concurrent.futures.Future returned by submit(). Captchas looked up together are rescheduled together, with a
+    random delay of up to jitter * polling_interval so that batches don't stay synchronised.
+
+    The thread is started on demand and exits when nothing is pending.
+
+    Parameters
+    __________
+    solver : TwoCaptcha
+        Solver used to query the API.
+    batch_size : int, optional
+        Maximum number of IDs looked up with a single request. Set to 1 to disable batched lookups.
+        Default: 100.
+    jitter : float, optional
+        Random extra delay added to the polling interval when rescheduling, as a fraction of the interval.
+        Default: 0.1.
+    """
+
+    def __init__(self, solver, batch_size=100, jitter=0.1):
+        self.solver = solver
+        self.batch_size = batch_size
+        self.jitter = jitter
+
+        self._pending = {}
+        self._heap = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+
+    def submit(self, id_, timeout, polling_interval, method=None, future=None):
+        '''Starts polling for the answer of a captcha.
+
+        Parameters
+        __________
+        id_ : str
+            ID of the captcha sent for solution.
+        timeout : float
+            Maximum time to wait in seconds, the future fails with TimeoutException afterwards.
+        polling_interval : float
+            Interval in seconds between lookups of this captcha.
+        method : str, optional
+            2captcha method of the captcha, used by the solver's polling policy.
+        future : concurrent.futures.Future, optional
+            Future to complete, a new one is created by default.
+
+        Returns
+
+        future : concurrent.futures.Future
+            Completed with the answer of the captcha. Cancel it to stop polling.
+        '''
+
+        first_delay, interval = self.solver.polling_policy.schedule(method, polling_interval)
+
+        pingback = self.solver.pingback
+        if pingback is not None:
+            first_delay = max(first_delay, pingback.fallback)
+
+        if future is not None and future.cancelled():
+            return future
+
+        with self._lock:
+            entry = self._pending.get(id_)
+            created = entry is None
+
+            if created:
+                entry = PendingResult(id_, interval, future or Future(), timeout, method, first_delay)
+                self._pending[id_] = entry
+                self._push(entry.next_poll, entry)
+                self._push(entry.deadline, entry)
+
+            elif time.monotonic() + timeout > entry.deadline:
+                entry.timeout = timeout
+                entry.deadline = time.monotonic() + timeout
+                self._push(entry.deadline, entry)
+
+            if future is not None and future is not entry.future:
+                self._chain(entry.future, future)
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='twocaptcha-poller', daemon=True)
+                self._thread.start()
+
+        if created:
+            entry.future.add_done_callback(lambda f: f.cancelled() and self._discard(entry))
+
+        code = pingback.claim(id_) if pingback is not None else None
+        if code is not None:
+            self.deliver(id_, code)
+
+        return future or entry.future
+
+    def wait(self, id_, timeout, polling_interval, method=None):
+        '''Blocks until the captcha is solved.
+
+        Parameters
+        __________
+        id_ : str
+            ID of the captcha sent for solution.
+        timeout : float
+            Maximum time to wait in seconds.
+        polling_interval : float
+            Interval in seconds between lookups of this captcha.
+        method : str, optional
+            2captcha method of the captcha, used by the solver's polling policy.
+
+        Returns
+
+        answer : str or dict
+        '''
+
+        # the caller's wait is bounded on its own, so an in-flight lookup can't make it overshoot the timeout
+        future = self.submit(id_, timeout, polling_interval, method, future=Future())
+
+        try:
+            return future.result(max(0, timeout))
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutException(f'timeout {timeout} exceeded')
+
+    def deliver(self, id_, code):
+        '''Completes a pending captcha with an answer received by other means than polling (e.g. a pingback).
+
+        Parameters
+        __________
+        id_ : str
+            ID of the captcha.
+        code : str
+            Answer of the captcha, or the error code it failed with.
+
+        Returns
+
+        matched : bool
+            False if the captcha is not pending.
+        '''
+
+        with self._lock:
+            entry = self._pending.pop(id_, None)
+            if entry is None:
+                return False
+            self._wakeup.notify()
+
+        error = pingback_error(code)
+        if error is not None:
+            self._complete(entry, exception=error)
+            return True
+
+        self.solver.polling_policy.record(entry.method, time.monotonic() - entry.created)
+        self._complete(entry, {'status': 1, 'request': code} if self.solver.extendedResponse == True else code)
+
+        return True
+
+    def pending(self):
+        '''IDs of the captchas currently being polled.'''
+
+        with self._lock:
+            return list(self._pending)
+
+    def _push(self, when, entry):
+        heapq.heappush(self._heap, (when, next(self._counter), entry))
+
+        if self._heap[0][2] is entry:
+            self._wakeup.notify()
+
+    def _is_scheduled(self, when, entry):
+        # heap items of finished captchas and of superseded schedules are dropped lazily
+        return self._pending.get(entry.id) is entry and when in (entry.next_poll, entry.deadline)
+
+    def _discard(self, entry):
+        with self._lock:
+            if self._pending.get(entry.id) is entry:
+                del self._pending[entry.id]
+
+    @staticmethod
+    def _chain(source, target):
+        def copy(f):
+            if target.done():
+                return
+            if f.cancelled():
+                target.cancel()
+            elif f.exception() is not None:
+                target.set_exception(f.exception())
+            else:
+                target.set_result(f.result())
+
+        source.add_done_callback(copy)
+
+    @staticmethod
+    def _complete(entry, result=None, exception=None):
+        if not entry.future.set_running_or_notify_cancel():
+            return
+        if exception is not None:
+            entry.future.set_exception(exception)
+        else:
+            entry.future.set_result(result)
+
+    def _run(self):
+        while True:
+            expired = []
+            batch = []
+
+            with self._lock:
+                while True:
+                    while self._heap and not self._is_scheduled(self._heap[0][0], self._heap[0][2]):
+                        heapq.heappop(self._heap)
+
+                    if not self._pending:
+                        self._thread = None
+                        return
+
+                    now = time.monotonic()
+                    if self._heap[0][0] <= now:
+                        break
+
+                    self._wakeup.wait(self._heap[0][0] - now)
+
+                while self._heap and len(batch) < self.batch_size:
+                    when, _, entry = self._heap[0]
+                    if when == entry.deadline and when <= now:
+                        heapq.heappop(self._heap)
+                        if self._pending.get(entry.id) is entry:
+                            del self._pending[entry.id]
+                            expired.append(entry)
+                        continue
+
+                    # captchas that are due soon are looked up together with the ones that are due now
+                    if when - now > entry.interval / 2 or when != entry.next_poll:
+                        break
+
+                    heapq.heappop(self._heap)
+                    if self._is_scheduled(when, entry):
+                        entry.next_poll = None
+                        batch.append(entry)
+
+            for entry in expired:
+                self._complete(entry, exception=TimeoutException(f'timeout {entry.timeout} exceeded'))
+
+            if batch:
+                self._poll(batch)
+
+    def _poll(self, entries):
+        try:
+            # the lookup is useful until the last of the captchas expires
+            answers, errors = self.fetch([e.id for e in entries], max(e.deadline for e in entries))
+        except Exception as e:
+            answers, errors = {}, {entry.id: e for entry in entries}
+
+        now = time.monotonic()
+        stretch = 1 + random.uniform(0, self.jitter)
+        completed = []
+
+        with self._lock:
+            for entry in entries:
+                if self._pending.get(entry.id) is not entry:
+                    continue
+
+                if entry.id in answers:
+                    self.solver.polling_policy.record(
+                        entry.method, estimate_solve_time(entry.not_ready - entry.created, now - entry.created))
+                    completed.append((entry, answers[entry.id], None))
+                elif entry.id in errors:
+                    entry.failures += 1
+                    # transient errors are retried by rescheduling the lookup, the thread never sleeps
+                    delay = self.solver.retry_policy.next_delay(errors[entry.id], entry.failures, entry.deadline)
+                    if delay is None:
+                        completed.append((entry, None, errors[entry.id]))
+                    else:
+                        entry.next_poll = now + delay
+                        self._push(entry.next_poll, entry)
+                        continue
+                else:
+                    entry.failures = 0
+                    entry.not_ready = now
+                    entry.next_poll = now + entry.interval * stretch
+                    self._push(entry.next_poll, entry)
+                    continue
+
+                del self._pending[entry.id]
+
+        for entry, result, exception in completed:
+            self._complete(entry, result, exception)
+
+    def fetch(self, ids, deadline=None):
+        '''Looks up answers for several captchas.
+
+        Uses a single batched request when possible and falls back to one request per captcha when the batched
+        response cannot be attributed to individual captchas (e.g. one of them failed or an answer contains "|").
+        Network errors of the batched request are raised: the lookup of every captcha failed. Requests are not
+        repeated, the poller looks failed captchas up again after the backoff of the solver's retry policy.
+
+        Parameters
+        __________
+        ids : list
+            IDs of the captchas.
+        deadline : float, optional
+            time.monotonic() timestamp limiting the requests.
+
+        Returns
+
+        answers, errors : tuple of dict
+            Answers of solved captchas and exceptions of failed ones, keyed by captcha ID. Captchas that are not
+            solved yet are in neither.
+        '''
+
+        if len(ids) > 1 and self.solver.extendedResponse != True:
+            try:
+                return self.solver.get_results(ids, deadline, retry=False), {}
+            except (ApiException, api.ApiException):
+                pass
+
+        answers, errors = {}, {}
+
+        for id_ in ids:
+            try:
+                answers[id_] = self.solver.get_result(id_, deadline, retry=False)
+            except NetworkException:
+                pass
+            except Exception as e:
+                errors[id_] = e
+
+        return answers, errors
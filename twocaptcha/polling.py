@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+import threading
+from collections import deque
+
+
+def estimate_solve_time(not_ready, ready):
+    '''Returns the estimated time a captcha took to solve, from the last lookup finding it not ready and the lookup
+    finding its answer (both in seconds since it was sent, not_ready is 0 if there was none).
+
+    The answer is only known to have been ready between the two lookups: the time it was found is an upper bound,
+    recording it would make a policy delaying lookups learn ever longer solve times.
+    '''
+
+    return (not_ready + ready) / 2
+
+
+class PollingPolicy():
+    """
+    Decides when the answer of a captcha is looked up.
+
+    The default policy polls right after the captcha is sent and then every polling_interval seconds. It also keeps
+    a rolling window of observed solve times per captcha method (the value of the 2captcha `method` parameter, e.g.
+    userrecaptcha, hcaptcha, turnstile, post, base64) which can be inspected with stats().
+
+    Parameters
+    __________
+    window : int, optional
+        Number of most recent solve times kept per method.
+        Default: 100.
+    """
+
+    def __init__(self, window=100):
+        self.window = window
+
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def schedule(self, method, polling_interval):
+        '''Returns the delay before the first lookup and the interval between the following ones.
+
+        Parameters
+        __________
+        method : str
+            2captcha method of the captcha, None if unknown.
+        polling_interval : float
+            Configured polling interval in seconds.
+
+        Returns
+
+        first_delay, interval : tuple of float
+        '''
+
+        return 0, polling_interval
+
+    def record(self, method, seconds):
+        '''Records the time a captcha took to solve.
+
+        Parameters
+        __________
+        method : str
+            2captcha method of the captcha.
+        seconds : float
+            Time from sending the captcha until it was solved, e.g. estimate_solve_time() of its lookups.
+        '''
+
+        if method is None:
+            return
+
+        with self._lock:
+            samples = self._samples.get(method)
+            if samples is None:
+                samples = self._samples[method] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, method, q):
+        '''Returns the q-th percentile (0-100) of the recorded solve times of a method, None without samples.'''
+
+        with self._lock:
+            samples = sorted(self._samples.get(method, ()))
+
+        if not samples:
+            return None
+
+        return samples[min(len(samples) - 1, int(len(samples) * q / 100))]
+
+    def stats(self):
+        '''Returns the recorded solve time distribution per method.
+
+        Returns
+
+        stats : dict
+            {method: {'count': int, 'mean': float, 'p50': float, 'p90': float, 'max': float}}
+        '''
+
+        with self._lock:
+            methods = {method: sorted(samples) for method, samples in self._samples.items()}
+
+        return {
+            method: {
+                'count': len(samples),
+                'mean': sum(samples) / len(samples),
+                'p50': samples[len(samples) // 2],
+                'p90': samples[min(len(samples) - 1, len(samples) * 9 // 10)],
+                'max': samples[-1],
+            }
+            for method, samples in methods.items() if samples
+        }
+
+
+class AdaptivePolling(PollingPolicy):
+    """
+    Polling policy that learns how long each captcha method takes to solve.
+
+    Once min_samples solve times are recorded for a method, the first lookup of a new captcha of that method is
+    delayed until the percentile-th percentile of the observed solve times, and the following lookups are spaced a
+    quarter of the spread between that percentile and the 90th percentile apart (but not closer than min_interval and
+    not further than polling_interval). Until then the configured polling interval is used.
+
+    Parameters
+    __________
+    percentile : float, optional
+        Percentile of the observed solve times at which the first lookup is made.
+        Default: 50.
+    min_samples : int, optional
+        Number of recorded solve times required before the learned timings are used.
+        Default: 5.
+    min_interval : float, optional
+        Minimum interval in seconds between lookups of a captcha.
+        Default: 2.
+    window : int, optional
+        Number of most recent solve times kept per method.
+        Default: 100.
+    """
+
+    def __init__(self, percentile=50, min_samples=5, min_interval=2, window=100):
+        super().__init__(window=window)
+        self.first_percentile = percentile
+        self.min_samples = min_samples
+        self.min_interval = min_interval
+
+    def schedule(self, method, polling_interval):
+        with self._lock:
+            count = len(self._samples.get(method, ()))
+
+        if count < self.min_samples:
+            return super().schedule(method, polling_interval)
+
+        first_delay = self.percentile(method, self.first_percentile)
+        spread = self.percentile(method, 90) - first_delay
+        interval = min(polling_interval, max(self.min_interval, spread / 4))
+
+        return first_delay, interval
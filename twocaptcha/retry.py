@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+
+import asyncio
+import random
+import time
+
+try:
+    from .exceptions import api
+    from .exceptions import solver
+except ImportError:
+    from twocaptcha.exceptions import api
+    from twocaptcha.exceptions import solver
+
+
+# 2captcha error codes returned while the service is overloaded, the request can be repeated later
+RETRYABLE_ERRORS = {
+    'ERROR_NO_SLOT_AVAILABLE',
+    'ERROR_TOO_MUCH_REQUESTS',
+    'MAX_USER_TURN',
+    'ERROR_INTERNAL_SERVER_ERROR',
+}
+
+
+def is_retryable(exception):
+    '''Tells whether a failed request can be repeated.
+
+    Network errors, HTTP 429 and 5xx responses and the 2captcha error codes in RETRYABLE_ERRORS are transient. Other
+    errors (wrong key, zero balance, bad parameters, unsolvable captcha, ...) are fatal.
+
+    Parameters
+    __________
+    exception : Exception
+        Exception raised by the request.
+
+    Returns
+
+    retryable : bool
+    '''
+
+    if isinstance(exception, api.NetworkException):
+        status_code = getattr(exception, 'status_code', None)
+        return status_code is None or status_code == 429 or status_code >= 500
+
+    if isinstance(exception, (api.ApiException, solver.ApiException)):
+        message = str(exception)
+        return any(code in message for code in RETRYABLE_ERRORS)
+
+    return False
+
+
+def is_retryable_submit(exception):
+    '''Tells whether a failed captcha submission (in.php) can be repeated.
+
+    Unlike other requests, only submissions known not to have created a captcha are repeated: connection failures,
+    HTTP 429 and 5xx responses and the 2captcha error codes in RETRYABLE_ERRORS. After other network errors, e.g. a
+    read timeout once the upload is over, the captcha may have been created: sending it again could pay for it twice.
+
+    Parameters
+    __________
+    exception : Exception
+        Exception raised by the request.
+
+    Returns
+
+    retryable : bool
+    '''
+
+    if isinstance(exception, api.NetworkException) and getattr(exception, 'status_code', None) is None:
+        return getattr(exception, 'connect_error', False)
+
+    return is_retryable(exception)
+
+
+class RetryPolicy():
+    """
+    Repeats requests failing with transient errors, with exponential backoff and full jitter.
+
+    The n-th retry waits a random time between 0 and min(max_backoff, backoff * 2 ** (n - 1)) seconds. The last error
+    is raised when max_attempts requests have failed, or earlier if the next retry would start after deadline seconds
+    since the first attempt or after the deadline of the call.
+
+    Parameters
+    __________
+    max_attempts : int, optional
+        Maximum number of requests made, 1 disables retries.
+        Default: 4.
+    backoff : float, optional
+        Upper bound of the delay before the first retry, in seconds.
+        Default: 1.
+    max_backoff : float, optional
+        Upper bound of the delay before any retry, in seconds.
+        Default: 30.
+    deadline : float, optional
+        Maximum time in seconds spent on a request including retries, None for no limit.
+        Default: None.
+    retryable : callable, optional
+        Function telling whether an exception is transient.
+        Default: is_retryable.
+    submit_retryable : callable, optional
+        Function telling whether an exception of a captcha submission (in.php) is transient.
+        Default: is_retryable_submit.
+    """
+
+    def __init__(self, max_attempts=4, backoff=1, max_backoff=30, deadline=None, retryable=is_retryable,
+                 submit_retryable=is_retryable_submit):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.retryable = retryable
+        self.submit_retryable = submit_retryable
+
+    def delay(self, attempt):
+        '''Returns the time in seconds to wait before repeating a request after the given (1-based) attempt failed.'''
+
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+    def next_delay(self, exception, attempt, deadline=None, submit=False):
+        '''Returns the time in seconds to wait before repeating a request whose (1-based) attempt failed with exception,
+        None if it must not be repeated: the error is fatal, the attempts are exhausted or the delay would end after
+        deadline (a time.monotonic() timestamp).'''
+
+        retryable = self.submit_retryable if submit else self.retryable
+        if attempt >= self.max_attempts or not retryable(exception):
+            return None
+
+        delay = self.delay(attempt)
+        if deadline is not None and time.monotonic() + delay > deadline:
+            return None
+
+        return delay
+
+    def _deadline(self, deadline):
+        if self.deadline is None:
+            return deadline
+        own = time.monotonic() + self.deadline
+        return own if deadline is None else min(own, deadline)
+
+    def call(self, function, deadline=None, on_retry=None, submit=False):
+        '''Calls function (without arguments), repeating it while it fails with a transient error.
+
+        Parameters
+        __________
+        function : callable
+            Function making the request.
+        deadline : float, optional
+            time.monotonic() timestamp after which the request is not repeated anymore.
+        on_retry : callable, optional
+            Called with the exception, the number of the failed attempt and the delay before the request is repeated.
+        submit : bool, optional
+            Whether the request submits a captcha, repeated only on the errors accepted by submit_retryable.
+        '''
+
+        deadline = self._deadline(deadline)
+        attempt = 0
+
+        while True:
+            attempt += 1
+            try:
+                return function()
+            except Exception as e:
+                delay = self.next_delay(e, attempt, deadline, submit)
+                if delay is None:
+                    raise
+                if on_retry is not None:
+                    on_retry(e, attempt, delay)
+            time.sleep(delay)
+
+    async def acall(self, function, deadline=None, on_retry=None, submit=False):
+        '''Awaits function (a coroutine function without arguments), repeating it while it fails with a transient
+        error.
+
+        Parameters
+        __________
+        function : callable
+            Coroutine function making the request.
+        deadline : float, optional
+            time.monotonic() timestamp after which the request is not repeated anymore.
+        on_retry : callable, optional
+            Called with the exception, the number of the failed attempt and the delay before the request is repeated.
+        submit : bool, optional
+            Whether the request submits a captcha, repeated only on the errors accepted by submit_retryable.
+        '''
+
+        deadline = self._deadline(deadline)
+        attempt = 0
+
+        while True:
+            attempt += 1
+            try:
+                return await function()
+            except Exception as e:
+                delay = self.next_delay(e, attempt, deadline, submit)
+                if delay is None:
+                    raise
+                if on_retry is not None:
+                    on_retry(e, attempt, delay)
+            await asyncio.sleep(delay)
@@ -2,22 +2,49 @@
 
 import os
 import sys
+import threading
 import time
-from base64 import b64encode
-
-import requests
+from base64 import b64decode, b64encode
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
 
 try:
     from .api import ApiClient
+    from .batch import submit_tasks
+    from .methods import BaseTwoCaptcha, captcha_method, captcha_methods
+    from .limiter import RateLimiter
+    from .retry import RetryPolicy
+    from .timeouts import DEFAULT_UPLOAD_TIMEOUT, DEFAULT_POLL_TIMEOUT
+    from .poller import Poller
+    from .polling import PollingPolicy, AdaptivePolling
+    from .files import Rewind, is_buffer, is_content
+    from .answers import AnswerCache, answer_key
+    from .images import ImageCache, DEFAULT_MAX_IMAGE_SIZE
+    from .hooks import HookDispatcher
+    from .journal import Journal, params_hash
+    from .exceptions import api
     from .exceptions.solver import ValidationException, NetworkException, TimeoutException, ApiException, \
         SolverExceptions
 except ImportError:
     from api import ApiClient
+    from batch import submit_tasks
+    from methods import BaseTwoCaptcha, captcha_method, captcha_methods
+    from limiter import RateLimiter
+    from retry import RetryPolicy
+    from timeouts import DEFAULT_UPLOAD_TIMEOUT, DEFAULT_POLL_TIMEOUT
+    from poller import Poller
+    from polling import PollingPolicy, AdaptivePolling
+    from files import Rewind, is_buffer, is_content
+    from answers import AnswerCache, answer_key
+    from images import ImageCache, DEFAULT_MAX_IMAGE_SIZE
+    from hooks import HookDispatcher
+    from journal import Journal, params_hash
+    from twocaptcha.exceptions import api
     from twocaptcha.exceptions.solver import ValidationException, NetworkException, TimeoutException, ApiException, \
         SolverExceptions
 
 
-class TwoCaptcha():
+@captcha_methods
+class TwoCaptcha(BaseTwoCaptcha):
     """
     Class for interacting with the 2captcha API.
 
@@ -127,6 +154,10 @@ class TwoCaptcha():
         Retrieves the balance of your 2captcha account.
     report(id_, correct)
         Reports the correctness of a solved CAPTCHA.
+    download(url)
+        Downloads a captcha image or audio file through the connection pool.
+    close()
+        Closes pooled connections to the API server. Also called when the instance is used as a context manager.
     """
     def __init__(self,
                  apiKey,
@@ -136,7 +167,23 @@ class TwoCaptcha():
                  recaptchaTimeout=600,
                  pollingInterval=10,
                  server='2captcha.com',
-                 extendedResponse=None):
+                 extendedResponse=None,
+                 poolSize=10,
+                 keepAlive=True,
+                 adaptivePolling=False,
+                 pingback=None,
+                 submitRate=None,
+                 submitConcurrency=None,
+                 pollRate=None,
+                 pollConcurrency=None,
+                 retries=3,
+                 uploadTimeout=DEFAULT_UPLOAD_TIMEOUT,
+                 pollTimeout=DEFAULT_POLL_TIMEOUT,
+                 maxImageSize=DEFAULT_MAX_IMAGE_SIZE,
+                 imageCache=0,
+                 answerCache=None,
+                 hooks=None,
+                 journal=None):
         """
         Class constructor for interacting with the 2captcha API.
 
@@ -163,1280 +210,560 @@ class TwoCaptcha():
             Default: 10.
         server : str, optional
             API server. You can set it to rucaptcha.com if your account is registered there.
+            A URL with a scheme, such as the url of a local MockServer (http://127.0.0.1:port), is used as it is.
             Default: 2captcha.com.
         extendedResponse : bool, optional
             Set to True to get the response with additional fields or in more practical format (enables JSON response from
             res.php API endpoint). Suitable for hCaptcha, ClickCaptcha, Canvas.
             Default: None.
+        poolSize : int, optional
+            Maximum number of HTTP connections to the API server kept open and reused between requests. Should be
+            at least the number of threads using the instance concurrently.
+            Default: 10.
+        keepAlive : bool, optional
+            Set to False to open a new connection for every request instead of reusing pooled connections.
+            Default: True.
+        adaptivePolling : bool or PollingPolicy, optional
+            Set to True to learn solve times per captcha type and poll for the answer around the time it is expected
+            to be ready instead of every pollingInterval seconds. A configured AdaptivePolling instance can be passed
+            as well. Learned timings are available from solver.polling_policy.stats().
+            Default: False.
+        pingback : PingbackReceiver, optional
+            Receiver of 2captcha pingbacks. Its URL is used as the default callback and captchas are completed as
+            soon as their pingback arrives; res.php is polled only if no pingback arrives in time.
+            Default: None.
+        submitRate : float, optional
+            Maximum number of captchas sent to the in.php API endpoint per second. Requests over the limit block until
+            they can be made, instead of being rejected with ERROR_NO_SLOT_AVAILABLE.
+            Default: None (no limit).
+        submitConcurrency : int, optional
+            Maximum number of requests to the in.php API endpoint in progress at the same time.
+            Default: None (no limit).
+        pollRate : float, optional
+            Maximum number of requests to the res.php API endpoint per second.
+            Default: None (no limit).
+        pollConcurrency : int, optional
+            Maximum number of requests to the res.php API endpoint in progress at the same time.
+            Default: None (no limit).
+        retries : int, optional
+            Number of times a request failing with a transient error (network error, HTTP 5xx, ERROR_NO_SLOT_AVAILABLE,
+            ...) is repeated, with exponential backoff. 0 disables retries.
+            Default: 3.
+        uploadTimeout : RequestTimeout or float, optional
+            Connect, read and total timeouts of requests to the in.php API endpoint, which may carry large files. A
+            number sets the read and total timeout in seconds, None disables the timeouts.
+            Default: RequestTimeout(connect=10, read=60, total=180).
+        pollTimeout : RequestTimeout or float, optional
+            Connect, read and total timeouts of requests to the res.php API endpoint.
+            Default: RequestTimeout(connect=10, read=30, total=60).
+        maxImageSize : int, optional
+            Maximum size in bytes of captcha images and audio files downloaded from URLs, None for no limit. Larger
+            downloads are aborted.
+            Default: 10 MiB.
+        imageCache : int or ImageCache, optional
+            Number of images downloaded from URLs kept in memory, 0 disables caching. Cached images are reused only
+            while the server confirms, from their ETag, that they didn't change.
+            Default: 0.
+        answerCache : AnswerCache or bool, optional
+            Cache of the answers of normal captchas by image content and options: byte-identical captchas are solved
+            once, including those sent while the first one is being solved. True enables an in-memory cache keeping
+            answers for an hour; pass an AnswerCache to set the TTL or keep answers in a sqlite database.
+            Default: None (disabled).
+        hooks : Hooks or list of Hooks, optional
+            Called when captchas are sent, polled, solved or fail and when requests are retried, with their timings,
+            e.g. a MetricsCollector.
+            Default: None.
+        journal : str or Journal, optional
+            Path of a sqlite database, or a Journal, recording the captchas waited for until their answer is received,
+            so that resume() collects them after the process restarts.
+            Default: None (disabled).
         """
         self.API_KEY = apiKey
         self.soft_id = softId
-        self.callback = callback
+        self.callback = callback or (pingback.url if pingback is not None else None)
         self.default_timeout = defaultTimeout
         self.recaptcha_timeout = recaptchaTimeout
         self.polling_interval = pollingInterval
-        self.api_client = ApiClient(post_url=str(server))
+        self.api_client = ApiClient(post_url=str(server), pool_maxsize=poolSize, keep_alive=keepAlive,
+                                    upload_timeout=uploadTimeout, poll_timeout=pollTimeout)
         self.max_files = 9
         self.exceptions = SolverExceptions
         self.extendedResponse = extendedResponse
-
-    def normal(self, file, **kwargs):
-        '''Wrapper for solving a normal captcha (image).
+        self.submit_limiter = RateLimiter(rate=submitRate, max_in_flight=submitConcurrency)
+        self.poll_limiter = RateLimiter(rate=pollRate, max_in_flight=pollConcurrency)
+        self.retry_policy = RetryPolicy(max_attempts=retries + 1)
+        self.max_image_size = maxImageSize
+        self.image_cache = self._image_cache(imageCache)
+        self.answer_cache = answerCache if isinstance(answerCache, AnswerCache) else \
+            AnswerCache() if answerCache else None
+        self.hooks = HookDispatcher(hooks)
+        self.journal = journal if journal is None or isinstance(journal, Journal) else Journal(journal)
+        self.polling_policy = self._polling_policy(adaptivePolling)
+        self.poller = Poller(self)
+        self.pingback = pingback
+        if pingback is not None:
+            pingback.attach(self.poller)
+
+        self.pool_size = poolSize
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _polling_policy(adaptive):
+        if isinstance(adaptive, PollingPolicy):
+            return adaptive
+        return AdaptivePolling() if adaptive else PollingPolicy()
+
+    @staticmethod
+    def _image_cache(cache):
+        if isinstance(cache, ImageCache):
+            return cache
+        return ImageCache(cache) if cache else None
+
+    def close(self):
+        '''Closes pooled connections to the API server.'''
+
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+        close = getattr(self.api_client, 'close', None)
+        if close is not None:
+            close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def solve(self, timeout=0, polling_interval=0, deadline=None, **kwargs):
+        '''Sends captcha, receives result.
 
         Parameters
         __________
-        file : file
-            Captcha image file. * required if you submit image as a file (method=post).
-        body : str
-            Base64-encoded captcha image. * required if you submit image as Base64-encoded string (method=base64).
-        phrase : int, optional
-            0 - captcha contains one word. 1 - captcha contains two or more words.
-            Default: 0.
-        numeric : int, optional
-            0 - not specified. 1 - captcha contains only numbers. 2 - captcha contains only letters. 3 - captcha
-            contains only numbers OR only letters. 4 - captcha MUST contain both numbers AND letters.
-            Default: 0
-        minLen : int, optional
-            0 - not specified. 1..20 - minimal number of symbols in captcha.
-            Default: 0.
-        maxLen : int, optional
-            0 - not specified. 1..20 - maximal number of symbols in captcha.
-            Default: 0.
-        caseSensitive : int, optional
-            0 - captcha in not case sensitive. 1 - captcha is case sensitive.
-            Default: 0.
-        calc : int, optional
-            0 - not specified. 1 - captcha requires calculation (e.g. type the result 4 + 8 = ).
-            Default: 0.
-        lang : str, optional
-            Language code. See the list of supported languages https://2captcha.com/2captcha-api#language.
-        hintText : str, optional
-            Max 140 characters. Encoding: UTF-8. Text will be shown to worker to help him to solve the captcha correctly.
-            For example: type red symbols only.
-        hintImg : img, optional
-            Max 400x150px, 100 kB. Image with instruction for solving reCAPTCHA. Not required if you're sending
-            instruction as text with textinstructions.
-        softId : int, optional
-            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
-            spendings of their software users.
-        callback : str, optional
-            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
-            the server. More info here https://2captcha.com/2captcha-api#pingback.
-        '''
+        timeout : float
 
-        method = self.get_method(file)
-        result = self.solve(**method, **kwargs)
-        return result
+        polling_interval : int
 
-    def audio(self, file, lang, **kwargs):
-        '''Wrapper for solving audio captcha.
+        deadline : float, optional
+            time.monotonic() timestamp by which the answer must be received, TimeoutException is raised afterwards.
+            Bounds sending the captcha as well as waiting for the answer, and caps the timeout.
+        **kwargs : dict
+            all captcha params
 
-        Parameters
-        __________
-        body : str
-            Base64 encoded audio file in mp3 format. Max file size: 1 MB.
-        lang : str
-          The language of audio record. Supported languages are: "en", "ru", "de", "el", "pt", "fr".
-        '''
+        Returns
 
-        method = "audio"
+        result : string
+        '''
 
+        return self._solve(kwargs, timeout, polling_interval, deadline)
+
+    def _solve(self, params, timeout=0, polling_interval=0, deadline=None, submitted=None):
+        # submitted: future of a captcha sent with submit(), completed with the answer instead of blocking
+        try:
+            id_ = self.send(deadline=deadline, **params)
+        except Exception as e:
+            self.hooks.failed(params.get('method'), e)
+            raise
+
+        if self.callback is not None and self.pingback is None:
+            # the answer goes to the callback
+            self.hooks.forget(id_)
+            if submitted is not None:
+                submitted.set_result({'captchaId': id_})
+            return
+
+        timeout = self._wait_timeout(timeout, deadline)
+        sleep = int(polling_interval or self.polling_interval)
+        if self.journal is not None:
+            self.journal.add(id_, params.get('method'), params_hash(params), timeout)
+
+        if submitted is not None:
+            self._poll(submitted, id_, timeout, sleep, params.get('method'))
+            return
+
+        try:
+            code = self.wait_result(id_, timeout, sleep, method=params.get('method'))
+        except Exception as e:
+            self._settled(id_)
+            self.hooks.finished(id_, e)
+            raise
+
+        self._settled(id_)
+        self.hooks.finished(id_)
+        return self._result(id_, code)
+
+    def _poll(self, submitted, id_, timeout, polling_interval, method):
+        # completes the future of a captcha sent with submit() (or resumed) from the poller
+        answer = Future()
+        answer.add_done_callback(lambda f: self._complete(submitted, id_, f))
+        submitted.add_done_callback(lambda f: f.cancelled() and answer.cancel())
+
+        self.poller.submit(id_, timeout, polling_interval, method, future=answer)
+
+    def _settled(self, id_):
+        # the answer of a captcha was received, or it won't be
+        if self.journal is not None:
+            self.journal.remove(id_)
+
+    def _call_method(self, spec, args, kwargs, submitted=None):
+        # runs a method of METHODS (normal, recaptcha, ...), for a call of the method or for submit()
+        file, params, options = spec.bind(args, kwargs)
+        if spec.file is not None:
+            params.update(self._file_params(spec.file, file))
+        params.update(options)
+
+        if spec.timeout == 'recaptcha':
+            params.setdefault('timeout', self.recaptcha_timeout)
+
+        key = self._answer_key(params) if spec.cached else None
+        timing = self._timing(params)
+
+        def solve(submitted=submitted):
+            return self._solve(params, submitted=submitted, **timing)
+
+        if key is None:
+            return solve()
+
+        # identical images are solved once when answerCache is enabled
+        if submitted is None:
+            return self.answer_cache.call(key, solve)
+        self.answer_cache.complete(key, submitted, solve)
+
+    @staticmethod
+    def _timing(params):
+        # options of solve() itself, not sent to the API
+        return {name: params.pop(name) for name in ('timeout', 'polling_interval', 'deadline') if name in params}
+
+    def _file_params(self, kind, file):
+        if kind == 'image':
+            return self.get_method(file)
+
+        if kind == 'audio':
+            return {'body': self._audio_body(file)}
+
+        # one image, or a list or dict of them
+        if isinstance(file, str) or is_content(file):
+            params = self.get_method(file)
+            params.pop('method', None)
+            return params
+
+        if isinstance(file, dict):
+            file = list(file.values())
+
+        return {'files': self.extract_files(file)}
+
+    def _audio_body(self, file):
         if not file:
             raise ValidationException('File is none')
         elif not '.' in file and len(file) > 50:
-            body = file
+            return file
         elif file.endswith(".mp3") and file.startswith("http"):
-            response = requests.get(file)
-            if response.status_code != 200:
-                raise ValidationException(f'File could not be downloaded from url: {file}')
-            body = b64encode(response.content).decode('utf-8')
+            return b64encode(self.download(file)).decode('utf-8')
         elif file.endswith(".mp3"):
             with open(file, "rb") as media:
-                body = b64encode(media.read()).decode('utf-8')
+                return b64encode(media.read()).decode('utf-8')
         else:
             raise ValidationException('File extension is not .mp3 or it is not a base64 string.')
 
-        if not lang or lang not in ("en", "ru", "de", "el", "pt", "fr"):
-            raise ValidationException(f'Lang not in "en", "ru", "de", "el", "pt", "fr". You send {lang}')
-
-        result = self.solve(body=body, method=method, lang=lang, **kwargs)
-        return result
-
-    def text(self, text, **kwargs):
-        '''Wrapper for solving text captcha.
-
-        Parameters
-        __________
-        text : str
-            Max 140 characters. Encoding: UTF-8. Text will be shown to worker to help him to solve the captcha correctly.
-            For example: type red symbols only.
-        lang: str, optional
-            Language code. See the list of supported languages https://2captcha.com/2captcha-api#language.
-        softId : int, optional
-            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
-            spendings of their software users.
-        callback : str, optional
-            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
-            the server. More info here https://2captcha.com/2captcha-api#pingback.
-        '''
-
-        result = self.solve(text=text, method='post', **kwargs)
-        return result
-
-    def recaptcha(self, sitekey, url, version='v2', enterprise=0, **kwargs):
-        '''Wrapper for solving recaptcha (v2, v3).
-
-        Parameters
-        __________
-        sitekey : str
-            Value of sitekey parameter you found on page.
-        url : str
-            Full URL of the page where you see the reCAPTCHA.
-        domain : str, optional
-            Domain used to load the captcha: google.com or recaptcha.net. Default: google.com.
-        invisible : int, optional
-            1 - means that reCAPTCHA is invisible. 0 - normal reCAPTCHA. Default: 0.
-        version : str, optional
-            v3 — defines that you're sending a reCAPTCHA V3. Default: v2.
-        enterprise : str, optional
-            1 - defines that you're sending reCAPTCHA Enterpise. Default: 0.
-        action : str, optional
-            Value of action parameter you found on page. Default: verify.
-        score : str, only for v3, optional
-            The score needed for resolution. Currently, it's almost impossible to get token with score higher than 0.3.
-            Default: 0.4.
-        data-s : str, only for v2, optional
-            Value of data-s parameter you found on page. Curenttly applicable for Google Search and other Google services.
-        cookies : str, only for v2, optional
-            Your cookies that will be passed to our worker who solve the captha. We also return worker's cookies in the
-            response if you use json=1. Format: KEY:Value, separator: semicolon, example: KEY1:Value1;KEY2:Value2;
-        userAgent : str, only for v2, optional
-            Your userAgent that will be passed to our worker and used to solve the captcha.
-        softId : int, optional
-            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
-            spendings of their software users.
-        callback : str, optional
-            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
-            the server. More info here https://2captcha.com/2captcha-api#pingback.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
-
-        params = {
-            'googlekey': sitekey,
-            'url': url,
-            'method': 'userrecaptcha',
-            'version': version,
-            'enterprise': enterprise,
-            **kwargs,
-        }
-
-        result = self.solve(timeout=self.recaptcha_timeout, **params)
-        return result
-
-    def funcaptcha(self, sitekey, url, **kwargs):
-        '''Wrapper for solving funcaptcha.
-
-        Parameters
-        __________
-        sitekey : str
-            Value of pk or data-pkey parameter you found on page.
-        url : str
-            Full URL of the page where you see the FunCaptcha.
-        surl : str, optional
-            Value of surl parameter you found on page.
-        userAgent: str, optional
-            Tells us to use your user-agent value.
-        data[key] : str, optional
-            Custom data to pass to FunCaptcha. For example: data[blob]=stringValue.
-        softId : int, optional
-            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
-            spendings of their software users.
-        callback : str, optional
-            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
-            the server. More info here https://2captcha.com/2captcha-api#pingback.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
-
-        result = self.solve(publickey=sitekey,
-                            url=url,
-                            method='funcaptcha',
-                            **kwargs)
-        return result
-
-    def geetest(self, gt, challenge, url, **kwargs):
-        '''Wrapper for solving geetest captcha.
-
-        Parameters
-        __________
-        gt : str
-            Value of gt parameter you found on target website.
-        challenge : str
-            Value of challenge parameter you found on target website.
-        url : str
-            Full URL of the page where you see Geetest captcha.
-        offline : num, optional
-            In rare cases initGeetest can be called with offline parameter. If the call uses offline: true, set the
-            value to 1. Default: 0.
-        new_captcha : num, optional
-            In rare cases initGeetest can be called with new_captcha parameter. If the call uses new_captcha: true, set
-            the value to 1. Mostly used with offline parameter.
-        userAgent : str, optional
-            Your userAgent that will be passed to our worker and used to solve the captcha.
-        apiServer : str, optional
-            Value of api_server parameter you found on target website.
-        softId : int, optional
-            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
-            spendings of their software users.
-        callback : str, optional
-            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
-            the server. More info here https://2captcha.com/2captcha-api#pingback.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
-
-        result = self.solve(gt=gt,
-                            challenge=challenge,
-                            url=url,
-                            method='geetest',
-                            **kwargs)
-        return result
-
-    def hcaptcha(self, sitekey, url, **kwargs):
-        '''Wrapper for solving hcaptcha.
-
-        Parameters
-        __________
-        sitekey : str
-            Value of data-sitekey parameter you found on page.
-        url : str
-            Full URL of the page where you bypass the captcha.
-        invisible : num, optional
-            Use 1 for invisible version of hcaptcha. Currently it is a very rare case.
-            Default: 0.
-        data : str, optional
-            Custom data that is used in some implementations of hCaptcha, mostly with invisible=1. In most cases you see
-            it as rqdata inside network requests. Format: "data": "rqDataValue".
-        domain : str, optional
-            Domain used to load the captcha: hcaptcha.com or js.hcaptcha.com. Default: hcaptcha.com.
-        softId : int, optional
-            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
-            spendings of their software users.
-        callback : str, optional
-            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
-            the server. More info here https://2captcha.com/2captcha-api#pingback.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
-
-        result = self.solve(sitekey=sitekey,
-                            url=url,
-                            method='hcaptcha',
-                            **kwargs)
-        return result
-
-    def keycaptcha(self, s_s_c_user_id, s_s_c_session_id,
-                   s_s_c_web_server_sign, s_s_c_web_server_sign2, url,
-                   **kwargs):
-        '''Wrapper for solving.
-
-        Parameters
-        __________
-        s_s_c_user_id : str
-            Value of s_s_c_user_id parameter you found on page.
-        s_s_c_session_id : str
-            Value of s_s_c_session_id parameter you found on page.
-        s_s_c_web_server_sign : str
-            Value of s_s_c_web_server_sign parameter you found on page.
-        s_s_c_web_server_sign2 : str
-            Value of s_s_c_web_server_sign2 parameter you found on page.
-        url : str
-            Full URL of the page where you see the KeyCaptcha.
-        softId : int, optional
-            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
-            spendings of their software users.
-        callback : str, optional
-            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
-            the server. More info here https://2captcha.com/2captcha-api#pingback.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
-
-        params = {
-            's_s_c_user_id': s_s_c_user_id,
-            's_s_c_session_id': s_s_c_session_id,
-            's_s_c_web_server_sign': s_s_c_web_server_sign,
-            's_s_c_web_server_sign2': s_s_c_web_server_sign2,
-            'url': url,
-            'method': 'keycaptcha',
-            **kwargs,
-        }
-
-        result = self.solve(**params)
-        return result
-
-    def capy(self, sitekey, url, **kwargs):
-        '''Wrapper for solving capy.
-
-        Parameters
-        __________
-        sitekey : str
-            The domain part of script URL you found on page. Default value: https://jp.api.capy.me/.
-        url : str
-            Full URL of the page where you see the captcha.
-        api_server : str, optional
-            The domain part of script URL you found on page. Default value: https://jp.api.capy.me/.
-        version : str, optional
-            The version of captcha task: "puzzle" (assemble a puzzle) or "avatar" (drag an object). Default: puzzle.
-        softId : int, optional
-            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
-            spendings of their software users.
-        callback : str, optional
-            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
-            the server. More info here https://2captcha.com/2captcha-api#pingback.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
+    def _answer_key(self, params):
+        if self.answer_cache is None or (self.callback is not None and self.pingback is None):
+            return None
+
+        file = params.get('file')
+        if params.get('method') == 'base64':
+            content = b64decode(params['body'])
+        elif is_buffer(file):
+            content = file
+        elif isinstance(file, str):
+            with open(file, 'rb') as f:
+                content = f.read()
+        else:
+            # open files are read only once, when sent
+            return None
 
-        result = self.solve(captchakey=sitekey,
-                            url=url,
-                            method='capy',
-                            **kwargs)
-        return result
+        return answer_key(content, self._answer_options(params))
 
-    def grid(self, file, **kwargs):
-        '''Wrapper for solving grid captcha (image).
+    def _wait_timeout(self, timeout, deadline):
+        timeout = float(timeout or self.default_timeout)
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+        return timeout
 
-        Parameters
-        __________
-        file : file
-            Captcha image file. * required if you submit image as a file (method=post).
-        body : str
-            Base64-encoded captcha image. * required if you submit image as Base64-encoded string (method=base64).
-        hintText : str
-            Max 140 characters. Encoding: UTF-8. Text with instruction for solving reCAPTCHA. For example: select images
-            with trees. Not required if you're sending instruction as an image with imginstructions.
-        hintImg : img
-            Max 400x150px, 100 kB. Image with instruction for solving reCAPTCHA. Not required if you're sending
-            instruction as text with textinstructions.
-        rows : int, optional
-            Number of rows in reCAPTCHA grid.
-        cols : itn, optional
-            Number of columns in reCAPTCHA grid.
-        img_type : str, optional
-            The type of captcha to solve. Supported values:
-            - funcaptcha: FunCaptcha where you need to click the correct square.
-            - funcaptcha_compare: FunCaptcha where you select the square using arrows.
-            - recaptcha: reCAPTCHA.
-            - hcaptcha: hCaptcha.
-            Important: You must also provide the textinstructions parameter with the original instructions in English,
-            and send the original image files, not screenshots.
-        previousId : str, optional
-            Id of your previous request with the same captcha challenge.
-        canSkip : int, optional
-            0 - not specified. 1 - possibly there's no images that fit the instruction. Set the value to 1 only if it's
-            possible that there's no images matching to the instruction. We'll provide a button "No matching images" to
-            worker, and you will receive No_matching_images as answer.
-            Default: 0.
-        lang: str, optional
-            Language code. See the list of supported languages https://2captcha.com/2captcha-api#language.
-        softId : int, optional
-            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
-            spendings of their software users.
-        callback : str, optional
-            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
-            the server. More info here https://2captcha.com/2captcha-api#pingback.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
+    def _result(self, id_, code):
+        result = {'captchaId': id_}
 
-        method = self.get_method(file)
+        if self.extendedResponse == True:
 
-        params = {
-            'recaptcha': 1,
-            **method,
-            **kwargs,
-        }
+            new_code = {
+                key if key != 'request' else 'code': value
+                for key, value in code.items()
+                if key != 'status'
+            }
+            result.update(new_code)
+        else:
+            result.update({'code': code})
 
-        result = self.solve(**params)
         return result
 
-    def canvas(self, file, **kwargs):
-        '''Wrapper for solving canvas captcha (image).
-
-        Parameters
-        __________
-        file : file
-            Captcha image file. * required if you submit image as a file (method=post).
-        body : str
-            Base64-encoded captcha image. * required if you submit image as Base64-encoded string (method=base64).
-        hintText : str
-            Max 140 characters. Encoding: UTF-8. Text with instruction for solving reCAPTCHA. For example: select
-            images with trees. Not required if you're sending instruction as an image with imginstructions.
-        hintImg : img
-            Max 400x150px, 100 kB. Image with instruction for solving reCAPTCHA. Not required if you're sending
-            instruction as text with textinstructions.
-        canSkip : int, optional
-            0 - not specified. 1 - possibly there's no images that fit the instruction. Set the value to 1 only if it's
-            possible that there's no images matching to the instruction. We'll provide a button "No matching images" to
-            worker, and you will receive No_matching_images as answer.
-            Default: 0.
-        lang : int, optional
-            0 - not specified. 1 - Cyrillic captcha. 2 - Latin captcha.
-            Default: 0.
-        softId : int, optional
-            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
-            spendings of their software users.
-        callback : str, optional
-            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
-            the server. More info here https://2captcha.com/2captcha-api#pingback.
-        '''
-
-        if not ('hintText' in kwargs or 'hintImg' in kwargs):
-            raise ValidationException(
-                'parameters required: hintText and/or hintImg')
+    def _complete(self, future, id_, answer):
+        self._settled(id_)
 
-        method = self.get_method(file)
+        try:
+            if answer.cancelled():
+                self.hooks.forget(id_)
+                future.cancel()
+            elif answer.exception() is not None:
+                self.hooks.finished(id_, answer.exception())
+                future.set_exception(answer.exception())
+            else:
+                self.hooks.finished(id_)
+                future.set_result(self._result(id_, answer.result()))
+        except InvalidStateError:
+            # cancelled by the caller
+            pass
 
-        params = {
-            'recaptcha': 1,
-            'canvas': 1,
-            **method,
-            **kwargs,
-        }
+    def submit(self, method, **kwargs):
+        '''Sends a captcha without waiting for the answer.
 
-        result = self.solve(**params)
-        return result
-
-    def coordinates(self, file, **kwargs):
-        '''Wrapper for solving coordinates captcha (image).
+        The captcha is sent from a small pool of threads and its answer is polled by the solver's background poller
+        thread, so any number of captchas can be in flight at the same time without blocking a thread each.
 
         Parameters
         __________
-        file : file
-            Captcha image file. * required if you submit image as a file (method=post).
-        body : str
-            Base64-encoded captcha image. * required if you submit image as Base64-encoded string (method=base64).
-        hintText : str
-            Max 140 characters. Encoding: UTF-8. Text with instruction for solving the captcha. For example: click on
-            images with ghosts. Not required if the image already contains the instruction.
-        hintImg : img
-             Max 400x150px, 100 kB. Image with instruction for solving reCAPTCHA. Not required if you're sending
-             instruction as text with textinstructions.
-        lang : str, optional
-            Language code. See the list of supported languages https://2captcha.com/2captcha-api#language.
-        min_clicks : int, optional
-            The minimum number of clicks that need to be done.
-        max_clicks : int, optional
-            The maximum number of clicks that can be done.
-        softId : int, optional
-            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
-            spendings of their software users.
-        callback : str, optional
-            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
-            the server. More info here https://2captcha.com/2captcha-api#pingback.
-        '''
-
-        method = self.get_method(file)
-
-        params = {
-            'coordinatescaptcha': 1,
-            **method,
-            **kwargs,
-        }
-
-        result = self.solve(**params)
-        return result
+        method : str
+            Name of a solver method (normal, recaptcha, turnstile...) or, for captcha types without one, the value of
+            the 2captcha method parameter.
+        kwargs : dict
+            Arguments of the method.
 
-    def rotate(self, files, **kwargs):
-        '''Wrapper for solving rotate captcha (image).
+        Returns
 
-        Parameters
-        __________
-        files : file
-            Captcha image file. * required if you submit image as a file (method=post).
-        body : str
-            Base64-encoded captcha image. * required if you submit image as Base64-encoded string (method=base64).
-        angle : int, optional
-            Angle for one rotation step in degrees. If not defined we'll use the default value for FunCaptcha: 40 degrees.
-            Default: 40.
-        lang : str, optional
-            Language code. See the list of supported languages https://2captcha.com/2captcha-api#language.
-        hintImg : str, optional
-            Image with instruction for worker to help him to solve captcha correctly.
-        hintText : str, optional
-            Text will be shown to worker to help him to to solve captcha correctly.
-        softId : int, optional
-            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
-            spendings of their software users.
-        callback : str, optional
-            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
-            the server. More info here https://2captcha.com/2captcha-api#pingback.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        future : concurrent.futures.Future
+            Completed with the same result the method returns, or with the exception it raises. Cancel it to stop
+            polling for the answer.
         '''
 
-        if isinstance(files, str):
-
-            file = self.get_method(files)['file']
+        future = Future()
 
-            result = self.solve(file=file, method='rotatecaptcha', **kwargs)
-            return result
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix='twocaptcha-submit')
+            executor = self._executor
 
-        elif isinstance(files, dict):
-            files = list(files.values())
+        executor.submit(self._submit, future, method, kwargs)
+        return future
 
-        files = self.extract_files(files)
+    def _submit(self, future, method, kwargs):
+        if future.cancelled():
+            return
 
-        result = self.solve(files=files, method='rotatecaptcha', **kwargs)
-        return result
+        try:
+            spec = captcha_method(self, method)
+            if spec is not None:
+                self._call_method(spec, (), kwargs, submitted=future)
+            else:
+                params = dict(kwargs, method=method)
+                self._solve(params, submitted=future, **self._timing(params))
+        except Exception as e:
+            try:
+                future.set_exception(e)
+            except InvalidStateError:
+                pass
 
-    def geetest_v4(self, captcha_id, url, **kwargs):
-        '''Wrapper for solving geetest_v4 captcha.
+    def solve_many(self, tasks, concurrency=10):
+        '''Solves many captchas concurrently.
 
         Parameters
         __________
-        captcha_id : str
-            Value of captcha_id parameter you found on target website.
-        url: str
-            Full URL of the page where you see Geetest captcha.
-        risk_type: str, optional
-            Value of risk_type parameter is contained in the captcha loading request.
-        softId : int, optional
-            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
-            spendings of their software users.
-        callback : str, optional
-            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
-            the server. More info here https://2captcha.com/2captcha-api#pingback.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
-
-        result = self.solve(captcha_id=captcha_id,
-                            url=url,
-                            method='geetest_v4',
-                            **kwargs)
-        return result
+        tasks : iterable
+            Tasks to solve. Each task is a (method, kwargs) pair or a dict with the method under 'method' and its
+            arguments as the other keys, e.g. ('normal', {'file': 'captcha.jpg'}) or
+            {'method': 'turnstile', 'sitekey': '0x4AAAAAAAC3DHQFLr1GavRN', 'url': 'https://site.com'}. The method is
+            the name of a solver method or, for captcha types without one, the value of the 2captcha method parameter.
+            The iterable is consumed lazily.
+        concurrency : int, optional
+            Maximum number of tasks in progress at the same time.
+            Default: 10.
 
-    def lemin(self, captcha_id, div_id, url, **kwargs):
-        '''Wrapper for solving Lemin Cropped Captcha.
+        Yields
 
-        Parameters
-        __________
-        captcha_id : str
-            Value of captcha_id parameter you found on page.
-        div_id : str
-            The id of captcha parent div element.
-        url : str
-            Full URL of the page where you see the captcha.
-        api_server : str, optional
-            The domain part of script URL you found on page. Default value: https://api.leminnow.com/.
-        softId : int, optional
-            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
-            spendings of their software users.
-        callback : str, optional
-            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
-            the server. More info here https://2captcha.com/2captcha-api#pingback.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        result : TaskResult
+            One per task, in the order the tasks complete. A failed task is reported in TaskResult.error instead of
+            aborting the batch.
         '''
 
-        result = self.solve(captcha_id=captcha_id,
-                            div_id=div_id,
-                            url=url,
-                            method='lemin',
-                            **kwargs)
-        return result
-
-    def atb_captcha(self, app_id, api_server, url, **kwargs):
-        '''Wrapper for solving atbCAPTCHA.
-
-        Parameters
-        __________
-        app_id : str
-            The value of appId parameter in the website source code.
-        api_server : str
-            The value of apiServer parameter in the website source code.
-        url : str
-            The full URL of target web page where the captcha is loaded. We do not open the page, not a problem if it is
-            available only for authenticated users.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        return submit_tasks(self.submit, tasks, concurrency)
 
-        '''
+    def resume(self):
+        '''Resumes waiting for the captchas of the journal, sent before the process restarted and not answered yet.
 
-        result = self.solve(app_id=app_id,
-                            api_server=api_server,
-                            url=url,
-                            method='atb_captcha',
-                            **kwargs)
-        return result
+        The captchas are polled by the background poller thread, batched like the captchas sent with submit(), until
+        the deadline they were sent with. Expired captchas are dropped from the journal.
 
-    def turnstile(self, sitekey, url, **kwargs):
-        '''Wrapper for solving Cloudflare Turnstile.
+        Returns
 
-        Parameters
-        __________
-        sitekey : str
-            Value of sitekey parameter you found on page.
-        url : str
-            Full URL of the page where you see the captcha.
-        useragent : str
-            User-Agent of your browser. Must match the User-Agent you use to access the site.
-            Use only modern browsers released within the last 6 months.
-        action : str. optional
-            Value of optional action parameter you found on page, can be defined in data-action attribute or passed
-            to turnstile.render call.
-        data : str, optional
-            The value of cData passed to turnstile.render call. Also can be defined in data-cdata attribute.
-        pagedata : str, optional
-            The value of the chlPageData parameter when calling turnstile.render.
-        softId : int, optional
-            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
-            spendings of their software users.
-        callback : str, optional
-            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
-            the server. More info here https://2captcha.com/2captcha-api#pingback.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        futures : dict
+            concurrent.futures.Future of each captcha by ID, completed with the same result as submit() (see
+            solver.journal.pending() for their method and params_hash).
         '''
 
-        result = self.solve(sitekey=sitekey,
-                            url=url,
-                            method='turnstile',
-                            **kwargs)
-        return result
-
-    def amazon_waf(self, sitekey, iv, context, url, **kwargs):
-        '''Wrapper for solving Amazon WAF.
-
-        Parameters
-        __________
-        sitekey : str
-            Value of key parameter you found on the page.
-        iv : str
-            Value of iv parameter you found on the page.
-        context : str
-            Value of optional context parameter you found on page.
-        url : str
-            Full URL of the page where you see the captcha.
-        challenge_script : str, optional
-            The source URL of challenge.js script on the page.
-        captcha_script : str, optional
-            The source URL of captcha.js script on the page.
-        softId : int, optional
-            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
-            spendings of their software users.
-        callback : str, optional
-            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
-            the server. More info here https://2captcha.com/2captcha-api#pingback.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
+        if self.journal is None:
+            raise ValidationException('resume() requires a journal')
 
-        result = self.solve(sitekey=sitekey,
-                            iv=iv,
-                            context=context,
-                            url=url,
-                            method='amazon_waf',
-                            **kwargs)
+        futures = {}
+        for entry in self.journal.pending():
+            futures[entry.id] = Future()
+            self._poll(futures[entry.id], entry.id, entry.deadline - time.time(), self.polling_interval, entry.method)
 
-        return result
+        return futures
 
-    def mtcaptcha(self, sitekey, url, **kwargs):
-        '''Wrapper for solving MTCaptcha.
+    def wait_result(self, id_, timeout, polling_interval, method=None):
 
-        Parameters
-        __________
-        sitekey : str
-            The value of sitekey parameter found on the page.
-        url : str
-            Full URL of the page where you solve the captcha.
-        softId : int, optional
-            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
-            spendings of their software users.
-        callback : str, optional
-            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
-            the server. More info here https://2captcha.com/2captcha-api#pingback.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
+        return self.poller.wait(id_, timeout, polling_interval, method)
 
-        result = self.solve(sitekey=sitekey,
-                            url=url,
-                            method='mt_captcha',
-                            **kwargs)
-        return result
+    def get_method(self, file):
 
-    def friendly_captcha(self, sitekey, url, **kwargs):
-        '''Wrapper for solving Friendly Captcha.
+        if is_content(file):
+            return {'method': 'post', 'file': file}
 
-        Parameters
-        __________
-        sitekey : str
-            The value of data-sitekey attribute of captcha's div element on page.
-        url : str
-            Full URL of the page where you solve the captcha.
-        softId : int, optional
-            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
-            spendings of their software users.
-        callback : str, optional
-            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
-            the server. More info here https://2captcha.com/2captcha-api#pingback.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
+        if not file:
+            raise ValidationException('File required')
 
-        result = self.solve(sitekey=sitekey,
-                            url=url,
-                            method='friendly_captcha',
-                            **kwargs)
-        return result
+        if not '.' in file and len(file) > 50:
+            return {'method': 'base64', 'body': file}
 
-    def tencent(self, app_id, url, **kwargs):
-        '''Wrapper for solving Tencent captcha.
+        if file.startswith('http'):
+            # sent as a binary part, base64 would make the upload a third larger
+            return {'method': 'post', 'file': self.download(file)}
 
-        Parameters
-        __________
-        app_id : str
-            The value of appId parameter in the website source code.
-        url : str
-            The full URL of target web page where the captcha is loaded. We do not open the page, not a problem if it is
-            available only for authenticated users.
-        softId : int, optional
-            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
-            spendings of their software users.
-        callback : str, optional
-            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
-            the server. More info here https://2captcha.com/2captcha-api#pingback.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
+        if not os.path.exists(file):
+            raise ValidationException(f'File not found: {file}')
 
-        result = self.solve(app_id=app_id,
-                            url=url,
-                            method="tencent",
-                            **kwargs)
-        return result
+        return {'method': 'post', 'file': file}
 
-    def cutcaptcha(self, misery_key, apikey, url, **kwargs):
-        '''Wrapper for solving Friendly Captcha.
+    def download(self, url):
+        """Downloads a captcha image or audio file through the connection pool, at most maxImageSize bytes.
 
         Parameters
         __________
-        misery_key : str
-            The value of CUTCAPTCHA_MISERY_KEY variable defined on page.
-        apikey : str
-            The value of data-apikey attribute of iframe's body. Also, the name of javascript file included on the page.
         url : str
-            Full URL of the page where you solve the captcha.
-        softId : int, optional
-            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
-            spendings of their software users.
-        callback : str, optional
-            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
-            the server. More info here https://2captcha.com/2captcha-api#pingback.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
-
-        result = self.solve(misery_key=misery_key,
-                            api_key=apikey,
-                            url=url,
-                            method='cutcaptcha',
-                            **kwargs)
-        return result
-
-    def vkimage(self, files, steps, **kwargs):
-        '''Wrapper for solving vkimage captcha.
-
-        Parameters
-        __________
-        file : str
-            Captcha image as a file or base64.
-        steps: str
-            Array of steps.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
-
-        if isinstance(files, str):
-
-            payload = self.get_method(files)
-            payload.pop('method', None)
-
-            result = self.solve(method='vkimage', steps=steps, **payload, **kwargs)
-            return result
-
-        elif isinstance(files, dict):
-            files = list(files.values())
-
-        files = self.extract_files(files)
-
-        result = self.solve(method='vkimage',
-                            files=files,
-                            steps=steps,
-                            **kwargs)
-        return result
-
-    def vkcaptcha(self, redirect_uri, userAgent, proxy, **kwargs):
-        '''Wrapper for solving VK captcha using tokens.
-
-        Parameters
-        __________
-        redirect_uri : str
-            The URL that is returned for requests to the captchas API.
-        userAgent : str
-            User-Agent of the browser that will be used by the employee when loading the captcha.
-        proxy : dict
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
-
-
-        result = self.solve(method='vkcaptcha',
-                            redirect_uri=redirect_uri,
-                            useragent=userAgent,
-                            proxy=proxy,
-                            **kwargs)
-        return result
-
-    def captchafox(self, sitekey, pageurl, userAgent, proxy, **kwargs):
-        '''Wrapper for solving CaptchaFox using tokens.
-
-        Parameters
-        __________
-        sitekey : str
-            The sitekey parameter value found on the page or in network requests.
-        pageurl : str
-            Full URL of the page with captcha.
-        userAgent : str
-            User-Agent of the browser that will be used by the employee when loading the captcha.
-        proxy : dict
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        api_server : str, optional
-            Default: https://cdn.captchafox.com/. Depending on the parameter value, the token format
-            changes — it will be prefixed with MAM_. For this, you need to set the server URL to:
-            https://s.uicdn.com/mampkg/@mamdev/core.frontend.libs.captchafox/. Two different APIs
-            return two different tokens. Choose the one you need.
-        '''
-
-
-        result = self.solve(method='captchafox',
-                            sitekey=sitekey,
-                            pageurl=pageurl,
-                            useragent=userAgent,
-                            proxy=proxy,
-                            **kwargs)
-        return result
-
-    def prosopo(self, sitekey, pageurl, **kwargs):
-        '''Wrapper for solving Prosopo captcha using tokens.
-
-        Parameters
-        __________
-        sitekey : str
-            The sitekey parameter value found on the page or in network requests.
-        pageurl : str
-            Full URL of the page with captcha.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
-
-
-        result = self.solve(method='prosopo',
-                            sitekey=sitekey,
-                            pageurl=pageurl,
-                            **kwargs)
-        return result
-
-    def temu(self, body, part1, part2, part3, **kwargs):
-        '''Wrapper for solving Temu captcha .
-
-        Parameters
-        __________
-        body : str
-            Main captcha image as a base64 string.
-        part1 : str
-            Tile element as a base64 string.
-        part2 : str
-            Tile element as a base64 string.
-        part3 : str
-            Tile element as a base64 string.
-        '''
-
-        result = self.solve(method='temuimage',
-                            body=body,
-                            part1=part1,
-                            part2=part2,
-                            part3=part3,
-                            **kwargs)
-        return result
-
-    def datadome(self, captcha_url, pageurl, userAgent, proxy, **kwargs):
-        """Wrapper for solving DataDome Captcha.
+            URL of the file.
+        Returns
 
-        Parameters
-        __________
-        captcha_url: str
-            The value of the 'src' parameter for the 'iframe' element containing the captcha on the page.
-        pageurl: str
-            Full URL of the page that triggers the captcha when you go to it.
-        userAgent: str
-            User-Agent of the browser that will be used by the employee when loading the captcha.
-        proxy : dict
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
+        content : bytes
         """
 
-        result = self.solve(method='datadome',
-                            captcha_url=captcha_url,
-                            pageurl=pageurl,
-                            userAgent=userAgent,
-                            proxy=proxy,
-                            **kwargs)
-        return result
-
-    def cybersiara(self, master_url_id, pageurl, userAgent, **kwargs):
-        '''Wrapper for solving CyberSiARA captcha.
-
-        Parameters
-        __________
-        master_url_id : str
-            The value of the MasterUrlId parameter from the request to API/CyberSiara/GetCyberSiara.
-        pageurl : str
-            Full URL of the page with captcha.
-        userAgent : str
-            User-Agent of your browser.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
-        result = self.solve(method='cybersiara',
-                            master_url_id=master_url_id,
-                            pageurl=pageurl,
-                            userAgent=userAgent,
-                            **kwargs)
-        return result
-
-    def yandex_smart(self, sitekey, url, **kwargs):
-        '''Wrapper for solving Yandex Smart.
-
-        Parameters
-        __________
-        sitekey : str
-            The value of data-sitekey attribute of captcha's div element on page.
-        url : str
-            Full URL of the page where you solve the captcha.
-        softId : int, optional
-            ID of software developer. Developers who integrated their software with 2Captcha get reward: 10% of
-            spendings of their software users.
-        callback : str, optional
-            URL for pingback (callback) response that will be sent when captcha is solved. URL should be registered on
-            the server. More info here https://2captcha.com/2captcha-api#pingback.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        userAgent: str, optional
-            User-Agent of the browser that will be used by the employee when loading the captcha.
-        '''
-
-        result = self.solve(sitekey=sitekey,
-                            url=url,
-                            method='yandex',
-                            **kwargs)
-        return result
-
-    def altcha(self, pageurl, **kwargs):
-        '''Wrapper for solving Altcha Captcha.
-
-        Parameters
-        __________
-        pageurl : str
-            Full URL of the page where you solve the captcha.
-        challenge_url : str, optional
-            The value of the 'challenge_url' parameter for the 'altcha-widget' element containing the captcha on the page.
-            At least one of the parameters 'challenge_url', 'challenge_json' must be passed.
-        challenge_json : str, optional
-            The contents of the file from the 'challenge_url' parameter.
-            At least one of the parameters 'challenge_url', 'challenge_json' must be passed.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-
-        '''
-
-        result = self.solve(
-            pageurl=pageurl,
-            method="altcha",
-            **kwargs)
-        
-        return result
-    
-    def binance(self, pageurl, sitekey, validate_id, **kwargs):
-        '''Wrapper for solving Binance captcha.
-
-        Parameters
-        __________
-        pageurl : str
-            Full URL of the page where you solve the captcha.
-        sitekey : str
-            Value of 'bizId', 'bizType', or 'bizCode' from page requests.
-        validate_id : str
-            Dynamic value of 'validateId', 'securityId', or 'securityCheckResponseValidateId'.
-        useragent : str, optional
-            Browser User-Agent. We recommend sending a valid Windows browser string.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
-        result = self.solve(
-            method="binance",
-            pageurl=pageurl,
-            sitekey=sitekey,
-            validate_id=validate_id,
-            **kwargs)
-
-        return result
-    
-    def yidun(self, sitekey, pageurl, **kwargs):
-        '''Wrapper for solving Yidun captcha.
-
-        Parameters
-        __________
-        
-        sitekey : str
-            The 'sitekey' value found in the website source code.
-        pageurl : str
-            Full URL of the page containing the captcha.
-        yidun_get_lib : str, optional
-            Path to the JavaScript file that loads the captcha on the page. Important: use the full URL (https://...). Recommended if the site includes challenge, hcg, or hct fields.
-        yidun_api_server_subdomain : str, optional
-            Yidun API server subdomain. Enter only the domain, without the https:// prefix.
-        challenge : str, optional
-            Usually sent in network requests during captcha initialization or display.
-        hcg : str, optional
-            Captcha hash used when forming the request. You can get this together with challenge.
-        hct : int, optional
-            Numeric timestamp or identifier used for Enterprise version validation.
-        useragent : str, optional
-            Browser User-Agent. We recommend sending a valid Windows browser string.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
-        result = self.solve(
-            method="yidun",
-            pageurl=pageurl,
-            sitekey=sitekey,
-            **kwargs)
-
-        return result
-
-    def hunt(self, pageurl, api_get_lib, **kwargs):
-        '''Wrapper for solving Hunt captcha.
-
-        Parameters
-        __________
-        pageurl : str
-            Full URL of the page with the captcha.
-        api_get_lib : str
-            Full link to the api.js file that loads the captcha on the page.
-        data : str, optional
-            Value of `meta.token` that the site returned after a request with X-HD.
-            Use only for the captcha solving mode (second step).
-        useragent : str, optional
-            Browser User-Agent used to open the page.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
-        result = self.solve(
-            method="hunt",
-            pageurl=pageurl,
-            api_get_lib=api_get_lib,
-            **kwargs)
-
-        return result
-
-    def alibaba(self, pageurl, scene_id, prefix, **kwargs):
-        '''Wrapper for solving Alibaba captcha.
-
-        Parameters
-        __________
-        pageurl : str
-            Full URL of the page with the captcha.
-        scene_id : str
-            Captcha scenario identifier.
-        prefix : str
-            Prefix from the captcha loading request subdomain.
-        user_id : str, optional
-            User or session identifier on the website.
-        user_user_id : str, optional
-            Additional user identifier.
-        verify_type : str, optional
-            Verification mechanism version or type.
-        region : str, optional
-            Captcha processing region.
-        user_certify_id : str, optional
-            Verification ID for the current captcha session.
-        api_get_lib : str, optional
-            URL of the Alibaba Captcha JS library.
-        useragent : str, optional
-            Browser User-Agent used to open the page.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
-        result = self.solve(
-            method="alibaba",
-            pageurl=pageurl,
-            scene_id=scene_id,
-            prefix=prefix,
-            **kwargs)
-
-        return result
-
-    def tspd(self, pageurl, tspd_cookie, html_page_base64, proxy, **kwargs):
-        '''Wrapper for solving TSPD captcha.
+        cached = self.image_cache.get(url) if self.image_cache is not None else None
 
-        Parameters
-        __________
-        pageurl : str
-            Full URL of the page with the captcha.
-        tspd_cookie : str
-            Cookies received on the TSPD challenge page.
-        html_page_base64 : str
-            Full HTML of the challenge page, Base64 encoded.
-        proxy : dict
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        useragent : str, optional
-            Browser User-Agent. We recommend sending a valid Windows browser string.
-        '''
-        result = self.solve(
-            method="tspd",
-            pageurl=pageurl,
-            tspd_cookie=tspd_cookie,
-            html_page_base64=html_page_base64,
-            proxy=proxy,
-            **kwargs)
+        try:
+            content, etag = self.api_client.download(url, max_size=self.max_image_size,
+                                                     etag=cached[0] if cached else None)
+        except api.NetworkException as e:
+            raise ValidationException(f'File could not be downloaded from url: {url} ({e})')
 
-        return result
+        if content is None:
+            return cached[1]
 
-    def basilisk(self, pageurl, sitekey, **kwargs):
-        '''Wrapper for solving Basilisk captcha.
+        if self.image_cache is not None and etag:
+            self.image_cache.put(url, etag, content)
 
-        Parameters
-        __________
-        pageurl : str
-            Full URL of the page with the captcha.
-        sitekey : str
-            The value of the data-site-key parameter found on the page.
-        useragent : str, optional
-            Browser User-Agent used to open the page.
-        proxy : dict, optional
-            {'type': 'HTTPS', 'uri': 'login:password@IP_address:PORT'}.
-        '''
-        result = self.solve(
-            method="basilisk",
-            pageurl=pageurl,
-            sitekey=sitekey,
-            **kwargs)
+        return content
 
-        return result
-
-
-    def solve(self, timeout=0, polling_interval=0, **kwargs):
-        '''Sends captcha, receives result.
+    def send(self, deadline=None, **kwargs):
+        """This method can be used for manual captcha submission
 
         Parameters
         __________
-        timeout : float
-
-        polling_interval : int
-
-        **kwargs : dict
-            all captcha params
-
+        method : str
+            The name of the method must be found in the documentation https://2captcha.com/2captcha-api
+        kwargs: dict
+            All captcha params
+        deadline : float, optional
+            time.monotonic() timestamp after which the captcha is not sent (or retried) anymore.
         Returns
 
-        result : string
-        '''
-
-        id_ = self.send(**kwargs)
-        result = {'captchaId': id_}
-
-        if self.callback is None:
-            timeout = float(timeout or self.default_timeout)
-            sleep = int(polling_interval or self.polling_interval)
-
-            code = self.wait_result(id_, timeout, sleep)
-
-            if self.extendedResponse == True:
-
-                new_code = {
-                    key if key != 'request' else 'code': value
-                    for key, value in code.items()
-                    if key != 'status'
-                }
-                result.update(new_code)
-            else:
-                result.update({'code': code})
-
-            return result
-
-    def wait_result(self, id_, timeout, polling_interval):
-
-        max_wait = time.time() + timeout
+        """
 
-        while time.time() < max_wait:
+        params = self.default_params(kwargs)
+        params = self.rename_params(params)
 
-            try:
-                return self.get_result(id_)
+        params, files = self.check_hint_img(params)
 
-            except NetworkException:
+        response = self._in(files, params, deadline)
 
-                time.sleep(polling_interval)
+        id_ = response[3:]
+        if self.pingback is not None:
+            self.pingback.expect(id_)
 
-        raise TimeoutException(f'timeout {timeout} exceeded')
+        return id_
 
-    def get_method(self, file):
+    def _in(self, files, params, deadline=None):
+        rewind = Rewind(list(files.values()) + [params.get('file')])
+        timing = {'attempt': 0}
 
-        if not file:
-            raise ValidationException('File required')
+        def request():
+            rewind()
+            with self.submit_limiter:
+                timing['started'] = time.monotonic()
+                timing['attempt'] += 1
+                response = self.api_client.in_(files=files, **self._timeout(deadline), **params)
 
-        if not '.' in file and len(file) > 50:
-            return {'method': 'base64', 'body': file}
+            if not response.startswith('OK|'):
+                raise ApiException(f'cannot recognize response {response}')
 
-        if file.startswith('http'):
-            img_resp = requests.get(file)
-            if img_resp.status_code != 200:
-                raise ValidationException(f'File could not be downloaded from url: {file}')
-            return {'method': 'base64', 'body': b64encode(img_resp.content).decode('utf-8')}
+            return response
 
-        if not os.path.exists(file):
-            raise ValidationException(f'File not found: {file}')
+        try:
+            if not rewind.replayable:
+                # the content of unseekable files can't be sent again
+                response = request()
+            else:
+                response = self.retry_policy.call(request, deadline,
+                                                  self.hooks.retrying('in.php', params, timing, files), submit=True)
+        except Exception as e:
+            # tells account pools that the captcha was not accepted, and can be sent with another account
+            e.submit_error = True
+            raise
 
-        return {'method': 'post', 'file': file}
+        self.hooks.submitted(params, files, response, timing)
+        return response
 
-    def send(self, **kwargs):
-        """This method can be used for manual captcha submission
+    def _res(self, deadline=None, retry=True, **params):
+        timing = {}
 
-        Parameters
-        __________
-        method : str
-            The name of the method must be found in the documentation https://2captcha.com/2captcha-api
-        kwargs: dict
-            All captcha params
-        Returns
+        def request():
+            with self.poll_limiter:
+                timing['started'] = time.monotonic()
+                try:
+                    response = self.api_client.res(**self._timeout(deadline), **params)
+                except Exception as e:
+                    self.hooks.polled(params, timing, error=e)
+                    raise
 
-        """
+            self.hooks.polled(params, timing, response)
+            return response
 
-        params = self.default_params(kwargs)
-        params = self.rename_params(params)
+        if not retry:
+            return request()
 
-        params, files = self.check_hint_img(params)
+        return self.retry_policy.call(request, deadline, self.hooks.retrying('res.php', params, timing))
 
-        response = self.api_client.in_(files=files, **params)
+    @staticmethod
+    def _timeout(deadline):
+        # request options limiting a request to the remaining time budget
+        if deadline is None:
+            return {}
 
-        if not response.startswith('OK|'):
-            raise ApiException(f'cannot recognize response {response}')
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutException('deadline exceeded')
 
-        return response[3:]
+        return {'timeout': remaining}
 
-    def get_result(self, id_):
+    def get_result(self, id_, deadline=None, retry=True):
         import json
         """This method can be used for manual captcha answer polling.
 
@@ -1444,6 +771,10 @@ class TwoCaptcha():
         __________
         id_ : str
             ID of the captcha sent for solution
+        deadline : float, optional
+            time.monotonic() timestamp limiting the request
+        retry : bool, optional
+            whether transient errors are retried with the retry policy, the pollers reschedule the lookup instead
         Returns
 
         answer : text
@@ -1451,7 +782,7 @@ class TwoCaptcha():
 
         if self.extendedResponse == True:
 
-            response = self.api_client.res(key=self.API_KEY, action='get', id=id_, json=1)
+            response = self._res(deadline, retry, key=self.API_KEY, action='get', id=id_, json=1)
 
             response_data = json.loads(response)
 
@@ -1465,7 +796,7 @@ class TwoCaptcha():
 
         else:
 
-            response = self.api_client.res(key=self.API_KEY, action='get', id=id_)
+            response = self._res(deadline, retry, key=self.API_KEY, action='get', id=id_)
 
             if response == 'CAPCHA_NOT_READY':
                 raise NetworkException
@@ -1475,6 +806,31 @@ class TwoCaptcha():
 
             return response[3:]
 
+    def get_results(self, ids, deadline=None, retry=True):
+        """This method can be used to poll answers for several captchas with a single request.
+
+        Parameters
+        __________
+        ids : list
+            IDs of the captchas sent for solution
+        deadline : float, optional
+            time.monotonic() timestamp limiting the request
+        retry : bool, optional
+            whether transient errors are retried with the retry policy, the pollers reschedule the lookup instead
+        Returns
+
+        answers : dict
+            answers of the solved captchas by ID, captchas that are not ready yet are omitted
+        """
+
+        response = self._res(deadline, retry, key=self.API_KEY, action='get', ids=','.join(ids))
+
+        answers = response.split('|')
+        if len(answers) != len(ids):
+            raise ApiException(f'cannot recognize response {response}')
+
+        return {id_: answer for id_, answer in zip(ids, answers) if answer != 'CAPCHA_NOT_READY'}
+
     def balance(self):
         '''Get my balance
 
@@ -1483,7 +839,7 @@ class TwoCaptcha():
         balance : float
         '''
 
-        response = self.api_client.res(key=self.API_KEY, action='getbalance')
+        response = self._res(key=self.API_KEY, action='getbalance')
         return float(response)
 
     def report(self, id_, correct):
@@ -1503,97 +859,12 @@ class TwoCaptcha():
         '''
 
         rep = 'reportgood' if correct else 'reportbad'
-        answer = self.api_client.res(key=self.API_KEY, action=rep, id=id_)
+        answer = self._res(key=self.API_KEY, action=rep, id=id_)
 
-        return answer
+        if not correct and self.answer_cache is not None:
+            self.answer_cache.discard(id_)
 
-    def rename_params(self, params):
-
-        replace = {
-            'caseSensitive': 'regsense',
-            'minLen': 'min_len',
-            'maxLen': 'max_len',
-            'minLength': 'min_len',
-            'maxLength': 'max_len',
-            'hintText': 'textinstructions',
-            'hintImg': 'imginstructions',
-            'url': 'pageurl',
-            'score': 'min_score',
-            'text': 'textcaptcha',
-            'rows': 'recaptcharows',
-            'cols': 'recaptchacols',
-            'previousId': 'previousID',
-            'canSkip': 'can_no_answer',
-            'apiServer': 'api_server',
-            'softId': 'soft_id',
-            'callback': 'pingback',
-            'datas': 'data-s',
-        }
-
-        new_params = {
-            v: params.pop(k)
-            for k, v in replace.items() if k in params
-        }
-
-        proxy = params.pop('proxy', '')
-        proxy and new_params.update({
-            'proxy': proxy['uri'],
-            'proxytype': proxy['type']
-        })
-
-        new_params.update(params)
-
-        return new_params
-
-    def default_params(self, params):
-
-        params.update({'key': self.API_KEY})
-
-        callback = params.pop('callback', self.callback)
-        soft_id = params.pop('softId', self.soft_id)
-
-        if callback: params.update({'callback': callback})
-        if soft_id: params.update({'softId': soft_id})
-
-        self.has_callback = bool(callback)
-
-        return params
-
-    def extract_files(self, files):
-
-        if len(files) > self.max_files:
-            raise ValidationException(
-                f'Too many files (max: {self.max_files})')
-
-        not_exists = [f for f in files if not (os.path.exists(f))]
-
-        if not_exists:
-            raise ValidationException(f'File not found: {not_exists}')
-
-        files = {f'file_{e + 1}': f for e, f in enumerate(files)}
-        return files
-
-    def check_hint_img(self, params):
-
-        hint = params.pop('imginstructions', None)
-        files = params.pop('files', {})
-
-        if not hint:
-            return params, files
-
-        if not '.' in hint and len(hint) > 50:
-            params.update({'imginstructions': hint})
-            return params, files
-
-        if not os.path.exists(hint):
-            raise ValidationException(f'File not found: {hint}')
-
-        if not files:
-            files = {'file': params.pop('file', {})}
-
-        files.update({'imginstructions': hint})
-
-        return params, files
+        return answer
 
 
 if __name__ == '__main__':
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+
+class RequestTimeout():
+    """
+    Timeouts of one kind of HTTP request to the API server.
+
+    Parameters
+    __________
+    connect : float, optional
+        Maximum time in seconds to establish a connection, None for no limit.
+        Default: 10.
+    read : float, optional
+        Maximum time in seconds without receiving (or, for AsyncTwoCaptcha, sending) any data once connected, None for
+        no limit.
+        Default: 60.
+    total : float, optional
+        Maximum duration of the whole request in seconds, None for no limit. TwoCaptcha applies it to connecting and
+        waiting for the response (urllib3's total timeout) and checks it while downloading images, but a response body
+        received slowly in several reads can exceed it by up to the read timeout.
+        Default: None.
+    """
+
+    def __init__(self, connect=10, read=60, total=None):
+        self.connect = connect
+        self.read = read
+        self.total = total
+
+    @classmethod
+    def of(cls, value):
+        '''Converts a number of seconds (the read and total timeout) or None (no timeouts) to a RequestTimeout.'''
+
+        if isinstance(value, RequestTimeout):
+            return value
+        if value is None:
+            return cls(None, None, None)
+        return cls(connect=min(10, value), read=value, total=value)
+
+    def limit(self, timeout=None):
+        '''Returns the timeouts capped to the total timeout and to timeout seconds (e.g. the time left before a
+        deadline).'''
+
+        total = _min(self.total, timeout)
+        return RequestTimeout(_min(self.connect, total), _min(self.read, total), total)
+
+    def __repr__(self):
+        return f'RequestTimeout(connect={self.connect}, read={self.read}, total={self.total})'
+
+
+def _min(a, b):
+    # None means no limit
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
+
+
+DEFAULT_UPLOAD_TIMEOUT = RequestTimeout(connect=10, read=60, total=180)
+DEFAULT_POLL_TIMEOUT = RequestTimeout(connect=10, read=30, total=60)
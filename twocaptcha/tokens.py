@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import CancelledError, Future, TimeoutError as FutureTimeoutError
+
+try:
+    from .batch import task_function
+    from .exceptions.solver import TimeoutException
+except ImportError:
+    from batch import task_function
+    from twocaptcha.exceptions.solver import TimeoutException
+
+
+class _Captcha():
+    # tokens of one captcha (method, sitekey, page URL and options) and the requests refilling them
+
+    def __init__(self, method, kwargs):
+        self.method = method
+        self.kwargs = kwargs
+        self.tokens = deque()
+        self.waiters = deque()
+        self.pending = 0
+        self.solve_time = 0
+
+
+class BaseTokenPool():
+    """
+    Keeps tokens of reCAPTCHA, hCaptcha, Turnstile and other token captchas solved in advance, so that they are handed
+    out without waiting for a worker.
+
+    A captcha is added to the pool by the first acquire() for it. From then on, the pool keeps size tokens of that
+    captcha ready and replaces them as they are acquired or expire, until it is closed. Replacements are sent ahead of
+    expiry, by the time the last token of the captcha took to solve, so expiring tokens are replaced before they go
+    stale. Every expired token is a solved captcha paid for and not used: keep size close to the number of tokens
+    actually needed within ttl seconds.
+
+    Parameters
+    __________
+    solver : TwoCaptcha or AsyncTwoCaptcha
+        Solver the captchas are sent with.
+    size : int, optional
+        Number of tokens kept ready per captcha.
+        Default: 2.
+    ttl : float, optional
+        Time in seconds a token is handed out after it was solved. Tokens are valid for about 120 seconds; keep a
+        margin for the time the token takes to be used.
+        Default: 110.
+    """
+
+    def __init__(self, solver, size=2, ttl=110):
+        self.solver = solver
+        self.size = size
+        self.ttl = ttl
+
+        self._captchas = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._hits = 0
+        self._misses = 0
+
+    def _captcha(self, method, sitekey, url, kwargs):
+        key = (method, sitekey, url, json.dumps(kwargs, sort_keys=True, default=str))
+
+        captcha = self._captchas.get(key)
+        if captcha is None:
+            captcha = self._captchas[key] = _Captcha(method, dict(kwargs, sitekey=sitekey, url=url))
+
+        return captcha
+
+    def _take(self, captcha, waiter):
+        # returns a token that didn't expire, or queues the waiter; under lock
+        now = time.monotonic()
+
+        while captcha.tokens:
+            expires, result = captcha.tokens.popleft()
+            if expires > now:
+                self._hits += 1
+                return result
+
+        self._misses += 1
+        captcha.waiters.append(waiter)
+        return None
+
+    def _reserve(self, captcha, size=None):
+        # number of captchas to send to keep size tokens that are still valid when a replacement would be solved,
+        # plus one per waiter; under lock
+        if self._closed:
+            return 0
+
+        fresh_until = time.monotonic() + captcha.solve_time
+        fresh = sum(1 for expires, _ in captcha.tokens if expires > fresh_until)
+        waiting = sum(1 for waiter in captcha.waiters if not waiter.done())
+
+        missing = max(0, (self.size if size is None else size) + waiting - fresh - captcha.pending)
+        captcha.pending += missing
+        return missing
+
+    def _solved(self, captcha, started, result=None, error=None):
+        # hands the token of a solved captcha to a waiter or keeps it, returns the number of captchas to send;
+        # under lock
+        captcha.pending -= 1
+
+        while captcha.waiters:
+            waiter = captcha.waiters.popleft()
+            if waiter.done():
+                continue
+            if error is not None:
+                # only the other waiters get new captchas, errors such as ERROR_ZERO_BALANCE would repeat
+                waiter.set_exception(error)
+                return self._reserve(captcha, size=0)
+            waiter.set_result(result)
+            self._timed(captcha, started)
+            return self._reserve(captcha)
+
+        if error is not None:
+            # refilled by the next acquire()
+            return 0
+
+        self._timed(captcha, started)
+        captcha.tokens.append((time.monotonic() + self.ttl, result))
+        self._call_later(max(0, self.ttl - captcha.solve_time), captcha)
+
+        return self._reserve(captcha)
+
+    @staticmethod
+    def _timed(captcha, started):
+        captcha.solve_time = time.monotonic() - started
+
+    def _expiring(self, captcha):
+        with self._lock:
+            missing = self._reserve(captcha)
+        self._send(captcha, missing)
+
+    def stats(self):
+        '''Returns the number of tokens acquired from the pool (hits), of acquire() calls that waited for a captcha to
+        be solved (misses) and the number of tokens ready per (method, sitekey, url).'''
+
+        with self._lock:
+            now = time.monotonic()
+            ready = {}
+            for key, captcha in self._captchas.items():
+                ready[key[:3]] = ready.get(key[:3], 0) + sum(1 for expires, _ in captcha.tokens if expires > now)
+            return {'hits': self._hits, 'misses': self._misses, 'ready': ready}
+
+
+class TokenPool(BaseTokenPool):
+    """
+    Token pool of a TwoCaptcha instance. Captchas are sent with solver.submit(), from its pool of threads.
+
+    Parameters
+    __________
+    solver : TwoCaptcha
+        Solver the captchas are sent with.
+    size : int, optional
+        Number of tokens kept ready per captcha.
+        Default: 2.
+    ttl : float, optional
+        Time in seconds a token is handed out after it was solved.
+        Default: 110.
+    """
+
+    def __init__(self, solver, size=2, ttl=110):
+        super().__init__(solver, size, ttl)
+        self._futures = set()
+        self._timers = set()
+
+    def acquire(self, method, sitekey, url, timeout=None, **kwargs):
+        '''Returns a token of a captcha, immediately if one is ready.
+
+        Parameters
+        __________
+        method : str
+            Solver method: recaptcha, hcaptcha, turnstile...
+        sitekey : str
+            Value of the sitekey parameter on the page.
+        url : str
+            Full URL of the page with the captcha.
+        timeout : float, optional
+            Maximum time in seconds to wait for a token when none is ready, None for no limit.
+        kwargs : dict
+            Other arguments of the method. Captchas with different arguments have tokens of their own.
+
+        Returns
+
+        result : dict
+            The result of the method: {'captchaId': ..., 'code': token}.
+        '''
+
+        waiter = Future()
+
+        with self._lock:
+            captcha = self._captcha(method, sitekey, url, kwargs)
+            result = self._take(captcha, waiter)
+            missing = self._reserve(captcha)
+
+        self._send(captcha, missing)
+
+        if result is not None:
+            return result
+
+        try:
+            return waiter.result(timeout)
+        except FutureTimeoutError:
+            # a token solved later is kept for the next acquire()
+            waiter.cancel()
+            raise TimeoutException(f'timeout {timeout} exceeded')
+
+    def _send(self, captcha, count):
+        for _ in range(count):
+            started = time.monotonic()
+            future = self.solver.submit(captcha.method, **captcha.kwargs)
+            with self._lock:
+                self._futures.add(future)
+            future.add_done_callback(lambda f, started=started: self._done(captcha, started, f))
+
+    def _done(self, captcha, started, future):
+        with self._lock:
+            self._futures.discard(future)
+            if future.cancelled():
+                missing = self._solved(captcha, started, error=CancelledError())
+            elif future.exception() is not None:
+                missing = self._solved(captcha, started, error=future.exception())
+            else:
+                missing = self._solved(captcha, started, future.result())
+
+        self._send(captcha, missing)
+
+    def _call_later(self, delay, captcha):
+        def expired():
+            with self._lock:
+                self._timers.discard(timer)
+            self._expiring(captcha)
+
+        timer = threading.Timer(delay, expired)
+        timer.daemon = True
+        self._timers.add(timer)
+        timer.start()
+
+    def close(self):
+        '''Stops refilling the pool and cancels the captchas being solved for it.'''
+
+        with self._lock:
+            self._closed = True
+            futures, self._futures = self._futures, set()
+            timers, self._timers = self._timers, set()
+            waiters = [waiter for captcha in self._captchas.values() for waiter in captcha.waiters]
+
+        for item in list(futures) + list(timers) + waiters:
+            item.cancel()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncTokenPool(BaseTokenPool):
+    """
+    Token pool of an AsyncTwoCaptcha instance. Captchas are solved by tasks of the event loop acquire() is first
+    awaited in.
+
+    Parameters
+    __________
+    solver : AsyncTwoCaptcha
+        Solver the captchas are sent with.
+    size : int, optional
+        Number of tokens kept ready per captcha.
+        Default: 2.
+    ttl : float, optional
+        Time in seconds a token is handed out after it was solved.
+        Default: 110.
+    """
+
+    def __init__(self, solver, size=2, ttl=110):
+        super().__init__(solver, size, ttl)
+        self._tasks = set()
+        self._handles = set()
+
+    async def acquire(self, method, sitekey, url, timeout=None, **kwargs):
+        '''Returns a token of a captcha, immediately if one is ready.
+
+        Parameters
+        __________
+        method : str
+            Solver method: recaptcha, hcaptcha, turnstile...
+        sitekey : str
+            Value of the sitekey parameter on the page.
+        url : str
+            Full URL of the page with the captcha.
+        timeout : float, optional
+            Maximum time in seconds to wait for a token when none is ready, None for no limit.
+        kwargs : dict
+            Other arguments of the method. Captchas with different arguments have tokens of their own.
+
+        Returns
+
+        result : dict
+            The result of the method: {'captchaId': ..., 'code': token}.
+        '''
+
+        waiter = asyncio.get_running_loop().create_future()
+
+        with self._lock:
+            captcha = self._captcha(method, sitekey, url, kwargs)
+            result = self._take(captcha, waiter)
+            missing = self._reserve(captcha)
+
+        self._send(captcha, missing)
+
+        if result is not None:
+            return result
+
+        try:
+            return await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            # a token solved later is kept for the next acquire()
+            raise TimeoutException(f'timeout {timeout} exceeded')
+
+    def _send(self, captcha, count):
+        for _ in range(count):
+            started = time.monotonic()
+            task = asyncio.ensure_future(task_function(self.solver, captcha.method)(**captcha.kwargs))
+            self._tasks.add(task)
+            task.add_done_callback(lambda t, started=started: self._done(captcha, started, t))
+
+    def _done(self, captcha, started, task):
+        self._tasks.discard(task)
+
+        with self._lock:
+            if task.cancelled():
+                missing = self._solved(captcha, started, error=asyncio.CancelledError())
+            elif task.exception() is not None:
+                missing = self._solved(captcha, started, error=task.exception())
+            else:
+                missing = self._solved(captcha, started, task.result())
+
+        self._send(captcha, missing)
+
+    def _call_later(self, delay, captcha):
+        def expired():
+            self._handles.discard(handle)
+            self._expiring(captcha)
+
+        handle = asyncio.get_running_loop().call_later(delay, expired)
+        self._handles.add(handle)
+
+    async def aclose(self):
+        '''Stops refilling the pool and cancels the captchas being solved for it.'''
+
+        with self._lock:
+            self._closed = True
+            waiters = [waiter for captcha in self._captchas.values() for waiter in captcha.waiters]
+
+        for item in list(self._tasks) + list(self._handles) + waiters:
+            item.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()